@@ -41,8 +41,9 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://status.openai.com",
-                "method": "scrape",
-                "selector": ".component-status"
+                "method": "statuspage",
+                "selector": ".component-status",
+                "components": ["API"]
             }
         ]
     },
@@ -58,8 +59,9 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://www.githubstatus.com",
-                "method": "scrape",
-                "selector": ".component-status"
+                "method": "statuspage",
+                "selector": ".component-status",
+                "components": ["API Requests"]
             }
         ]
     },
@@ -92,8 +94,9 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://www.vercel-status.com",
-                "method": "scrape",
-                "selector": ".component-status"
+                "method": "statuspage",
+                "selector": ".component-status",
+                "components": ["API"]
             }
         ]
     },
@@ -109,7 +112,7 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://www.cloudflarestatus.com",
-                "method": "scrape",
+                "method": "statuspage",
                 "selector": ".component-status"
             }
         ]
@@ -170,7 +173,7 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://status.iexcloud.io",
-                "method": "scrape",
+                "method": "statuspage",
                 "selector": ".component-status"
             }
         ]
@@ -197,7 +200,7 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://api.twitterstat.us",
-                "method": "scrape",
+                "method": "statuspage",
                 "selector": ".component-status"
             }
         ]
@@ -214,7 +217,7 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://www.redditstatus.com",
-                "method": "scrape",
+                "method": "statuspage",
                 "selector": ".component-status"
             }
         ]
@@ -282,7 +285,7 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://railway.statuspage.io",
-                "method": "scrape",
+                "method": "statuspage",
                 "selector": ".component-status"
             }
         ]
@@ -299,7 +302,7 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://render.statuspage.io",
-                "method": "scrape",
+                "method": "statuspage",
                 "selector": ".component-status"
             }
         ]
@@ -316,7 +319,7 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://status.supabase.com",
-                "method": "scrape",
+                "method": "statuspage",
                 "selector": ".component-status"
             }
         ]
@@ -333,7 +336,7 @@ API_SOURCES = {
             {
                 "type": "official_status",
                 "url": "https://www.planetscalestatus.com",
-                "method": "scrape",
+                "method": "statuspage",
                 "selector": ".component-status"
             }
         ]
@@ -351,9 +354,14 @@ def get_all_apis() -> List[str]:
     return list(API_SOURCES.keys())
 
 
+# Check intervals (seconds) per priority tier
+PRIORITY_INTERVAL = 300
+STANDARD_INTERVAL = 3600
+
+
 def get_priority_apis() -> List[str]:
     """Get high-priority APIs to check more frequently"""
-    # Check these every 5 minutes
+    # Check these every PRIORITY_INTERVAL (5 minutes)
     return ["stripe", "openai", "github", "aws", "vercel", "cloudflare"]
 
 
@@ -362,3 +370,17 @@ def get_standard_apis() -> List[str]:
     all_apis = set(get_all_apis())
     priority = set(get_priority_apis())
     return list(all_apis - priority)
+
+
+
+def get_check_interval(api_name: str) -> int:
+    """
+    Get the check interval in seconds for an API
+    An explicit "interval" in the API config wins over its priority tier
+    """
+    interval = get_api_config(api_name).get("interval")
+    if interval:
+        return int(interval)
+    if api_name in get_priority_apis():
+        return PRIORITY_INTERVAL
+    return STANDARD_INTERVAL
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+STATUS ARCHIVE BENCHMARK
+Ingest time and disk use of the status snapshot archive over many runs
+
+Each run archives every page again. Most pages are unchanged; the
+changed ones have a few component statuses and a timestamp edited, the
+way status pages change between runs. This is compared with keeping
+every page whole and gzipped on every run.
+
+Usage:
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --runs 288 --pages 20 --changed 0.2
+"""
+import argparse
+import random
+import time
+import zlib
+
+from common import temp_db_path
+
+from bench_scrape import synthetic_page
+from status_archive import StatusArchive
+
+
+def edit(page: bytes, run: int, rng: random.Random) -> bytes:
+    """The page with a few statuses flipped and a new timestamp"""
+    for _ in range(3):
+        component = rng.randrange(60)
+        status = rng.choice([b"Operational", b"Degraded Performance", b"Partial Outage"])
+        marker = b"Component %d</span><span class='component-status'>" % component
+        start = page.index(marker) + len(marker)
+        end = page.index(b"</span>", start)
+        page = page[:start] + status + page[end:]
+    return page.replace(b"<title>Example Status",
+                        b"<title>Example Status (run %d)" % run, 1) if run else page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger status archive benchmark")
+    parser.add_argument("--runs", type=int, default=96,
+                        help="Detector runs archived (default: 96, a day at 15 minutes)")
+    parser.add_argument("--pages", type=int, default=20,
+                        help="Status pages read per run (default: 20)")
+    parser.add_argument("--changed", type=float, default=0.2,
+                        help="Share of pages that change between runs (default: 0.2)")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - STATUS ARCHIVE BENCHMARK")
+    print("=" * 80)
+    rng = random.Random(7)
+    template = synthetic_page()
+    pages = [template.replace(b"Example Status", b"Example Status %d" % i)
+             for i in range(args.pages)]
+    print(f"\n▶ {args.runs} runs x {args.pages} pages of {len(template) / 1024:,.0f} KB, "
+          f"{args.changed:.0%} changing per run")
+    
+    archive = StatusArchive(temp_db_path("archive.db"))
+    seconds = {"changed": 0.0, "unchanged": 0.0}
+    counts = {"changed": 0, "unchanged": 0}
+    raw_bytes = gzip_bytes = 0
+    for run in range(args.runs):
+        for index in range(args.pages):
+            kind = "unchanged"
+            if run and rng.random() < args.changed:
+                pages[index] = edit(pages[index], run, rng)
+                kind = "changed"
+            t0 = time.perf_counter()
+            archive.put(f"https://status{index}.example.com", pages[index])
+            seconds[kind] += time.perf_counter() - t0
+            counts[kind] += 1
+            raw_bytes += len(pages[index])
+            if run < 3:
+                gzip_bytes += len(zlib.compress(pages[index]))
+    # Every page compresses about the same; extrapolate from the first runs
+    gzip_bytes = gzip_bytes * args.runs // min(args.runs, 3)
+    
+    totals = archive.totals()
+    valid, _ = archive.verify()
+    archive.close()
+    for kind in ("unchanged", "changed"):
+        if counts[kind]:
+            print(f"   {kind:<10} {counts[kind]:>6,} puts  "
+                  f"{seconds[kind] / counts[kind] * 1000:8.2f}ms each")
+    print(f"\n   documents read      {raw_bytes / 1048576:10.1f} MB")
+    print(f"   gzip every run      {gzip_bytes / 1048576:10.1f} MB")
+    print(f"   archive             {totals['stored_bytes'] / 1048576:10.2f} MB  "
+          f"({totals['snapshots']:,} snapshots, {totals['deltas']:,} deltas)")
+    print(f"   verified: {'yes' if valid else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+COMPACT STORAGE BENCHMARK
+Database size and ingest rate for the same probe stream stored row per
+probe and in compact (run-length) mode
+
+The stream models stable endpoints: one probe per API per interval,
+latency jittering around a steady mean, and rare failures.
+
+Usage:
+    python benchmarks/bench_compact.py
+    python benchmarks/bench_compact.py --days 30 --interval 300 --failure-rate 0.001
+"""
+import argparse
+import os
+import random
+import shutil
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from common import BENCH_APIS, ledger_start, report, temp_db_path
+
+from database import TruthLedgerDB
+
+
+def stable_probes(days: float, interval: int, failure_rate: float, seed: int = 7):
+    """Probe stream for BENCH_APIS over days, ending now"""
+    rng = random.Random(seed)
+    steps = int(days * 86400 / interval)
+    start = ledger_start(0) - timedelta(seconds=steps * interval)
+    for step in range(steps):
+        for api_name in BENCH_APIS:
+            failed = rng.random() < failure_rate
+            yield {
+                "timestamp": (start + timedelta(seconds=step * interval + rng.random())).isoformat(),
+                "api_name": api_name,
+                "endpoint": f"https://{api_name}.example.com/health",
+                "status": "down" if failed else "up",
+                "response_time_ms": None if failed else max(1, int(rng.gauss(180, 20))),
+                "status_code": 503 if failed else 200,
+                "source": "direct_check",
+                "raw_response": ""
+            }
+
+
+def ingest(path: str, probes, compact: bool, batch: int):
+    db = TruthLedgerDB(path, compact=compact)
+    t0 = time.perf_counter()
+    for i in range(0, len(probes), batch):
+        db.insert_checks(probes[i:i + batch])
+    elapsed = time.perf_counter() - t0
+    rows = db.conn.execute("SELECT COUNT(*) FROM checks").fetchone()[0]
+    db.conn.execute("VACUUM")
+    db.close()
+    return elapsed, rows, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger compact storage benchmark")
+    parser.add_argument("--days", type=float, default=7,
+                        help="Days of probes to generate (default: 7)")
+    parser.add_argument("--interval", type=int, default=60,
+                        help="Seconds between probes of one API (default: 60)")
+    parser.add_argument("--failure-rate", type=float, default=0.0005,
+                        help="Fraction of failed probes (default: 0.0005)")
+    parser.add_argument("--batch", type=int, default=len(BENCH_APIS),
+                        help="Probes per insert_checks call (default: one cycle)")
+    args = parser.parse_args()
+    
+    probes = list(stable_probes(args.days, args.interval, args.failure_rate))
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - COMPACT STORAGE BENCHMARK")
+    print("=" * 80)
+    print(f"\n▶ {len(probes):,} probes: {len(BENCH_APIS)} APIs every {args.interval}s "
+          f"for {args.days:g} days, failure rate {args.failure_rate:g}")
+    
+    results = {}
+    for label, compact in (("row per probe", False), ("compact", True)):
+        path = temp_db_path(f"compact_{compact}.db")
+        elapsed, rows, size = ingest(path, probes, compact, args.batch)
+        report(f"ingest ({label})", len(probes), elapsed)
+        print(f"   {'':<40} {rows:>8,} rows stored, {size / 1024 / 1024:8.2f} MB")
+        results[compact] = (rows, size)
+        shutil.rmtree(Path(path).parent, ignore_errors=True)
+    
+    print(f"\n▶ Compact mode: {results[False][0] / results[True][0]:.1f}x fewer rows, "
+          f"{results[False][1] / results[True][1]:.1f}x smaller database")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+CONCURRENCY BENCHMARK
+Sustained ingest with N reader threads hammering uptime queries
+
+Compares the old layout (rollback journal, every component on its own
+read-write connection) with the WAL ledger service (one writer thread
+behind a queue, readers on a query_only pool).
+
+Usage:
+    python benchmarks/bench_concurrency.py
+    python benchmarks/bench_concurrency.py --readers 1 4 16 --seconds 5
+"""
+import argparse
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from common import BENCH_APIS, build_ledger, iter_synthetic_checks, temp_db_path
+
+from database import TruthLedgerDB
+from ledger_service import LedgerService
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def run_readers(count, stop, query, latencies):
+    """Start reader threads that loop uptime queries until stop is set"""
+    def worker(n):
+        samples = latencies[n]
+        i = n
+        while not stop.is_set():
+            api_name = BENCH_APIS[i % len(BENCH_APIS)]
+            t0 = time.perf_counter()
+            query(n, api_name)
+            samples.append((time.perf_counter() - t0) * 1000)
+            i += 1
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def ingest_for(seconds, offset, write, rate):
+    """
+    Write one probe cycle (a check per API) at a time for seconds,
+    paced to rate rows/sec (0 = as fast as possible)
+    """
+    written = 0
+    t0 = time.perf_counter()
+    deadline = t0 + seconds
+    while time.perf_counter() < deadline:
+        write(list(iter_synthetic_checks(len(BENCH_APIS), offset=offset + written)))
+        written += len(BENCH_APIS)
+        if rate:
+            time.sleep(max(0.0, t0 + written / rate - time.perf_counter()))
+    return written
+
+
+def bench_shared(path, readers, seconds, offset, rate):
+    """Rollback journal, one read-write connection per component"""
+    writer = TruthLedgerDB(path)
+    writer.conn.execute("PRAGMA journal_mode = DELETE")
+    conns = [TruthLedgerDB(path, read_only=True) for _ in range(readers)]
+    latencies = [[] for _ in range(readers)]
+    stop = threading.Event()
+    
+    threads = run_readers(
+        readers, stop,
+        lambda n, api: conns[n].get_api_uptime(api, hours=24),
+        latencies
+    )
+    t0 = time.perf_counter()
+    written = ingest_for(seconds, offset, writer.insert_checks, rate)
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    for conn in conns:
+        conn.close()
+    writer.close()
+    return written, elapsed, [x for samples in latencies for x in samples]
+
+
+def bench_service(path, readers, seconds, offset, rate):
+    """WAL, single writer thread behind a queue, query_only reader pool"""
+    service = LedgerService(path, readers=readers)
+    latencies = [[] for _ in range(readers)]
+    stop = threading.Event()
+    
+    def query(n, api_name):
+        with service.reader() as db:
+            db.get_api_uptime(api_name, hours=24)
+    
+    threads = run_readers(readers, stop, query, latencies)
+    t0 = time.perf_counter()
+    written = ingest_for(seconds, offset, service.submit_many, rate)
+    service.call(lambda db: None).result()  # everything queued has landed
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    service.close()
+    return written, elapsed, [x for samples in latencies for x in samples]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger concurrency benchmark")
+    parser.add_argument("--rows", type=int, default=200_000,
+                        help="Rows to prefill before measuring (default: 200000)")
+    parser.add_argument("--readers", nargs="+", type=int, default=[1, 4, 8],
+                        help="Reader thread counts (default: 1 4 8)")
+    parser.add_argument("--seconds", type=float, default=5.0,
+                        help="Ingest duration per run (default: 5)")
+    parser.add_argument("--rate", type=int, default=1000,
+                        help="Target ingest rows/sec, 0 for unthrottled (default: 1000)")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - CONCURRENCY BENCHMARK")
+    print("=" * 80)
+    
+    print(f"\n{'Layout':<10} {'Readers':>7} {'Ingest rows/s':>14} "
+          f"{'Queries/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print("-" * 80)
+    
+    for readers in args.readers:
+        for label, bench in (("shared", bench_shared), ("service", bench_service)):
+            path = temp_db_path(f"concurrency_{label}_{readers}.db")
+            build_ledger(path, args.rows).close()
+            
+            written, elapsed, latencies = bench(path, readers, args.seconds, args.rows, args.rate)
+            print(f"{label:<10} {readers:>7} {written / elapsed:>14,.0f} "
+                  f"{len(latencies) / elapsed:>10,.0f} "
+                  f"{percentile(latencies, 50):>8.2f} {percentile(latencies, 99):>8.2f} "
+                  f"{max(latencies, default=float('nan')):>8.2f}")
+            shutil.rmtree(Path(path).parent, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+DISCREPANCY SWEEP BENCHMARK
+A full discrepancy sweep over many APIs against local Statuspage
+servers that answer after a fixed delay, like a remote status page
+
+The serial path (one uptime query, one status page read and one proof
+lookup per API, in turn) is timed on a sample and scaled up; the
+pipelined sweep runs over every API: grouped uptime queries, status
+pages fetched concurrently with each URL read once.
+
+Usage:
+    python benchmarks/bench_discrepancy.py
+    python benchmarks/bench_discrepancy.py --apis 1000 --pages 200 --latency 0.05
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import temp_db_path
+
+from database import TruthLedgerDB
+from reveal_truth import DiscrepancyDetector
+from status_sources import StatusReader
+
+
+SUMMARY = json.dumps({
+    "status": {"indicator": "none"},
+    "components": [{"name": f"Component {i}", "status": "operational", "group": False}
+                   for i in range(40)],
+}).encode()
+INCIDENTS = json.dumps({"incidents": []}).encode()
+
+
+def start_status_server(latency: float) -> ThreadingHTTPServer:
+    """Serve every /page<N> as an all-operational Statuspage site"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = SUMMARY if self.path.endswith("summary.json") else INCIDENTS
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+    
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_fleet(path: str, apis: int, checks: int) -> list:
+    """A ledger of apis APIs probed over the last day; every 20th is flaky"""
+    db = TruthLedgerDB(path)
+    names = [f"api_{i:04d}" for i in range(apis)]
+    start = datetime.utcnow() - timedelta(hours=24)
+    step = timedelta(hours=24) / checks
+    batch = []
+    for n in range(checks):
+        for index, api_name in enumerate(names):
+            up = index % 20 or n % 5
+            batch.append({
+                "timestamp": (start + step * n + timedelta(milliseconds=index)).isoformat(),
+                "api_name": api_name,
+                "endpoint": f"https://{api_name}.example.com/health",
+                "status": "up" if up else "down",
+                "response_time_ms": 40 + (index * 37 + n) % 400,
+                "status_code": 200 if up else 503,
+                "source": "direct_check",
+            })
+        if len(batch) >= 50000:
+            db.insert_checks(batch)
+            batch = []
+    db.insert_checks(batch)
+    db.close()
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger discrepancy sweep benchmark")
+    parser.add_argument("--apis", type=int, default=1000,
+                        help="APIs in the sweep (default: 1000)")
+    parser.add_argument("--pages", type=int, default=200,
+                        help="Distinct status pages they share (default: 200)")
+    parser.add_argument("--checks", type=int, default=48,
+                        help="Checks per API over the last day (default: 48)")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Seconds each status document takes to serve (default: 0.05)")
+    parser.add_argument("--workers", type=int, default=32,
+                        help="Concurrent status fetches in the sweep (default: 32)")
+    parser.add_argument("--sample", type=int, default=50,
+                        help="APIs the serial path is timed on (default: 50)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - DISCREPANCY SWEEP BENCHMARK")
+    print("=" * 80)
+    path = temp_db_path("sweep.db")
+    print(f"\n▶ Building ledger: {args.apis:,} APIs x {args.checks} checks...")
+    names = build_fleet(path, args.apis, args.checks)
+    
+    server = start_status_server(args.latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    sources = {
+        api_name: {"verification_sources": [{
+            "type": "official_status",
+            "url": f"{base}/page{index % args.pages}",
+            "method": "statuspage",
+        }]}
+        for index, api_name in enumerate(names)
+    }
+    
+    print(f"\n▶ Serial path, timed on {args.sample} APIs "
+          f"({args.latency * 1000:.0f}ms per status document)")
+    reader = TruthLedgerDB(path, read_only=True)
+    status = StatusReader()
+    t0 = time.perf_counter()
+    for api_name in names[:args.sample]:
+        reader.get_api_uptime(api_name, hours=24)
+        status.official_status(sources[api_name])
+        reader.get_recent_checks(api_name, limit=100)
+    per_api = (time.perf_counter() - t0) / args.sample
+    status.close()
+    reader.close()
+    print(f"   {per_api * 1000:8.1f}ms per API -> {per_api * args.apis:8.1f}s "
+          f"for {args.apis:,} APIs")
+    
+    print(f"\n▶ Pipelined sweep over {args.apis:,} APIs, {args.pages} pages, "
+          f"{args.workers} workers")
+    detector = DiscrepancyDetector(path, workers=args.workers, sources=sources)
+    t0 = time.perf_counter()
+    found = detector.detect_all_discrepancies(hours=24)
+    elapsed = time.perf_counter() - t0
+    stats = detector.status_reader.cache_stats()
+    detector.close()
+    print(f"   {elapsed:8.2f}s  ({per_api * args.apis / elapsed:,.0f}x faster), "
+          f"{len(found)} discrepancies")
+    print(f"   {stats['downloaded']} status documents fetched for {args.apis:,} APIs")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+EXPORT BENCHMARK
+Throughput, output size and peak Python memory of the streaming export
+in each format, against loading the table with fetchall()
+
+Peak memory is traced with tracemalloc, which slows every run by the
+same factor; compare the runs with each other, not with the untraced
+rows/sec figure.
+
+Usage:
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --size 1M
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from common import build_ledger, parse_sizes, report, temp_db_path
+
+from ledger_export import FORMATS, export_table
+
+
+def traced(fn):
+    """Run fn under tracemalloc; returns (result, peak MB)"""
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger export benchmark")
+    parser.add_argument("--size", default="200k",
+                        help="Rows in the ledger (default: 200k)")
+    parser.add_argument("--chunk-size", type=int, default=5000,
+                        help="Rows per export page (default: 5000)")
+    args = parser.parse_args()
+    
+    size = parse_sizes([args.size])[0]
+    path = temp_db_path("export.db")
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - STREAMING EXPORT BENCHMARK")
+    print("=" * 80)
+    db = build_ledger(path, size)
+    directory = os.path.dirname(path)
+    
+    print(f"\n{size:,} checks, {args.chunk_size:,} rows per page\n")
+    for fmt in FORMATS:
+        output = os.path.join(directory, f"export.{fmt}")
+        result = export_table(db, "checks", output, fmt, chunk_size=args.chunk_size)
+        report(f"export {fmt}", result["rows"], result["seconds"])
+        _, peak = traced(lambda: export_table(
+            db, "checks", output, fmt, chunk_size=args.chunk_size
+        ))
+        print(f"      {result['bytes'] / 1048576:8.1f}MB written, "
+              f"peak memory {peak:6.1f}MB")
+    
+    t0 = time.perf_counter()
+    rows = [dict(row) for row in db.conn.execute("SELECT * FROM checks").fetchall()]
+    report("fetchall (baseline)", len(rows), time.perf_counter() - t0)
+    del rows
+    _, peak = traced(lambda: len([
+        dict(row) for row in db.conn.execute("SELECT * FROM checks").fetchall()
+    ]))
+    print(f"      peak memory {peak:6.1f}MB")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+HASH SCHEME BENCHMARK
+Hashing and chain-verification throughput for hash scheme v1 (sorted-key
+JSON) against v2 (fixed-field length-prefixed binary)
+
+Rows are generated in chunks outside the timed sections, so only the
+hashing and ChainVerifier.feed work is measured.
+
+Usage:
+    python benchmarks/bench_hash.py
+    python benchmarks/bench_hash.py --size 1M
+"""
+import argparse
+import time
+
+from common import BENCH_APIS, iter_synthetic_checks, ledger_start, parse_sizes, report
+
+from database import HASH_V1, HASH_V2, ChainVerifier, compute_check_hash
+
+
+def bench_version(version: int, size: int, chunk: int):
+    """Returns (hash seconds, verify seconds, verification errors)"""
+    start = ledger_start(size)
+    heads = {api_name: "" for api_name in BENCH_APIS}
+    verifiers = {api_name: ChainVerifier() for api_name in BENCH_APIS}
+    hash_seconds = verify_seconds = 0.0
+    
+    for offset in range(0, size, chunk):
+        checks = list(iter_synthetic_checks(min(chunk, size - offset), offset, start))
+        
+        t0 = time.perf_counter()
+        hashes = []
+        for check_data in checks:
+            api_name = check_data["api_name"]
+            check_hash = compute_check_hash(check_data, heads[api_name], version)
+            heads[api_name] = check_hash
+            hashes.append(check_hash)
+        hash_seconds += time.perf_counter() - t0
+        
+        # Rows shaped like CHAIN_COLUMNS results
+        rows = []
+        previous = {}
+        for i, (check_data, check_hash) in enumerate(zip(checks, hashes)):
+            api_name = check_data["api_name"]
+            row = dict(check_data, id=offset + i + 1, check_hash=check_hash,
+                       hash_version=version)
+            row["previous_hash"] = previous.get(api_name, verifiers[api_name].previous_hash)
+            previous[api_name] = check_hash
+            rows.append(row)
+        
+        t0 = time.perf_counter()
+        for row in rows:
+            verifiers[row["api_name"]].feed(row)
+        verify_seconds += time.perf_counter() - t0
+        
+        if size >= 1_000_000:
+            print(f"   v{version}: {offset + len(checks):,}/{size:,} rows", end="\r")
+    if size >= 1_000_000:
+        print()
+    
+    errors = sum(len(verifier.errors) for verifier in verifiers.values())
+    return hash_seconds, verify_seconds, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger hash scheme benchmark")
+    parser.add_argument("--size", default="10M",
+                        help="Rows to hash and verify (default: 10M)")
+    parser.add_argument("--chunk", type=int, default=100_000,
+                        help="Rows generated per chunk (default: 100000)")
+    args = parser.parse_args()
+    
+    size = parse_sizes([args.size])[0]
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - HASH SCHEME BENCHMARK")
+    print("=" * 80)
+    
+    results = {}
+    for version in (HASH_V1, HASH_V2):
+        print(f"\n▶ Hash scheme v{version}")
+        hash_seconds, verify_seconds, errors = bench_version(version, size, args.chunk)
+        report(f"v{version} hash", size, hash_seconds)
+        report(f"v{version} verify (ChainVerifier)", size, verify_seconds)
+        print(f"   chain check: {'OK' if not errors else f'{errors} errors'}")
+        results[version] = (hash_seconds, verify_seconds)
+    
+    print(f"\n▶ v2 speedup: hashing {results[HASH_V1][0] / results[HASH_V2][0]:.2f}x, "
+          f"verifying {results[HASH_V1][1] / results[HASH_V2][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+INGEST THROUGHPUT BENCHMARK
+Compares per-row insert_check commits against group-commit insert_checks
+
+The legacy path is reproduced here (commit per row, then a COUNT(*)
+scan and a second commit for total_checks) so both can be measured on
+the same ledger at 1k, 100k and 10M existing rows.
+
+Usage:
+    python benchmarks/bench_ingest.py
+    python benchmarks/bench_ingest.py --sizes 1k 100k --rows 5000
+"""
+import argparse
+import shutil
+import time
+from pathlib import Path
+
+from common import (build_ledger, iter_synthetic_checks, parse_sizes,
+                    report, temp_db_path)
+
+from database import HASH_V1
+
+
+def legacy_insert_check(db, check_data):
+    """The pre-batching insert path: two commits and a table scan per row"""
+    previous_hash = db.get_last_hash(check_data["api_name"]) or ""
+    check_hash = db.compute_check_hash(check_data, previous_hash, version=HASH_V1)
+    db.conn.execute("""
+        INSERT INTO checks (
+            timestamp, api_name, endpoint, status, response_time_ms,
+            status_code, source, raw_response, check_hash, previous_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        check_data["timestamp"], check_data["api_name"],
+        check_data["endpoint"], check_data["status"],
+        check_data.get("response_time_ms"), check_data.get("status_code"),
+        check_data["source"], check_data.get("raw_response", ""),
+        check_hash, previous_hash
+    ))
+    db.conn.commit()
+    db._update_metadata("total_checks", str(db.get_total_checks()))
+    return check_hash
+
+
+def run(size: int, rows: int, batch: int):
+    print(f"\n▶ Existing ledger size: {size:,} rows")
+    path = temp_db_path(f"ingest_{size}.db")
+    db = build_ledger(path, size)
+    offset = size
+    
+    checks = list(iter_synthetic_checks(rows, offset=offset))
+    t0 = time.perf_counter()
+    for check_data in checks:
+        legacy_insert_check(db, check_data)
+    report("legacy insert_check (per-row commit)", rows, time.perf_counter() - t0)
+    db.reload_chain_heads()  # legacy rows bypassed the head cache
+    offset += rows
+    
+    checks = list(iter_synthetic_checks(rows, offset=offset))
+    t0 = time.perf_counter()
+    for check_data in checks:
+        db.insert_check(check_data)
+    report("insert_check (running counter)", rows, time.perf_counter() - t0)
+    offset += rows
+    
+    checks = list(iter_synthetic_checks(rows, offset=offset))
+    t0 = time.perf_counter()
+    for i in range(0, rows, batch):
+        db.insert_checks(checks[i:i + batch])
+    report(f"insert_checks (batch={batch})", rows, time.perf_counter() - t0)
+    
+    is_valid, errors = db.verify_chain_integrity(checks[0]["api_name"])
+    print(f"   chain check after run: {'OK' if is_valid else errors[:3]}")
+    
+    db.close()
+    shutil.rmtree(Path(path).parent, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger ingest benchmark")
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k", "10M"],
+                        help="Existing ledger sizes (default: 1k 100k 10M)")
+    parser.add_argument("--rows", type=int, default=2000,
+                        help="Rows inserted per strategy (default: 2000)")
+    parser.add_argument("--batch", type=int, default=500,
+                        help="Batch size for insert_checks (default: 500)")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - INGEST BENCHMARK")
+    print("=" * 80)
+    for size in parse_sizes(args.sizes):
+        run(size, args.rows, args.batch)
+
+
+if __name__ == "__main__":
+    main()
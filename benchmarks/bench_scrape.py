@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+STATUS PAGE SCRAPE BENCHMARK
+CPU time and peak memory per scrape: the whole-document BeautifulSoup
+parse the scraper used to run, against the selector-targeted lxml
+pull parse
+
+Give it status pages saved from the real sites (--pages DIR of .html
+files, e.g. saved with curl -o) and the selector their sources declare;
+without --pages it builds a Statuspage-like page with inline scripts,
+90-day uptime bars and an incident history. Peak memory is measured in a
+fresh interpreter per parser, as growth of the process's peak RSS.
+The targeted parse reads claimed uptime from the selected elements
+only, so pages that show it elsewhere report None there.
+
+Usage:
+    python benchmarks/bench_scrape.py
+    python benchmarks/bench_scrape.py --pages saved_pages/ --selector .component-status
+"""
+import argparse
+import multiprocessing
+import re
+import resource
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import common  # noqa: F401  (puts the ledger modules on sys.path)
+from bs4 import BeautifulSoup
+
+from status_sources import HTMLScrapeAdapter
+
+UPTIME_PATTERNS = HTMLScrapeAdapter.UPTIME_PATTERNS
+
+
+def synthetic_page(components: int = 60, days: int = 90, incidents: int = 200) -> bytes:
+    """A large Statuspage-like page whose components carry .component-status"""
+    parts = ["<!DOCTYPE html><html><head><title>Example Status</title>"]
+    parts.append("<script>window.pageData = {" + ",".join(
+        f'"k{i}": "major outage down degraded {i}"' for i in range(8000)) + "};</script>")
+    parts.append("<style>" + "".join(f".c{i} {{ color: #{i:06x}; }}" for i in range(3000))
+                 + "</style></head><body><div class='components-container'>")
+    for c in range(components):
+        parts.append(f"<div class='component-container'><div class='component-inner-container'>"
+                     f"<span class='name'>Component {c}</span>"
+                     f"<span class='component-status'>Operational</span>"
+                     f"<svg class='availability-time-line-graphic'>")
+        parts.extend(f"<rect height='34' width='3' x='{d * 5}' y='0' class='uptime-day'"
+                     f" data-html='true' data-title='No downtime recorded'></rect>"
+                     for d in range(days))
+        parts.append(f"</svg><div class='legend-item'>{99 + c % 100 / 100:.2f}% uptime</div>"
+                     f"</div></div>")
+    parts.append("</div><div class='incidents-list'>")
+    parts.extend(f"<div class='incident-container'><div class='incident-title'>"
+                 f"Major outage of component {i % components}</div><div class='updates'>"
+                 f"<span class='whitespace-pre-wrap'>Resolved - the issue is down to a bad "
+                 f"deploy and services are operational again.</span></div></div>"
+                 for i in range(incidents))
+    parts.append("</div></body></html>")
+    return "".join(parts).encode()
+
+
+def scrape_whole(content: bytes, selector: str) -> Dict:
+    """The scraper before: BeautifulSoup html.parser over the whole page"""
+    text = BeautifulSoup(content.decode("utf-8", "replace"), "html.parser").get_text().lower()
+    if "operational" in text or "all systems" in text:
+        claimed_status = "up"
+    elif "outage" in text or "down" in text:
+        claimed_status = "down"
+    elif "degraded" in text or "issues" in text:
+        claimed_status = "degraded"
+    else:
+        claimed_status = "unknown"
+    claimed_uptime = None
+    for pattern in UPTIME_PATTERNS:
+        match = re.search(pattern.pattern, text)
+        if match:
+            claimed_uptime = float(match.group(1))
+            break
+    return {"claimed_status": claimed_status, "claimed_uptime": claimed_uptime}
+
+
+def scrape_targeted(content: bytes, selector: str) -> Dict:
+    """The scraper now: streaming lxml parse of the selected elements"""
+    return HTMLScrapeAdapter().parse_html(content, selector)
+
+
+SCRAPERS = {"bs4 whole page": scrape_whole, "lxml targeted": scrape_targeted}
+
+
+def peak_growth_kb(scraper: str, content: bytes, selector: str, queue) -> None:
+    """Child process: peak RSS growth (KB) of one scrape"""
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    SCRAPERS[scraper](content, selector)
+    queue.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+
+
+def measure(scraper: str, content: bytes, selector: str, repeat: int) -> Tuple[float, int, Dict]:
+    """(CPU ms per scrape, peak RSS growth in KB, claim)"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    child = context.Process(target=peak_growth_kb, args=(scraper, content, selector, queue))
+    child.start()
+    peak_kb = queue.get()
+    child.join()
+    
+    claim = SCRAPERS[scraper](content, selector)
+    t0 = time.process_time()
+    for _ in range(repeat):
+        SCRAPERS[scraper](content, selector)
+    cpu_ms = (time.process_time() - t0) / repeat * 1000
+    return cpu_ms, peak_kb, claim
+
+
+def load_pages(directory: str) -> List[Tuple[str, bytes]]:
+    pages = [(path.name, path.read_bytes()) for path in sorted(Path(directory).glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No .html files in {directory}")
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger status page scrape benchmark")
+    parser.add_argument("--pages", help="Directory of saved status pages (*.html)")
+    parser.add_argument("--selector", default=".component-status",
+                        help="Selector the sources declare (default: .component-status)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Scrapes per page for the CPU timing (default: 5)")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - STATUS PAGE SCRAPE BENCHMARK")
+    print("=" * 80)
+    pages = load_pages(args.pages) if args.pages else [("synthetic.html", synthetic_page())]
+    
+    for name, content in pages:
+        print(f"\n▶ {name} ({len(content) / 1024:,.0f} KB), selector {args.selector}")
+        results = {}
+        for scraper in SCRAPERS:
+            cpu_ms, peak_kb, claim = measure(scraper, content, args.selector, args.repeat)
+            results[scraper] = (cpu_ms, peak_kb)
+            print(f"   {scraper:<16} {cpu_ms:9.1f}ms CPU  {peak_kb / 1024:8.1f} MB peak  "
+                  f"{claim['claimed_status']}, uptime {claim['claimed_uptime']}")
+        (before_ms, before_kb), (after_ms, after_kb) = results.values()
+        print(f"   {before_ms / max(after_ms, 1e-6):.1f}x less CPU, "
+              f"{(before_kb - after_kb) / 1024:.1f} MB less peak memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+STREAMING DETECTOR BENCHMARK
+Cost of keeping 1h/24h/7d uptime current as checks arrive: re-running
+the window queries against the ledger after every check, against the
+streaming detector's ring-buffer counters
+
+Usage:
+    python benchmarks/bench_streaming.py
+    python benchmarks/bench_streaming.py --size 1M --checks 20000
+"""
+import argparse
+import time
+
+from common import BENCH_APIS, build_ledger, iter_synthetic_checks, parse_sizes, temp_db_path
+
+from database import utc_now_ms
+from streaming_detector import WINDOWS, StreamingDetector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger streaming detector benchmark")
+    parser.add_argument("--size", nargs="+", default=["200k"],
+                        help="Ledger sizes before the stream starts (default: 200k)")
+    parser.add_argument("--checks", type=int, default=10000,
+                        help="Checks streamed through the detector (default: 10000)")
+    parser.add_argument("--sample", type=int, default=200,
+                        help="Checks the query path is timed on (default: 200)")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - STREAMING DETECTOR BENCHMARK")
+    print("=" * 80)
+    for rows in parse_sizes(args.size):
+        print(f"\n▶ Ledger of {rows:,} checks over {len(BENCH_APIS)} APIs")
+        db = build_ledger(temp_db_path("streaming.db"), rows)
+        stream = list(iter_synthetic_checks(args.checks, offset=rows))
+        
+        t0 = time.perf_counter()
+        for check in stream[:args.sample]:
+            now_ms = utc_now_ms()
+            for _, window_ms, _ in WINDOWS:
+                db.get_window_stats(check["api_name"], now_ms - window_ms, now_ms)
+        per_query = (time.perf_counter() - t0) / args.sample
+        print(f"   {'window queries per check':<28} {per_query * 1e6:10.1f}µs per check")
+        
+        detector = StreamingDetector()
+        t0 = time.perf_counter()
+        detector.seed(db)
+        seeded = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for check in stream:
+            detector.observe(check)
+        per_stream = (time.perf_counter() - t0) / len(stream)
+        print(f"   {'streaming counters':<28} {per_stream * 1e6:10.1f}µs per check "
+              f"({per_query / per_stream:,.0f}x faster), seeded in {seeded:.2f}s")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+SYNC BENCHMARK
+Anti-entropy sync between two regional ledgers: the first full merge,
+then a no-op sync and syncs after a growing number of new checks
+
+Only the first merge should cost in proportion to the ledger; after it,
+time and bytes should follow the number of new checks.
+
+Usage:
+    python benchmarks/bench_sync.py
+    python benchmarks/bench_sync.py --size 1M
+"""
+import argparse
+import os
+
+from common import build_ledger, iter_synthetic_checks, ledger_start, parse_sizes, temp_db_path
+
+from database import TruthLedgerDB
+from ledger_sync import Channel, SyncEndpoint, get_vantage, sync
+
+
+def run_sync(local: TruthLedgerDB, peer: TruthLedgerDB, label: str, rows: int):
+    """Sync local with peer and print what it cost"""
+    channel = Channel(SyncEndpoint(peer, "us"))
+    stats = sync(SyncEndpoint(local, "eu"), channel)
+    levels = stats["levels"]
+    moved = stats["pulled"].get("imported", 0) + stats["pushed"].get("imported", 0)
+    print(f"   {label:<24} {rows:>8,} new  {stats['seconds']:8.3f}s  "
+          f"{(channel.bytes_sent + channel.bytes_received) / 1024:10.1f}KB  "
+          f"{levels['days_differing']:>4} days {levels['hours_differing']:>5} hours  "
+          f"{moved:>8,} rows moved")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger sync benchmark")
+    parser.add_argument("--size", default="200k",
+                        help="Rows in the first ledger (default: 200k)")
+    args = parser.parse_args()
+    
+    size = parse_sizes([args.size])[0]
+    path = temp_db_path("eu.db")
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - ANTI-ENTROPY SYNC BENCHMARK")
+    print("=" * 80)
+    local = build_ledger(path, size)
+    peer = TruthLedgerDB(os.path.join(os.path.dirname(path), "us.db"))
+    get_vantage(local, "eu")
+    get_vantage(peer, "us")
+    
+    print(f"\n{size:,} checks in eu, us empty\n")
+    run_sync(local, peer, "first merge", size)
+    run_sync(local, peer, "no-op", 0)
+    
+    # New checks continue the synthetic fleet from where it stopped
+    start = ledger_start(size)
+    offset = size
+    for count in (20, 200, 2000):
+        local.insert_checks(list(iter_synthetic_checks(count, offset=offset, start=start)))
+        offset += count
+        run_sync(local, peer, f"after {count:,} checks", count)
+    local.close()
+    peer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+UPTIME QUERY BENCHMARK
+Compares the legacy datetime(timestamp) filter against the indexed
+ts_epoch_ms range, and times the ts_epoch_ms backfill migration
+
+Usage:
+    python benchmarks/bench_uptime_query.py
+    python benchmarks/bench_uptime_query.py --size 100k --windows 24 720
+"""
+import argparse
+import shutil
+import time
+from pathlib import Path
+
+from common import BENCH_APIS, build_ledger, parse_sizes, temp_db_path
+
+
+LEGACY_UPTIME_SQL = """
+    SELECT 
+        COUNT(*) as total_checks,
+        SUM(CASE WHEN status = 'up' THEN 1 ELSE 0 END) as successful_checks,
+        AVG(response_time_ms) as avg_response_time,
+        MIN(timestamp) as first_check,
+        MAX(timestamp) as last_check
+    FROM checks
+    WHERE api_name = ?
+    AND datetime(timestamp) >= datetime('now', '-' || ? || ' hours')
+"""
+
+
+def time_queries(fn, repeats: int) -> float:
+    """Average milliseconds per uptime query across all bench APIs"""
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for api_name in BENCH_APIS:
+            fn(api_name)
+    return (time.perf_counter() - t0) * 1000 / (repeats * len(BENCH_APIS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Truth Ledger uptime query benchmark")
+    parser.add_argument("--size", default="10M",
+                        help="Ledger size in rows (default: 10M)")
+    parser.add_argument("--windows", nargs="+", type=int, default=[1, 24, 168, 720],
+                        help="Uptime windows in hours (default: 1 24 168 720)")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Passes over all APIs per measurement (default: 3)")
+    args = parser.parse_args()
+    
+    size = parse_sizes([args.size])[0]
+    path = temp_db_path(f"uptime_{size}.db")
+    
+    print("=" * 80)
+    print("TRUTH LEDGER - UPTIME QUERY BENCHMARK")
+    print("=" * 80)
+    print(f"\n▶ Building {size:,}-row ledger...")
+    db = build_ledger(path, size)
+    
+    print("\n▶ Backfill migration (ts_epoch_ms from ISO timestamp)")
+    with db.conn:
+        db.conn.execute("UPDATE checks SET ts_epoch_ms = NULL")
+    t0 = time.perf_counter()
+    db._migrate_checks_table()
+    elapsed = time.perf_counter() - t0
+    print(f"   backfilled {size:,} rows in {elapsed:.2f}s "
+          f"({size / elapsed:,.0f} rows/sec)")
+    
+    print("\n▶ Per-API uptime query latency")
+    print(f"   {'Window':>8}  {'before (ms)':>12}  {'after (ms)':>12}  {'speedup':>8}")
+    for hours in args.windows:
+        before = time_queries(
+            lambda api: db.conn.execute(LEGACY_UPTIME_SQL, (api, hours)).fetchone(),
+            args.repeats
+        )
+        after = time_queries(
+            lambda api: db.get_api_uptime(api, hours=hours),
+            args.repeats
+        )
+        print(f"   {hours:>7}h  {before:>12.3f}  {after:>12.3f}  {before / after:>7.1f}x")
+    
+    db.close()
+    shutil.rmtree(Path(path).parent, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Shared helpers for the Truth Ledger benchmarks
+Builds synthetic ledgers of a given size as fast as SQLite allows
+"""
+
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+# Benchmarks live one level below the ledger modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import TruthLedgerDB  # noqa: E402
+
+
+BENCH_APIS = [f"api_{i:02d}" for i in range(20)]
+
+# Each API is probed once a minute, so the fleet writes a row every 3s
+ROW_SECONDS = 60 / len(BENCH_APIS)
+
+
+def ledger_start(rows: int, end: datetime = None) -> datetime:
+    """Start time that makes a ledger of rows checks end at end (now)"""
+    return (end or datetime.utcnow()) - timedelta(seconds=rows * ROW_SECONDS)
+
+
+def synthetic_check(i: int, start: datetime) -> Dict:
+    """Build the i-th synthetic check, cycling through BENCH_APIS"""
+    api_name = BENCH_APIS[i % len(BENCH_APIS)]
+    is_up = i % 97 != 0
+    return {
+        "timestamp": (start + timedelta(seconds=i * ROW_SECONDS)).isoformat(),
+        "api_name": api_name,
+        "endpoint": f"https://{api_name}.example.com/health",
+        "status": "up" if is_up else "down",
+        "response_time_ms": 40 + (i * 37) % 400,
+        "status_code": 200 if is_up else 503,
+        "source": "direct_check",
+        "raw_response": ""
+    }
+
+
+def iter_synthetic_checks(count: int, offset: int = 0,
+                          start: datetime = None) -> Iterator[Dict]:
+    """Yield count synthetic checks starting at index offset"""
+    start = start or ledger_start(offset)
+    for i in range(offset, offset + count):
+        yield synthetic_check(i, start)
+
+
+def build_ledger(path: str, rows: int, chunk: int = 50000) -> TruthLedgerDB:
+    """
+    Create a ledger at path holding rows valid, hash-chained checks
+    ending now. Uses the group-commit ingest path in large chunks.
+    """
+    start = ledger_start(rows)
+    db = TruthLedgerDB(path)
+    existing = db.get_total_checks()
+    done = existing
+    t0 = time.perf_counter()
+    while done < rows:
+        n = min(chunk, rows - done)
+        db.insert_checks(list(iter_synthetic_checks(n, offset=done, start=start)))
+        done += n
+        if rows >= 1_000_000:
+            elapsed = time.perf_counter() - t0
+            print(f"   prefill {done:,}/{rows:,} rows "
+                  f"({(done - existing) / elapsed:,.0f} rows/sec)", end="\r")
+    if rows >= 1_000_000:
+        print()
+    return db
+
+
+def temp_db_path(name: str) -> str:
+    """Path for a scratch ledger inside a fresh temporary directory"""
+    directory = tempfile.mkdtemp(prefix="truth_ledger_bench_")
+    return os.path.join(directory, name)
+
+
+def report(label: str, rows: int, seconds: float):
+    """Print a single benchmark result line"""
+    rate = rows / seconds if seconds > 0 else float("inf")
+    print(f"   {label:<40} {rows:>8,} rows in {seconds:8.3f}s  "
+          f"{rate:>12,.0f} rows/sec")
+
+
+def parse_sizes(values: List[str]) -> List[int]:
+    """Parse sizes such as 1k, 100k or 10M"""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    sizes = []
+    for value in values:
+        value = value.strip().lower()
+        if value[-1] in multipliers:
+            sizes.append(int(float(value[:-1]) * multipliers[value[-1]]))
+        else:
+            sizes.append(int(value))
+    return sizes
@@ -6,23 +6,431 @@ Immutable logging with cryptographic verification
 import sqlite3
 import hashlib
 import json
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+from latency_histogram import PERCENTILES, LatencyHistogram, merge_histogram_json
+from merkle import build_levels, inclusion_path, merkle_root, verify_inclusion_proof
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+# APIs per grouped query in get_window_stats_many (under SQLite's
+# default limit on bound parameters)
+STATS_BATCH = 500
+
+# Rollup tables and their bucket widths
+ROLLUP_TABLES = (
+    ("api_rollup_hourly", HOUR_MS),
+    ("api_rollup_daily", DAY_MS),
+)
+
+
+def iso_to_epoch_ms(timestamp: str) -> int:
+    """
+    Convert an ISO-8601 check timestamp to integer epoch milliseconds
+    Naive timestamps are UTC (the monitor writes datetime.utcnow())
+    """
+    dt = datetime.fromisoformat(timestamp)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(milliseconds=1)
+
+
+def epoch_ms_to_iso(ts_epoch_ms: int) -> str:
+    """Integer epoch milliseconds to a naive UTC ISO-8601 timestamp"""
+    return (_EPOCH + timedelta(milliseconds=ts_epoch_ms)).replace(tzinfo=None).isoformat()
+
+
+def utc_now_ms() -> int:
+    """Current time as integer epoch milliseconds"""
+    return (datetime.now(timezone.utc) - _EPOCH) // timedelta(milliseconds=1)
+
+
+# Hash schemes: v1 hashes sorted-key JSON, v2 a fixed-field binary
+# encoding. Every row records the scheme it was hashed with.
+HASH_V1 = 1
+HASH_V2 = 2
+HASH_VERSIONS = (HASH_V1, HASH_V2)
+CURRENT_HASH_VERSION = HASH_V2
+
+# v2 hashers start from a copy of this domain-separated state
+_V2_HASHER = hashlib.sha256(b"truth-ledger/check/v2\x00")
+_U32 = struct.Struct(">I").pack
+_I64 = struct.Struct(">q").pack
+
+
+def _v2_int(value: Optional[int]) -> bytes:
+    return b"\x00" if value is None else b"\x01" + _I64(int(value))
+
+
+def _v2_encode(timestamp: str, api_name: str, endpoint: str, status: str,
+               response_time_ms: Optional[int], status_code: Optional[int],
+               source: str, previous_hash: str) -> bytes:
+    ts = timestamp.encode()
+    api = api_name.encode()
+    ep = endpoint.encode()
+    st = status.encode()
+    src = source.encode()
+    prev = previous_hash.encode()
+    return b"".join((
+        _U32(len(ts)), ts, _U32(len(api)), api, _U32(len(ep)), ep,
+        _U32(len(st)), st, _v2_int(response_time_ms), _v2_int(status_code),
+        _U32(len(src)), src, _U32(len(prev)), prev
+    ))
+
+
+def compute_check_hash_v2(timestamp: str, api_name: str, endpoint: str,
+                          status: str, response_time_ms: Optional[int],
+                          status_code: Optional[int], source: str,
+                          previous_hash: str) -> str:
+    """
+    Hash scheme v2: fields in a fixed order, strings as u32 length +
+    UTF-8 bytes, nullable integers as a presence byte + i64
+    """
+    hasher = _V2_HASHER.copy()
+    hasher.update(_v2_encode(
+        timestamp, api_name, endpoint, status, response_time_ms,
+        status_code, source, previous_hash
+    ))
+    return hasher.hexdigest()
+
+
+def compute_check_hash(check_data: Dict, previous_hash: str = "",
+                       version: int = HASH_V1) -> str:
+    """
+    Compute cryptographic hash for check
+    Creates blockchain-like chain of hashes
+    """
+    if version == HASH_V2:
+        return compute_check_hash_v2(
+            check_data["timestamp"], check_data["api_name"],
+            check_data["endpoint"], check_data["status"],
+            check_data.get("response_time_ms"), check_data.get("status_code"),
+            check_data["source"], previous_hash
+        )
+    if version != HASH_V1:
+        raise ValueError(f"Unknown hash version: {version}")
+    
+    # Canonical representation for hashing
+    canonical = json.dumps({
+        "timestamp": check_data["timestamp"],
+        "api_name": check_data["api_name"],
+        "endpoint": check_data["endpoint"],
+        "status": check_data["status"],
+        "response_time_ms": check_data.get("response_time_ms"),
+        "status_code": check_data.get("status_code"),
+        "source": check_data["source"],
+        "previous_hash": previous_hash
+    }, sort_keys=True)
+    
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# Compact storage: a checks row whose run_count > 1 stands for a run of
+# identical probes. run_digest folds every extra probe in (v2 encoding),
+# and the next row chains to a seal over the run fields instead of the
+# bare check_hash, so editing a run breaks the chain like any other edit.
+_RUN_HASHER = hashlib.sha256(b"truth-ledger/run/v1\x00")
+_RUN_SEAL_HASHER = hashlib.sha256(b"truth-ledger/run-seal/v1\x00")
+
+
+def run_latency_bucket(response_time_ms: Optional[int]) -> int:
+    """Power-of-two latency bucket that a run must stay inside"""
+    return -1 if response_time_ms is None else int(response_time_ms).bit_length()
+
+
+def fold_run_digest(run_digest: str, check_data: Dict) -> str:
+    """Fold one more probe into a run's rolling digest"""
+    hasher = _RUN_HASHER.copy()
+    hasher.update(_v2_encode(
+        check_data["timestamp"], check_data["api_name"],
+        check_data["endpoint"], check_data["status"],
+        check_data.get("response_time_ms"), check_data.get("status_code"),
+        check_data["source"], run_digest
+    ))
+    return hasher.hexdigest()
+
+
+def chain_link(row) -> str:
+    """
+    The hash the next row in the chain must carry as previous_hash
+    A plain row links by check_hash; a run links by a seal over its
+    check_hash, count, last_seen, latency sum and digest
+    """
+    if (row["run_count"] or 1) <= 1:
+        return row["check_hash"]
+    last_seen = row["run_last_seen"].encode()
+    hasher = _RUN_SEAL_HASHER.copy()
+    hasher.update(b"".join((
+        row["check_hash"].encode(), _I64(row["run_count"]),
+        _U32(len(last_seen)), last_seen, _v2_int(row["run_latency_sum"]),
+        row["run_digest"].encode()
+    )))
+    return hasher.hexdigest()
+
+
+# Metadata keys for where a ledger's chains and Merkle batches pick up
+# after older rows were carved out into segments (see ledger_segments)
+CHAIN_ANCHOR_PREFIX = "chain_anchor:"
+MERKLE_ANCHOR_KEY = "merkle_anchor"
+
+# A ledger's own probes have vantage ""; rows merged in from another
+# region keep that region's name. Every (api_name, vantage) pair is a
+# hash chain of its own.
+LOCAL_VANTAGE = ""
+
+
+def chain_key(api_name: str, vantage: str = LOCAL_VANTAGE) -> str:
+    """Name of a hash chain: the API, plus @vantage for another region's probes"""
+    return f"{api_name}@{vantage}" if vantage else api_name
+
+
+def split_chain_key(key: str) -> Tuple[str, str]:
+    """(api_name, vantage) back from a chain_key"""
+    if "@" not in key:
+        return key, LOCAL_VANTAGE
+    api_name, _, vantage = key.rpartition("@")
+    return api_name, vantage
+
+
+# Columns a ChainVerifier needs from each checks row
+CHAIN_COLUMNS = """id, timestamp, api_name, endpoint, status,
+                   response_time_ms, status_code, source,
+                   check_hash, previous_hash, hash_version,
+                   run_count, run_last_seen, run_latency_sum, run_digest,
+                   vantage"""
+
+
+class ChainVerifier:
+    """
+    Streaming verifier for one API's hash chain
+    Feed rows (selected with CHAIN_COLUMNS) in id order; each row is
+    re-hashed with the scheme it records, so mixed-version chains verify
+    """
+    
+    def __init__(self, previous_hash: str = ""):
+        self.previous_hash = previous_hash
+        self.errors: List[str] = []
+        self.last_id: Optional[int] = None
+        self.last_check_hash: Optional[str] = None
+        self.rows = 0
+    
+    def feed(self, row):
+        """Verify one row against the chain so far"""
+        version = row["hash_version"]
+        
+        # Compute what hash should be
+        if version == HASH_V2:
+            expected_hash = compute_check_hash_v2(
+                row["timestamp"], row["api_name"], row["endpoint"],
+                row["status"], row["response_time_ms"], row["status_code"],
+                row["source"], self.previous_hash
+            )
+        elif version == HASH_V1:
+            # Reconstruct check data
+            check_data = {
+                "timestamp": row["timestamp"],
+                "api_name": row["api_name"],
+                "endpoint": row["endpoint"],
+                "status": row["status"],
+                "response_time_ms": row["response_time_ms"],
+                "status_code": row["status_code"],
+                "source": row["source"]
+            }
+            expected_hash = compute_check_hash(check_data, self.previous_hash)
+        else:
+            expected_hash = None
+            self.errors.append(f"Check {row['id']}: unknown hash_version {version}")
+        
+        # Verify previous_hash matches
+        if row["previous_hash"] != self.previous_hash:
+            self.errors.append(
+                f"Check {row['id']}: previous_hash mismatch. "
+                f"Expected: {self.previous_hash}, Got: {row['previous_hash']}"
+            )
+        
+        # Verify current hash
+        if expected_hash is not None and row["check_hash"] != expected_hash:
+            self.errors.append(
+                f"Check {row['id']}: check_hash mismatch. "
+                f"Expected: {expected_hash}, Got: {row['check_hash']}"
+            )
+        
+        self.previous_hash = chain_link(row)
+        self.last_id = row["id"]
+        self.last_check_hash = row["check_hash"]
+        self.rows += 1
+
+
+# Columns of every rollup table: one row per API, vantage and bucket
+_ROLLUP_SCHEMA = """
+    api_name TEXT NOT NULL,
+    vantage TEXT NOT NULL DEFAULT '',
+    bucket_start_ms INTEGER NOT NULL,
+    total_count INTEGER NOT NULL,
+    up_count INTEGER NOT NULL,
+    down_count INTEGER NOT NULL,
+    timeout_count INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    latency_count INTEGER NOT NULL,
+    latency_sum INTEGER NOT NULL,
+    latency_min INTEGER,
+    latency_max INTEGER,
+    latency_hist TEXT NOT NULL,
+    first_timestamp TEXT NOT NULL,
+    last_timestamp TEXT NOT NULL,
+    PRIMARY KEY (api_name, vantage, bucket_start_ms)
+"""
+
+
+class RollupAccumulator:
+    """
+    Aggregates checks into per-bucket rollup deltas
+    Deltas are applied with upserts, so the same accumulator serves
+    the insert path and a full rebuild
+    """
+    
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, str, str, int], Dict] = {}
+    
+    def add(self, api_name: str, status: str, response_time_ms: Optional[int],
+            timestamp: str, ts_epoch_ms: int, count: int = 1,
+            latency_sum: Optional[int] = None, last_timestamp: Optional[str] = None,
+            vantage: str = LOCAL_VANTAGE):
+        """
+        Fold count identical probes into every rollup they belong to
+        A compact run passes its exact latency_sum and last_timestamp
+        """
+        if status in ("up", "timeout", "error"):
+            outcome = status
+        else:
+            outcome = "down"
+        
+        for table, width in ROLLUP_TABLES:
+            key = (table, api_name, vantage, ts_epoch_ms - ts_epoch_ms % width)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = {
+                    "total": 0, "up": 0, "down": 0, "timeout": 0, "error": 0,
+                    "latency_count": 0, "latency_sum": 0,
+                    "latency_min": None, "latency_max": None,
+                    "hist": LatencyHistogram(),
+                    "first": timestamp, "last": timestamp
+                }
+            
+            bucket["total"] += count
+            bucket[outcome] += count
+            bucket["first"] = min(bucket["first"], timestamp)
+            bucket["last"] = max(bucket["last"], last_timestamp or timestamp)
+            
+            if response_time_ms is not None:
+                bucket["latency_count"] += count
+                bucket["latency_sum"] += (
+                    response_time_ms * count if latency_sum is None else latency_sum
+                )
+                if bucket["latency_min"] is None or response_time_ms < bucket["latency_min"]:
+                    bucket["latency_min"] = response_time_ms
+                if bucket["latency_max"] is None or response_time_ms > bucket["latency_max"]:
+                    bucket["latency_max"] = response_time_ms
+                bucket["hist"].add(response_time_ms, count)
+    
+    def flush(self, conn: sqlite3.Connection):
+        """Upsert accumulated deltas (caller owns the transaction)"""
+        for (table, api_name, vantage, bucket_start_ms), bucket in self.buckets.items():
+            conn.execute(f"""
+                INSERT INTO {table} (
+                    api_name, vantage, bucket_start_ms, total_count, up_count,
+                    down_count, timeout_count, error_count, latency_count,
+                    latency_sum, latency_min, latency_max, latency_hist,
+                    first_timestamp, last_timestamp
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(api_name, vantage, bucket_start_ms) DO UPDATE SET
+                    total_count = total_count + excluded.total_count,
+                    up_count = up_count + excluded.up_count,
+                    down_count = down_count + excluded.down_count,
+                    timeout_count = timeout_count + excluded.timeout_count,
+                    error_count = error_count + excluded.error_count,
+                    latency_count = latency_count + excluded.latency_count,
+                    latency_sum = latency_sum + excluded.latency_sum,
+                    latency_min = MIN(COALESCE(latency_min, excluded.latency_min),
+                                      COALESCE(excluded.latency_min, latency_min)),
+                    latency_max = MAX(COALESCE(latency_max, excluded.latency_max),
+                                      COALESCE(excluded.latency_max, latency_max)),
+                    latency_hist = hist_merge(latency_hist, excluded.latency_hist),
+                    first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+                    last_timestamp = MAX(last_timestamp, excluded.last_timestamp)
+            """, (
+                api_name, vantage, bucket_start_ms, bucket["total"], bucket["up"],
+                bucket["down"], bucket["timeout"], bucket["error"],
+                bucket["latency_count"], bucket["latency_sum"],
+                bucket["latency_min"], bucket["latency_max"],
+                bucket["hist"].to_json(), bucket["first"], bucket["last"]
+            ))
+        self.buckets.clear()
+
 
 class TruthLedgerDB:
     """Immutable database for API truth verification"""
     
-    def __init__(self, db_path: str = "truth_ledger.db"):
+    def __init__(self, db_path: str = "truth_ledger.db", read_only: bool = False,
+                 hash_version: int = CURRENT_HASH_VERSION, compact: bool = False,
+                 connection: Optional[sqlite3.Connection] = None):
+        """
+        read_only opens a query_only connection that never migrates or
+        writes (checkpoint saves are skipped). Read-only connections may
+        be handed between threads, one user at a time.
+        connection wraps an already open connection read-only instead,
+        e.g. one whose checks and rollups are views over several files.
+        hash_version picks the scheme new checks are hashed with.
+        compact stores runs of identical probes as one row (see
+        insert_checks); once used, the ledger is marked compact for good.
+        """
+        if hash_version not in HASH_VERSIONS:
+            raise ValueError(f"Unknown hash version: {hash_version}")
         self.db_path = Path(db_path)
+        self.read_only = read_only or connection is not None
+        self.hash_version = hash_version
+        self.compact = compact
         self.conn = None
-        self.initialize_database()
+        
+        # Per-API chain head rows, valid while PRAGMA data_version is unchanged
+        self._chain_heads: Optional[Dict[str, Dict]] = None
+        self._heads_version: Optional[int] = None
+        if connection is not None:
+            self.conn = connection
+        elif read_only:
+            self._open_read_only()
+        else:
+            self.initialize_database()
+    
+    def _open_read_only(self):
+        """Open an existing ledger for queries only"""
+        self.conn = sqlite3.connect(
+            f"file:{self.db_path.resolve()}?mode=ro", uri=True,
+            check_same_thread=False
+        )
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA query_only = 1")
+        self.conn.execute("PRAGMA busy_timeout = 5000")
     
     def initialize_database(self):
         """Create database schema with immutability constraints"""
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        
+        # WAL lets readers run alongside the writer instead of blocking
+        # on the rollback journal; the mode persists in the file
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA busy_timeout = 5000")
+        self.conn.create_function(
+            "hist_merge", 2, merge_histogram_json, deterministic=True
+        )
         cursor = self.conn.cursor()
         
         # Main checks table - immutable by design
@@ -39,16 +447,39 @@ class TruthLedgerDB:
                 raw_response TEXT,
                 check_hash TEXT NOT NULL UNIQUE,
                 previous_hash TEXT,
-                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                ts_epoch_ms INTEGER,
+                hash_version INTEGER NOT NULL DEFAULT 1,
+                run_count INTEGER NOT NULL DEFAULT 1,
+                run_last_seen TEXT,
+                run_latency_sum INTEGER,
+                run_digest TEXT,
+                vantage TEXT NOT NULL DEFAULT ''
             )
         """)
         
+        self._migrate_checks_table()
+        
         # Index for fast lookups
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_checks_api_timestamp 
             ON checks(api_name, timestamp DESC)
         """)
         
+        # Chain walks (verification, audits) scan one (API, vantage)
+        # chain in id order; this replaces the older (api_name, id) index
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_checks_chain
+            ON checks(api_name, vantage, id)
+        """)
+        cursor.execute("DROP INDEX IF EXISTS idx_checks_api_id")
+        
+        # Range queries filter on the integer epoch column
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_checks_api_epoch
+            ON checks(api_name, ts_epoch_ms)
+        """)
+        
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_checks_hash 
             ON checks(check_hash)
@@ -68,10 +499,40 @@ class TruthLedgerDB:
                 proof_hashes TEXT NOT NULL,
                 evidence_url TEXT,
                 severity TEXT NOT NULL,
-                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                merkle_proofs TEXT,
+                latency_percentiles TEXT,
+                claimed_components TEXT,
+                snapshot_hashes TEXT
             )
         """)
         
+        self._add_missing_columns("discrepancies", {
+            "merkle_proofs": "TEXT",
+            "latency_percentiles": "TEXT",
+            "claimed_components": "TEXT",
+            "snapshot_hashes": "TEXT"
+        })
+        
+        # Merkle batches - sealed roots over contiguous ranges of checks
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS merkle_batches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_check_id INTEGER NOT NULL,
+                last_check_id INTEGER NOT NULL UNIQUE,
+                leaf_count INTEGER NOT NULL,
+                root_hash TEXT NOT NULL,
+                previous_root TEXT NOT NULL,
+                sealed_at TEXT NOT NULL
+            )
+        """)
+        
+        # Rollup tables - per-API, per-vantage aggregates kept in step
+        # with checks
+        self._migrate_rollup_tables()
+        for table, _ in ROLLUP_TABLES:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({_ROLLUP_SCHEMA}) WITHOUT ROWID")
+        
         # Sources table - where we verify from
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS sources (
@@ -87,6 +548,19 @@ class TruthLedgerDB:
             )
         """)
         
+        # Sync digests - per-chain day roots cached by ledger_sync; a
+        # NULL root marks a day that gained rows since it was cached
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_digests (
+                api_name TEXT NOT NULL,
+                vantage TEXT NOT NULL,
+                bucket_start_ms INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                root_hash TEXT,
+                PRIMARY KEY (api_name, vantage, bucket_start_ms)
+            ) WITHOUT ROWID
+        """)
+        
         # Metadata table - system state and chain integrity
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS metadata (
@@ -102,6 +576,104 @@ class TruthLedgerDB:
         cursor.execute("SELECT COUNT(*) FROM metadata")
         if cursor.fetchone()[0] == 0:
             self._initialize_metadata()
+        
+        # Ledgers created before rollups existed get them built once
+        has_checks = cursor.execute("SELECT 1 FROM checks LIMIT 1").fetchone()
+        has_rollups = cursor.execute("SELECT 1 FROM api_rollup_hourly LIMIT 1").fetchone()
+        if has_checks and not has_rollups:
+            self.rebuild_rollups()
+        
+        if self.compact and not self.is_compact_ledger():
+            self._update_metadata("storage_mode", "compact")
+        
+        self.reload_chain_heads()
+    
+    def _add_missing_columns(self, table: str, columns: Dict[str, str]):
+        """Add columns introduced after a table was first created"""
+        existing = {
+            row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")
+        }
+        for name, declaration in columns.items():
+            if name not in existing:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+        self.conn.commit()
+    
+    def needs_migration(self) -> bool:
+        """
+        True when the file predates the current schema, i.e. opening it
+        read-write would migrate it (read-only connections never do)
+        """
+        required = {
+            "checks": ("ts_epoch_ms", "hash_version", "run_digest", "vantage"),
+            "discrepancies": ("merkle_proofs", "claimed_components", "snapshot_hashes"),
+            "merkle_batches": ("root_hash",),
+            "sync_digests": ("root_hash",),
+            "metadata": ("key",),
+        }
+        for table, _ in ROLLUP_TABLES:
+            required[table] = ("vantage", "latency_hist")
+        for table, columns in required.items():
+            existing = {
+                row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")
+            }
+            if not existing.issuperset(columns):
+                return True
+        has_checks = self.conn.execute("SELECT 1 FROM checks LIMIT 1").fetchone()
+        has_rollups = self.conn.execute("SELECT 1 FROM api_rollup_hourly LIMIT 1").fetchone()
+        return bool(has_checks and not has_rollups)
+    
+    def _migrate_checks_table(self, chunk_size: int = 50000):
+        """
+        Bring older ledgers up to the current checks schema
+        Adds ts_epoch_ms and backfills it from the ISO timestamp in id
+        chunks. Hashed fields are never touched, so check_hash values
+        stay valid.
+        """
+        self._add_missing_columns("checks", {
+            "ts_epoch_ms": "INTEGER",
+            "hash_version": "INTEGER NOT NULL DEFAULT 1",
+            "run_count": "INTEGER NOT NULL DEFAULT 1",
+            "run_last_seen": "TEXT",
+            "run_latency_sum": "INTEGER",
+            "run_digest": "TEXT",
+            "vantage": "TEXT NOT NULL DEFAULT ''"
+        })
+        
+        row = self.conn.execute(
+            "SELECT MIN(id), MAX(id) FROM checks WHERE ts_epoch_ms IS NULL"
+        ).fetchone()
+        if row[0] is None:
+            return
+        
+        self.conn.create_function(
+            "iso_to_epoch_ms", 1, iso_to_epoch_ms, deterministic=True
+        )
+        for start in range(row[0], row[1] + 1, chunk_size):
+            with self.conn:
+                self.conn.execute("""
+                    UPDATE checks SET ts_epoch_ms = iso_to_epoch_ms(timestamp)
+                    WHERE id >= ? AND id < ? AND ts_epoch_ms IS NULL
+                """, (start, start + chunk_size))
+    
+    def _migrate_rollup_tables(self):
+        """
+        Rebuild rollup tables from before vantages with vantage in their
+        primary key; existing buckets belong to the ledger's own probes
+        """
+        for table, _ in ROLLUP_TABLES:
+            columns = [
+                row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")
+            ]
+            if not columns or "vantage" in columns:
+                continue
+            with self.conn:
+                self.conn.execute(f"ALTER TABLE {table} RENAME TO {table}_pre_vantage")
+                self.conn.execute(f"CREATE TABLE {table} ({_ROLLUP_SCHEMA}) WITHOUT ROWID")
+                self.conn.execute(f"""
+                    INSERT INTO {table} ({", ".join(columns)})
+                    SELECT {", ".join(columns)} FROM {table}_pre_vantage
+                """)
+                self.conn.execute(f"DROP TABLE {table}_pre_vantage")
     
     def _initialize_metadata(self):
         """Set initial metadata values"""
@@ -120,72 +692,292 @@ class TruthLedgerDB:
             )
         self.conn.commit()
     
-    def compute_check_hash(self, check_data: Dict, previous_hash: str = "") -> str:
+    def compute_check_hash(self, check_data: Dict, previous_hash: str = "",
+                           version: Optional[int] = None) -> str:
         """
         Compute cryptographic hash for check
         Creates blockchain-like chain of hashes
         """
-        # Canonical representation for hashing
-        canonical = json.dumps({
-            "timestamp": check_data["timestamp"],
-            "api_name": check_data["api_name"],
-            "endpoint": check_data["endpoint"],
-            "status": check_data["status"],
-            "response_time_ms": check_data.get("response_time_ms"),
-            "status_code": check_data.get("status_code"),
-            "source": check_data["source"],
-            "previous_hash": previous_hash
-        }, sort_keys=True)
-        
-        return hashlib.sha256(canonical.encode()).hexdigest()
-    
-    def get_last_hash(self, api_name: str) -> Optional[str]:
-        """Get the last check hash for an API to maintain chain"""
+        return compute_check_hash(check_data, previous_hash, version or self.hash_version)
+    
+    def get_last_hash(self, api_name: str, vantage: str = LOCAL_VANTAGE) -> Optional[str]:
+        """Get the last check hash of an (API, vantage) chain"""
         cursor = self.conn.cursor()
         cursor.execute("""
             SELECT check_hash FROM checks 
-            WHERE api_name = ? 
+            WHERE api_name = ? AND vantage = ?
             ORDER BY id DESC LIMIT 1
-        """, (api_name,))
+        """, (api_name, vantage))
         row = cursor.fetchone()
         return row[0] if row else None
     
+    def is_compact_ledger(self) -> bool:
+        """True once any writer has stored compact runs in this ledger"""
+        return self.get_metadata("storage_mode") == "compact"
+    
+    def get_chains(self) -> List[Tuple[str, str]]:
+        """Every (api_name, vantage) hash chain with rows in this ledger"""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT DISTINCT api_name, vantage FROM checks ORDER BY api_name, vantage"
+        )]
+    
+    def get_chain_anchors(self) -> Dict[str, str]:
+        """
+        The hash each chain's first row here must link to, by chain_key,
+        for chains whose earlier rows were carved out into a segment
+        """
+        rows = self.conn.execute(
+            "SELECT key, value FROM metadata WHERE key LIKE ?",
+            (CHAIN_ANCHOR_PREFIX + "%",)
+        )
+        return {row[0][len(CHAIN_ANCHOR_PREFIX):]: row[1] for row in rows}
+    
+    def get_merkle_anchor(self) -> Tuple[int, str]:
+        """(last_check_id, root_hash) of the last batch carved out, or (0, "")"""
+        value = self.get_metadata(MERKLE_ANCHOR_KEY)
+        if not value:
+            return 0, ""
+        anchor = json.loads(value)
+        return anchor["last_check_id"], anchor["root_hash"]
+    
+    def reload_chain_heads(self):
+        """
+        Load the head row of every (API, vantage) chain in one pass,
+        keyed by chain_key
+        Walks distinct (api_name, vantage) pairs through idx_checks_chain,
+        so the cost is a few index seeks per chain rather than a table
+        scan. Call it after writing checks outside insert_checks on this
+        connection. A chain with no rows left but a chain anchor gets a
+        stand-in head that links to the anchor and never extends a run.
+        """
+        rows = self.conn.execute(f"""
+            WITH RECURSIVE chains(name, vantage) AS (
+                SELECT api_name, MIN(vantage) FROM checks
+                WHERE api_name = (SELECT MIN(api_name) FROM checks)
+                UNION ALL
+                -- The API's next vantage, else the next API's first one
+                SELECT
+                    CASE WHEN (
+                        SELECT MIN(vantage) FROM checks
+                        WHERE api_name = name AND vantage > chains.vantage
+                    ) IS NULL
+                    THEN (SELECT MIN(api_name) FROM checks WHERE api_name > name)
+                    ELSE name END,
+                    COALESCE(
+                        (SELECT MIN(vantage) FROM checks
+                         WHERE api_name = name AND vantage > chains.vantage),
+                        (SELECT MIN(vantage) FROM checks WHERE api_name = (
+                            SELECT MIN(api_name) FROM checks WHERE api_name > name
+                        ))
+                    )
+                FROM chains WHERE name IS NOT NULL
+            )
+            SELECT {CHAIN_COLUMNS}, ts_epoch_ms FROM checks
+            WHERE id IN (
+                SELECT (
+                    SELECT MAX(id) FROM checks
+                    WHERE api_name = name AND vantage = chains.vantage
+                )
+                FROM chains WHERE name IS NOT NULL
+            )
+        """).fetchall()
+        self._chain_heads = {
+            chain_key(row["api_name"], row["vantage"]): dict(row) for row in rows
+        }
+        for key, anchor in self.get_chain_anchors().items():
+            if key not in self._chain_heads:
+                api_name, vantage = split_chain_key(key)
+                self._chain_heads[key] = {
+                    "id": None, "api_name": api_name, "vantage": vantage,
+                    "status": None, "check_hash": anchor, "run_count": 1
+                }
+        self._heads_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _current_chain_heads(self) -> Dict[str, Dict]:
+        """
+        The cached chain heads, reloaded only if another connection has
+        committed since they were loaded. PRAGMA data_version reads no
+        table pages, so an unchanged ledger costs no row lookups.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._chain_heads is None or version != self._heads_version:
+            self.reload_chain_heads()
+        return self._chain_heads
+    
     def insert_check(self, check_data: Dict) -> str:
         """
         Insert immutable check record
         Returns the computed hash
         """
-        # Get previous hash for chain
-        previous_hash = self.get_last_hash(check_data["api_name"]) or ""
+        return self.insert_checks([check_data])[0]
+    
+    def insert_checks(self, batch: List[Dict]) -> List[str]:
+        """
+        Insert a batch of immutable check records in one transaction
+        Hashes are chained per (API, vantage) from the cached chain heads,
+        so the batch costs a single commit and no per-chain head lookups,
+        and the total_checks counter is bumped instead of recounted.
+        A check's optional "vantage" names the region that probed it;
+        without one it is the ledger's own probe.
+        In compact mode a probe that matches its chain's head row (status,
+        status_code, endpoint, source, power-of-two latency bucket, same
+        UTC day) extends that row's run instead of adding a row, unless
+        the row is already sealed in a Merkle batch; its returned hash is
+        the run's new rolling digest. Rollups are still
+        updated per probe, so uptime stays exact.
+        Returns the computed hashes in batch order
+        """
+        if not batch:
+            return []
         
-        # Compute hash
-        check_hash = self.compute_check_hash(check_data, previous_hash)
+        # Take the write lock before trusting the cached heads, so no other
+        # process can append between the freshness check and our insert
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            hashes, chain_heads = self._write_checks(batch)
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
         
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO checks (
-                timestamp, api_name, endpoint, status, response_time_ms,
-                status_code, source, raw_response, check_hash, previous_hash
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            check_data["timestamp"],
-            check_data["api_name"],
-            check_data["endpoint"],
-            check_data["status"],
-            check_data.get("response_time_ms"),
-            check_data.get("status_code"),
-            check_data["source"],
-            check_data.get("raw_response", ""),
-            check_hash,
-            previous_hash
-        ))
+        self._chain_heads.update(chain_heads)
+        return hashes
+    
+    @staticmethod
+    def _extends_run(head: Dict, check_data: Dict, ts_epoch_ms: int) -> bool:
+        return (
+            head["status"] == check_data["status"] and
+            head["status_code"] == check_data.get("status_code") and
+            head["endpoint"] == check_data["endpoint"] and
+            head["source"] == check_data["source"] and
+            run_latency_bucket(head["response_time_ms"]) ==
+            run_latency_bucket(check_data.get("response_time_ms")) and
+            head["ts_epoch_ms"] // DAY_MS == ts_epoch_ms // DAY_MS
+        )
+    
+    @staticmethod
+    def _fold_into_run(head: Dict, check_data: Dict):
+        if head["run_count"] == 1:
+            head["run_digest"] = head["check_hash"]
+            head["run_latency_sum"] = head["response_time_ms"]
+        head["run_count"] += 1
+        head["run_last_seen"] = check_data["timestamp"]
+        if head["run_latency_sum"] is not None:
+            head["run_latency_sum"] += check_data["response_time_ms"]
+        head["run_digest"] = fold_run_digest(head["run_digest"], check_data)
+    
+    def _write_checks(self, batch: List[Dict]) -> Tuple[List[str], Dict[str, Dict]]:
+        """Insert rows, rollups and counter inside the caller's transaction"""
+        cached_heads = self._current_chain_heads()
+        # A row sealed into a Merkle batch is frozen: its run is not
+        # extended, so batch roots cover every row as it stands
+        sealed_through = self._sealed_through() if self.compact else 0
+        chain_heads: Dict[str, Dict] = {}
+        rollups = RollupAccumulator()
+        new_rows: List[Dict] = []
+        extended: Dict[int, Dict] = {}
+        hashes = []
         
-        self.conn.commit()
+        for check_data in batch:
+            api_name = check_data["api_name"]
+            vantage = check_data.get("vantage") or LOCAL_VANTAGE
+            if "@" in vantage:
+                raise ValueError(f"Vantage names cannot contain '@': {vantage}")
+            key = chain_key(api_name, vantage)
+            head = chain_heads.get(key) or cached_heads.get(key)
+            ts_epoch_ms = iso_to_epoch_ms(check_data["timestamp"])
+            
+            rollups.add(
+                api_name,
+                check_data["status"],
+                check_data.get("response_time_ms"),
+                check_data["timestamp"],
+                ts_epoch_ms,
+                vantage=vantage
+            )
+            
+            if (self.compact and head and
+                    (head["id"] is None or head["id"] > sealed_through) and
+                    self._extends_run(head, check_data, ts_epoch_ms)):
+                if key not in chain_heads:
+                    # Work on a copy so a rollback leaves the cache intact
+                    head = chain_heads[key] = dict(head)
+                    extended[head["id"]] = head
+                self._fold_into_run(head, check_data)
+                hashes.append(head["run_digest"])
+                continue
+            
+            previous_hash = chain_link(head) if head else ""
+            check_hash = compute_check_hash(check_data, previous_hash, self.hash_version)
+            row = {
+                "id": None,
+                "timestamp": check_data["timestamp"],
+                "api_name": api_name,
+                "endpoint": check_data["endpoint"],
+                "status": check_data["status"],
+                "response_time_ms": check_data.get("response_time_ms"),
+                "status_code": check_data.get("status_code"),
+                "source": check_data["source"],
+                "raw_response": check_data.get("raw_response", ""),
+                "check_hash": check_hash,
+                "previous_hash": previous_hash,
+                "ts_epoch_ms": ts_epoch_ms,
+                "hash_version": self.hash_version,
+                "run_count": 1,
+                "run_last_seen": None,
+                "run_latency_sum": None,
+                "run_digest": None,
+                "vantage": vantage
+            }
+            new_rows.append(row)
+            chain_heads[key] = row
+            hashes.append(check_hash)
+        
+        if extended:
+            self.conn.executemany("""
+                UPDATE checks
+                SET run_count = ?, run_last_seen = ?, run_latency_sum = ?, run_digest = ?
+                WHERE id = ?
+            """, [
+                (row["run_count"], row["run_last_seen"], row["run_latency_sum"],
+                 row["run_digest"], row_id)
+                for row_id, row in extended.items()
+            ])
+        
+        if new_rows:
+            self.conn.executemany("""
+                INSERT INTO checks (
+                    timestamp, api_name, endpoint, status, response_time_ms,
+                    status_code, source, raw_response, check_hash, previous_hash,
+                    ts_epoch_ms, hash_version, run_count, run_last_seen,
+                    run_latency_sum, run_digest, vantage
+                ) VALUES (
+                    :timestamp, :api_name, :endpoint, :status, :response_time_ms,
+                    :status_code, :source, :raw_response, :check_hash, :previous_hash,
+                    :ts_epoch_ms, :hash_version, :run_count, :run_last_seen,
+                    :run_latency_sum, :run_digest, :vantage
+                )
+            """, new_rows)
+            
+            # Ids are consecutive under the write lock; heads need them so
+            # later probes can extend their runs
+            last_id = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            for offset, row in enumerate(new_rows):
+                row["id"] = last_id - len(new_rows) + 1 + offset
+                del row["raw_response"]
         
-        # Update metadata
-        self._update_metadata("total_checks", str(self.get_total_checks()))
+        # Rollups move in the same transaction as the rows they count
+        rollups.flush(self.conn)
         
-        return check_hash
+        # Running counter - avoids a COUNT(*) scan per insert
+        self.conn.execute("""
+            UPDATE metadata
+            SET value = CAST(value AS INTEGER) + ?, updated_at = ?
+            WHERE key = 'total_checks'
+        """, (len(batch), datetime.utcnow().isoformat()))
+        
+        return hashes, chain_heads
     
     def insert_discrepancy(self, discrepancy_data: Dict) -> int:
         """Record a discrepancy between claimed and actual status"""
@@ -194,8 +986,9 @@ class TruthLedgerDB:
             INSERT INTO discrepancies (
                 timestamp, api_name, claimed_status, actual_status,
                 claimed_uptime, measured_uptime, variance_percent,
-                proof_hashes, evidence_url, severity
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                proof_hashes, evidence_url, severity, merkle_proofs,
+                latency_percentiles, claimed_components, snapshot_hashes
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             discrepancy_data["timestamp"],
             discrepancy_data["api_name"],
@@ -206,7 +999,11 @@ class TruthLedgerDB:
             discrepancy_data["variance_percent"],
             json.dumps(discrepancy_data.get("proof_hashes", [])),
             discrepancy_data.get("evidence_url", ""),
-            discrepancy_data["severity"]
+            discrepancy_data["severity"],
+            json.dumps(discrepancy_data.get("merkle_proofs", [])),
+            json.dumps(discrepancy_data.get("latency_percentiles", {})),
+            json.dumps(discrepancy_data.get("claimed_components", {})),
+            json.dumps(discrepancy_data.get("snapshot_hashes", []))
         ))
         
         self.conn.commit()
@@ -234,98 +1031,762 @@ class TruthLedgerDB:
             # Source already exists
             return False
     
-    def get_api_uptime(self, api_name: str, hours: int = 24) -> Dict:
-        """Calculate uptime statistics for an API"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_checks,
-                SUM(CASE WHEN status = 'up' THEN 1 ELSE 0 END) as successful_checks,
-                AVG(response_time_ms) as avg_response_time,
-                MIN(timestamp) as first_check,
-                MAX(timestamp) as last_check
+    def rebuild_rollups(self, chunk_size: int = 50000):
+        """
+        Recompute every rollup table from the raw checks
+        Compact runs never cross a day, so daily counts and latency sums
+        rebuild exactly. A run spanning several hours is spread over them
+        in proportion to time (exact for evenly spaced probes), and its
+        histogram and min/max assume every probe had the first latency.
+        """
+        last_id = 0
+        with self.conn:
+            for table, _ in ROLLUP_TABLES:
+                self.conn.execute(f"DELETE FROM {table}")
+        
+        while True:
+            rows = self.conn.execute("""
+                SELECT id, api_name, vantage, status, response_time_ms, timestamp,
+                       ts_epoch_ms, run_count, run_last_seen, run_latency_sum
+                FROM checks WHERE id > ? ORDER BY id LIMIT ?
+            """, (last_id, chunk_size)).fetchall()
+            if not rows:
+                return
+            
+            rollups = RollupAccumulator()
+            for row in rows:
+                for piece in self._split_run_by_hour(row):
+                    rollups.add(
+                        row["api_name"], row["status"], row["response_time_ms"],
+                        *piece, vantage=row["vantage"]
+                    )
+            with self.conn:
+                rollups.flush(self.conn)
+            last_id = rows[-1]["id"]
+    
+    @staticmethod
+    def _split_run_by_hour(row) -> List[Tuple]:
+        """
+        (timestamp, ts_epoch_ms, count, latency_sum, last_timestamp) per
+        hour that a checks row's run touches
+        """
+        count = row["run_count"]
+        if count == 1:
+            return [(row["timestamp"], row["ts_epoch_ms"], 1, None, None)]
+        
+        first_ms = row["ts_epoch_ms"]
+        last_ms = max(first_ms, iso_to_epoch_ms(row["run_last_seen"]))
+        if first_ms // HOUR_MS == last_ms // HOUR_MS:
+            return [(row["timestamp"], first_ms, count,
+                     row["run_latency_sum"], row["run_last_seen"])]
+        
+        # Cumulative rounding keeps the pieces summing to the exact totals
+        pieces = []
+        span = last_ms - first_ms
+        done_count = done_latency = 0
+        hour = first_ms // HOUR_MS * HOUR_MS
+        while hour <= last_ms:
+            lo = max(hour, first_ms)
+            hi = min(hour + HOUR_MS, last_ms + 1)
+            share = min(1.0, (hi - first_ms) / (span + 1))
+            upto = count if hi > last_ms else round(count * share)
+            if upto > done_count:
+                latency_sum = None
+                if row["run_latency_sum"] is not None:
+                    latency_upto = (row["run_latency_sum"] if hi > last_ms
+                                    else round(row["run_latency_sum"] * share))
+                    latency_sum = latency_upto - done_latency
+                    done_latency = latency_upto
+                first = row["timestamp"] if lo == first_ms else epoch_ms_to_iso(lo)
+                last = row["run_last_seen"] if hi > last_ms else epoch_ms_to_iso(hi - 1)
+                pieces.append([first, lo, upto - done_count, latency_sum, last])
+                done_count = upto
+            hour += HOUR_MS
+        
+        # Whatever latency rounding left over belongs to the last piece
+        if row["run_latency_sum"] is not None:
+            pieces[-1][3] += row["run_latency_sum"] - done_latency
+        return [tuple(piece) for piece in pieces]
+    
+    def _window_segments(self, start_ms: int,
+                         end_ms: Optional[int]) -> List[Tuple[str, int, Optional[int]]]:
+        """
+        Split [start_ms, end_ms) into the cheapest set of sources
+        Whole days come from daily rollups, whole hours from hourly
+        rollups and only the ragged edges from raw checks.
+        end_ms=None means open-ended (includes anything after now).
+        """
+        edge = "checks"
+        now_ms = utc_now_ms() if end_ms is None else end_ms
+        h0 = -(-start_ms // HOUR_MS) * HOUR_MS
+        h1 = now_ms // HOUR_MS * HOUR_MS
+        
+        if h0 >= h1:
+            return [(edge, start_ms, end_ms)]
+        
+        segments = []
+        if start_ms < h0:
+            segments.append((edge, start_ms, h0))
+        
+        d0 = -(-h0 // DAY_MS) * DAY_MS
+        d1 = h1 // DAY_MS * DAY_MS
+        if d0 < d1:
+            if h0 < d0:
+                segments.append(("api_rollup_hourly", h0, d0))
+            segments.append(("api_rollup_daily", d0, d1))
+            if d1 < h1:
+                segments.append(("api_rollup_hourly", d1, h1))
+        else:
+            segments.append(("api_rollup_hourly", h0, h1))
+        
+        segments.append((edge, h1, end_ms))
+        return segments
+    
+    def get_window_stats(self, api_name: str, start_ms: int,
+                         end_ms: Optional[int] = None,
+                         vantage: str = LOCAL_VANTAGE) -> Dict:
+        """
+        Exact check counts and latency totals for an API over a window,
+        as probed from one vantage
+        Reads rollups for whole hours/days, so cost is independent of
+        how many checks the window holds
+        """
+        return self.get_window_stats_many([api_name], start_ms, end_ms, vantage)[api_name]
+    
+    @staticmethod
+    def _run_piece(row, lo: int, hi: Optional[int]) -> Optional[Tuple]:
+        """
+        (count, latency_sum, first_timestamp, last_timestamp) of a checks
+        row's probes in [lo, hi), or None if it has none there
+        A run's probes are spread evenly over its span, rounded the way
+        _split_run_by_hour splits it, so edges and rollups add up.
+        """
+        count = row["run_count"]
+        first_ms = row["ts_epoch_ms"]
+        last_ms = first_ms if count == 1 else max(first_ms, iso_to_epoch_ms(row["run_last_seen"]))
+        start = max(lo, first_ms)
+        end = last_ms + 1 if hi is None else min(hi, last_ms + 1)
+        if start >= end:
+            return None
+        if count == 1:
+            return 1, row["response_time_ms"], row["timestamp"], row["timestamp"]
+        
+        span = last_ms - first_ms + 1
+        
+        def upto(total: int, ms: int) -> int:
+            return total if ms > last_ms else round(total * (ms - first_ms) / span)
+        
+        inside = upto(count, end) - upto(count, start)
+        if not inside:
+            return None
+        latency_sum = None
+        if row["run_latency_sum"] is not None:
+            latency_sum = (upto(row["run_latency_sum"], end) -
+                           upto(row["run_latency_sum"], start))
+        first = row["timestamp"] if start == first_ms else epoch_ms_to_iso(start)
+        last = row["run_last_seen"] if end > last_ms else epoch_ms_to_iso(end - 1)
+        return inside, latency_sum, first, last
+    
+    def _compact_edge(self, api_names: List[str], vantage: str, lo: int,
+                      hi: Optional[int]) -> Iterator[Tuple[sqlite3.Row, Tuple]]:
+        """
+        (row, _run_piece) for compact checks rows with probes in [lo, hi)
+        A run never crosses a UTC day, so only rows started since the
+        start of lo's day can reach into the range.
+        """
+        marks = ", ".join("?" * len(api_names))
+        upper = "" if hi is None else "AND ts_epoch_ms < ?"
+        params = (*api_names, vantage, lo // DAY_MS * DAY_MS) + (() if hi is None else (hi,))
+        for row in self.conn.execute(f"""
+            SELECT api_name, status, response_time_ms, timestamp, ts_epoch_ms,
+                   run_count, run_last_seen, run_latency_sum
             FROM checks
-            WHERE api_name = ?
-            AND datetime(timestamp) >= datetime('now', '-' || ? || ' hours')
-        """, (api_name, hours))
+            WHERE api_name IN ({marks}) AND vantage = ?
+            AND ts_epoch_ms >= ? {upper}
+        """, params):
+            piece = self._run_piece(row, lo, hi)
+            if piece is not None:
+                yield row, piece
+    
+    def _compact_edge_stats(self, api_names: List[str], vantage: str, lo: int,
+                            hi: Optional[int]) -> List[Tuple]:
+        """The checks-segment rows of get_window_stats_many, for compact runs"""
+        totals: Dict[str, List] = {}
+        for row, (count, latency_sum, first, last) in self._compact_edge(
+                api_names, vantage, lo, hi):
+            entry = totals.setdefault(row["api_name"], [row["api_name"], 0, 0, 0, 0, first, last])
+            entry[1] += count
+            entry[2] += count if row["status"] == "up" else 0
+            if latency_sum is not None:
+                entry[3] += latency_sum
+                entry[4] += count
+            entry[5] = min(entry[5], first)
+            entry[6] = max(entry[6], last)
+        return [tuple(entry) for entry in totals.values()]
+    
+    def get_window_stats_many(self, api_names: List[str], start_ms: int,
+                              end_ms: Optional[int] = None,
+                              vantage: str = LOCAL_VANTAGE) -> Dict[str, Dict]:
+        """
+        get_window_stats for many APIs at once: one grouped query per
+        window segment (and per STATS_BATCH APIs), not one per API
+        """
+        stats = {
+            api_name: {
+                "total_checks": 0, "successful_checks": 0,
+                "latency_sum": 0, "latency_count": 0,
+                "first_check": None, "last_check": None
+            }
+            for api_name in api_names
+        }
+        names = list(stats)
+        # On a compact ledger a raw row can stand for a whole run
+        compact = self.is_compact_ledger()
         
-        row = cursor.fetchone()
+        for source, lo, hi in self._window_segments(start_ms, end_ms):
+            upper = "" if hi is None else "AND {col} < ?"
+            bounds = (vantage, lo) if hi is None else (vantage, lo, hi)
+            
+            for offset in range(0, len(names), STATS_BATCH):
+                batch = names[offset:offset + STATS_BATCH]
+                marks = ", ".join("?" * len(batch))
+                if source == "checks" and compact:
+                    rows = self._compact_edge_stats(batch, vantage, lo, hi)
+                elif source == "checks":
+                    rows = self.conn.execute(f"""
+                        SELECT 
+                            api_name,
+                            COUNT(*),
+                            SUM(CASE WHEN status = 'up' THEN 1 ELSE 0 END),
+                            SUM(response_time_ms),
+                            COUNT(response_time_ms),
+                            MIN(timestamp),
+                            MAX(timestamp)
+                        FROM checks
+                        WHERE api_name IN ({marks}) AND vantage = ?
+                        AND ts_epoch_ms >= ? {upper.format(col="ts_epoch_ms")}
+                        GROUP BY api_name
+                    """, (*batch, *bounds))
+                else:
+                    rows = self.conn.execute(f"""
+                        SELECT 
+                            api_name,
+                            SUM(total_count),
+                            SUM(up_count),
+                            SUM(latency_sum),
+                            SUM(latency_count),
+                            MIN(first_timestamp),
+                            MAX(last_timestamp)
+                        FROM {source}
+                        WHERE api_name IN ({marks}) AND vantage = ?
+                        AND bucket_start_ms >= ? {upper.format(col="bucket_start_ms")}
+                        GROUP BY api_name
+                    """, (*batch, *bounds))
+                
+                for row in rows:
+                    if not row[1]:
+                        continue
+                    totals = stats[row[0]]
+                    totals["total_checks"] += row[1]
+                    totals["successful_checks"] += row[2] or 0
+                    totals["latency_sum"] += row[3] or 0
+                    totals["latency_count"] += row[4] or 0
+                    if totals["first_check"] is None or row[5] < totals["first_check"]:
+                        totals["first_check"] = row[5]
+                    if totals["last_check"] is None or row[6] > totals["last_check"]:
+                        totals["last_check"] = row[6]
+        
+        return stats
+    
+    def get_latency_histogram(self, api_name: str, start_ms: int,
+                              end_ms: Optional[int] = None,
+                              vantage: str = LOCAL_VANTAGE) -> LatencyHistogram:
+        """Merged latency histogram for an API over a window, from one vantage"""
+        histogram = LatencyHistogram()
+        compact = self.is_compact_ledger()
+        
+        for source, lo, hi in self._window_segments(start_ms, end_ms):
+            if source == "checks" and compact:
+                # Every probe of a run is counted at the run's first latency
+                for row, (count, _, _, _) in self._compact_edge([api_name], vantage, lo, hi):
+                    histogram.add(row["response_time_ms"], count)
+                continue
+            if source == "checks":
+                query = """
+                    SELECT response_time_ms FROM checks
+                    WHERE api_name = ? AND vantage = ? AND response_time_ms IS NOT NULL
+                    AND ts_epoch_ms >= ?
+                """
+                column = "ts_epoch_ms"
+            else:
+                query = f"""
+                    SELECT latency_hist FROM {source}
+                    WHERE api_name = ? AND vantage = ? AND bucket_start_ms >= ?
+                """
+                column = "bucket_start_ms"
+            
+            params = [api_name, vantage, lo]
+            if hi is not None:
+                query += f" AND {column} < ?"
+                params.append(hi)
+            
+            for (value,) in self.conn.execute(query, params):
+                if source == "checks":
+                    histogram.add(value)
+                else:
+                    histogram.merge(LatencyHistogram.from_json(value))
         
+        return histogram
+    
+    def get_latency_percentiles(self, api_name: str, hours: int = 24,
+                                quantiles=PERCENTILES,
+                                end_ms: Optional[int] = None,
+                                vantage: str = LOCAL_VANTAGE) -> Dict:
+        """
+        Tail latency for an API over the last N hours (before end_ms)
+        Returns {"samples": n, "p50": ms, "p90": ms, ...}; percentiles
+        are None when the window has no timed checks
+        """
+        end = utc_now_ms() if end_ms is None else end_ms
+        histogram = self.get_latency_histogram(
+            api_name, end - hours * HOUR_MS, end_ms, vantage
+        )
+        result = {"samples": histogram.total()}
+        result.update(histogram.percentiles(quantiles))
+        return result
+    
+    def get_api_uptime(self, api_name: str, hours: int = 24,
+                       vantage: Optional[str] = LOCAL_VANTAGE,
+                       quorum: Optional[int] = None) -> Dict:
+        """
+        Calculate uptime statistics for an API
+        vantage picks the region whose probes count ("" is the ledger's
+        own); vantage=None gives consensus uptime across every vantage
+        (see get_consensus_status)
+        """
+        if vantage is None:
+            return self._consensus_uptime(api_name, hours, quorum)
+        return self._uptime_summary(self.get_window_stats(
+            api_name, utc_now_ms() - hours * HOUR_MS, vantage=vantage
+        ))
+    
+    def get_bucket_counts(self, start_ms: int, bucket_ms: int,
+                          vantage: str = LOCAL_VANTAGE) -> List[Tuple[str, int, int, int]]:
+        """
+        (api_name, bucket_start_ms, total, up) for every API, in buckets
+        of bucket_ms from start_ms on. Whole-hour buckets are summed from
+        the hourly rollups; shorter ones are counted from the checks.
+        """
+        if bucket_ms % HOUR_MS == 0:
+            rows = self.conn.execute("""
+                SELECT api_name, bucket_start_ms / ? * ? AS bucket,
+                       SUM(total_count), SUM(up_count)
+                FROM api_rollup_hourly
+                WHERE vantage = ? AND bucket_start_ms >= ?
+                GROUP BY api_name, bucket
+            """, (bucket_ms, bucket_ms, vantage, start_ms // HOUR_MS * HOUR_MS))
+        else:
+            rows = self.conn.execute("""
+                SELECT api_name, ts_epoch_ms / ? * ? AS bucket,
+                       COUNT(*), SUM(CASE WHEN status = 'up' THEN 1 ELSE 0 END)
+                FROM checks
+                WHERE vantage = ? AND ts_epoch_ms >= ?
+                GROUP BY api_name, bucket
+            """, (bucket_ms, bucket_ms, vantage, start_ms))
+        return [tuple(row) for row in rows]
+    
+    def get_api_uptimes(self, api_names: List[str], hours: int = 24,
+                        vantage: str = LOCAL_VANTAGE) -> Dict[str, Dict]:
+        """get_api_uptime for many APIs from one vantage, in grouped queries"""
+        stats = self.get_window_stats_many(
+            api_names, utc_now_ms() - hours * HOUR_MS, vantage=vantage
+        )
+        return {api_name: self._uptime_summary(row) for api_name, row in stats.items()}
+    
+    @staticmethod
+    def _uptime_summary(row: Dict) -> Dict:
+        """Uptime statistics from window stats"""
         if row["total_checks"] == 0:
-            return {"uptime": 0, "checks": 0}
+            return {"uptime": 0, "checks": 0, "total_checks": 0}
         
         uptime = (row["successful_checks"] / row["total_checks"]) * 100
+        avg_response_time = (
+            row["latency_sum"] / row["latency_count"] if row["latency_count"] else 0
+        )
         
         return {
             "uptime": round(uptime, 4),
             "total_checks": row["total_checks"],
             "successful_checks": row["successful_checks"],
-            "avg_response_time_ms": round(row["avg_response_time"] or 0, 2),
+            "avg_response_time_ms": round(avg_response_time, 2),
             "first_check": row["first_check"],
             "last_check": row["last_check"]
         }
     
-    def verify_chain_integrity(self, api_name: str) -> Tuple[bool, List[str]]:
+    def get_consensus_status(self, api_name: str, hours: int = 24,
+                             quorum: Optional[int] = None,
+                             end_ms: Optional[int] = None) -> Dict:
+        """
+        Hour-by-hour status of an API agreed across vantages
+        A vantage calls an hour down when most of its probes in it were
+        not up. The hour is "down" once quorum vantages agree (default:
+        a majority of those that probed it), "regional" when fewer did
+        (a network blip near some probes, not a provider outage) and
+        "up" otherwise. Reads only the per-vantage hourly rollups.
+        """
+        hourly, rows = self._consensus_hours(api_name, hours, quorum, end_ms)
+        return {
+            "api_name": api_name,
+            "hours": hourly,
+            "vantages": sorted({row["vantage"] for row in rows}),
+            "up_hours": sum(1 for hour in hourly if hour["status"] == "up"),
+            "regional_hours": sum(1 for hour in hourly if hour["status"] == "regional"),
+            "down_hours": sum(1 for hour in hourly if hour["status"] == "down")
+        }
+    
+    def _consensus_hours(self, api_name: str, hours: int, quorum: Optional[int],
+                         end_ms: Optional[int]) -> Tuple[List[Dict], List[sqlite3.Row]]:
+        """Per-hour consensus, plus the hourly rollup rows it was read from"""
+        end = utc_now_ms() if end_ms is None else end_ms
+        start = end - hours * HOUR_MS
+        query = """
+            SELECT bucket_start_ms, vantage, total_count, up_count,
+                   latency_sum, latency_count, first_timestamp, last_timestamp
+            FROM api_rollup_hourly
+            WHERE api_name = ? AND bucket_start_ms >= ?
+        """
+        params = [api_name, start - start % HOUR_MS]
+        if end_ms is not None:
+            query += " AND bucket_start_ms < ?"
+            params.append(end_ms)
+        
+        buckets: Dict[int, List[sqlite3.Row]] = {}
+        for row in self.conn.execute(query + " ORDER BY bucket_start_ms", params):
+            buckets.setdefault(row["bucket_start_ms"], []).append(row)
+        
+        hourly = []
+        for bucket_start_ms, rows in buckets.items():
+            down = sorted(
+                row["vantage"] for row in rows if row["up_count"] * 2 < row["total_count"]
+            )
+            needed = quorum or len(rows) // 2 + 1
+            if len(down) >= needed:
+                status = "down"
+            elif down:
+                status = "regional"
+            else:
+                status = "up"
+            hourly.append({
+                "bucket_start_ms": bucket_start_ms,
+                "status": status,
+                "vantages": len(rows),
+                "down_vantages": down,
+                "quorum": needed
+            })
+        
+        return hourly, [row for rows in buckets.values() for row in rows]
+    
+    def _consensus_uptime(self, api_name: str, hours: int,
+                          quorum: Optional[int]) -> Dict:
+        """get_api_uptime across vantages: the share of hours not down by consensus"""
+        hourly, rows = self._consensus_hours(api_name, hours, quorum, None)
+        if not hourly:
+            return {"uptime": 0, "checks": 0, "total_checks": 0}
+        
+        down_hours = sum(1 for hour in hourly if hour["status"] == "down")
+        latency_count = sum(row["latency_count"] for row in rows)
+        latency_sum = sum(row["latency_sum"] for row in rows)
+        return {
+            "uptime": round((len(hourly) - down_hours) / len(hourly) * 100, 4),
+            "total_checks": sum(row["total_count"] for row in rows),
+            "successful_checks": sum(row["up_count"] for row in rows),
+            "avg_response_time_ms": round(latency_sum / latency_count, 2) if latency_count else 0,
+            "first_check": min(row["first_timestamp"] for row in rows),
+            "last_check": max(row["last_timestamp"] for row in rows),
+            "vantages": sorted({row["vantage"] for row in rows}),
+            "regional_hours": sum(1 for hour in hourly if hour["status"] == "regional"),
+            "down_hours": down_hours
+        }
+    
+    def get_chain_checkpoint(self, api_name: str,
+                             vantage: str = LOCAL_VANTAGE) -> Optional[Tuple[int, str]]:
+        """Get (last_verified_id, last_verified_hash) for an API's chain"""
+        value = self.get_metadata(f"chain_checkpoint:{chain_key(api_name, vantage)}")
+        if not value:
+            return None
+        checkpoint = json.loads(value)
+        return checkpoint["last_verified_id"], checkpoint["last_verified_hash"]
+    
+    def _save_chain_checkpoint(self, key: str, last_id: int, last_hash: str):
+        """Record how far a chain (by chain_key) has been verified"""
+        if self.read_only:
+            return
+        self._update_metadata(f"chain_checkpoint:{key}", json.dumps({
+            "last_verified_id": last_id,
+            "last_verified_hash": last_hash
+        }))
+    
+    def verify_chain_integrity(self, api_name: str, full: bool = True,
+                               vantage: str = LOCAL_VANTAGE) -> Tuple[bool, List[str]]:
         """
         Verify the hash chain is intact
+        full=True re-hashes the whole chain from genesis (or from its
+        chain anchor, if older rows live in segments). full=False
+        resumes from the API's checkpoint in metadata and only verifies
+        rows appended since, after confirming the checkpointed row still
+        carries the hash it was verified with.
+        vantage picks another region's chain for the API (see get_chains).
+        A clean run moves the checkpoint to the last verified row.
         Returns (is_valid, list_of_errors)
         """
+        errors = []
+        start_id = 0
+        key = chain_key(api_name, vantage)
+        previous_hash = self.get_chain_anchors().get(key, "")
+        
+        checkpoint = None if full else self.get_chain_checkpoint(api_name, vantage)
+        if checkpoint:
+            start_id, anchor_hash = checkpoint
+            row = self.conn.execute("""
+                SELECT check_hash, previous_hash FROM checks
+                WHERE id = ? AND api_name = ? AND vantage = ?
+            """, (start_id, api_name, vantage)).fetchone()
+            if row is None or row["check_hash"] != anchor_hash:
+                errors.append(
+                    f"Check {start_id}: checkpoint anchor mismatch. "
+                    f"Expected: {anchor_hash}, "
+                    f"Got: {row['check_hash'] if row else 'missing row'}"
+                )
+                return (False, errors)
+            
+            # Re-verify the anchor row itself: a compact run may have
+            # grown since, which changes what the next row links to
+            previous_hash = row["previous_hash"]
+            start_id -= 1
+        
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT id, timestamp, api_name, endpoint, status, 
-                   response_time_ms, status_code, source, 
-                   check_hash, previous_hash
+        cursor.execute(f"""
+            SELECT {CHAIN_COLUMNS}
             FROM checks
-            WHERE api_name = ?
+            WHERE api_name = ? AND vantage = ? AND id > ?
             ORDER BY id ASC
-        """, (api_name,))
+        """, (api_name, vantage, start_id))
         
-        rows = cursor.fetchall()
-        errors = []
-        previous_hash = ""
+        # Stream rows rather than loading the whole chain
+        verifier = ChainVerifier(previous_hash)
+        for row in cursor:
+            verifier.feed(row)
+        errors.extend(verifier.errors)
         
-        for row in rows:
-            # Reconstruct check data
-            check_data = {
-                "timestamp": row["timestamp"],
-                "api_name": row["api_name"],
-                "endpoint": row["endpoint"],
-                "status": row["status"],
-                "response_time_ms": row["response_time_ms"],
-                "status_code": row["status_code"],
-                "source": row["source"]
-            }
-            
-            # Compute what hash should be
-            expected_hash = self.compute_check_hash(check_data, previous_hash)
-            
-            # Verify previous_hash matches
-            if row["previous_hash"] != previous_hash:
-                errors.append(
-                    f"Check {row['id']}: previous_hash mismatch. "
-                    f"Expected: {previous_hash}, Got: {row['previous_hash']}"
-                )
+        if not errors and verifier.last_id is not None:
+            self._save_chain_checkpoint(key, verifier.last_id, verifier.last_check_hash)
+        
+        return (len(errors) == 0, errors)
+    
+    def seal_merkle_batches(self, batch_size: int = 1024,
+                            max_age_seconds: Optional[float] = None) -> int:
+        """
+        Seal unsealed checks into Merkle batches
+        Every full run of batch_size checks (in id order) becomes a
+        batch. If max_age_seconds is set, a trailing partial batch is
+        sealed too once its oldest check is that old (time-window
+        batches). Batch roots are chained through previous_root. On a
+        compact ledger, batches stop before the first run still open.
+        Returns the number of batches sealed
+        """
+        sealed = 0
+        
+        while True:
+            # Take the write lock before reading the last batch: the
+            # monitor and reveal_truth seal from different processes, and
+            # neither may seal a range the other has sealed meanwhile
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                batch = self._next_merkle_batch(batch_size, max_age_seconds)
+                if batch is not None:
+                    self.conn.execute("""
+                        INSERT INTO merkle_batches (
+                            first_check_id, last_check_id, leaf_count,
+                            root_hash, previous_root, sealed_at
+                        ) VALUES (?, ?, ?, ?, ?, ?)
+                    """, batch)
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
             
-            # Verify current hash
-            if row["check_hash"] != expected_hash:
+            if batch is None:
+                return sealed
+            sealed += 1
+    
+    def _sealed_through(self) -> int:
+        """Id of the last check sealed into a Merkle batch (0 if none)"""
+        row = self.conn.execute("SELECT MAX(last_check_id) FROM merkle_batches").fetchone()
+        return row[0] if row[0] is not None else self.get_merkle_anchor()[0]
+    
+    def _next_merkle_batch(self, batch_size: int,
+                           max_age_seconds: Optional[float]) -> Optional[Tuple]:
+        """
+        merkle_batches values for the next batch to seal, or None
+        Must run inside the sealing write transaction
+        """
+        last = self.conn.execute("""
+            SELECT last_check_id, root_hash FROM merkle_batches
+            ORDER BY last_check_id DESC LIMIT 1
+        """).fetchone()
+        last_id, previous_root = (last[0], last[1]) if last else self.get_merkle_anchor()
+        
+        # Cheap precheck: ids are dense, so MAX(id) bounds what is pending
+        max_id = self.conn.execute("SELECT MAX(id) FROM checks").fetchone()[0]
+        if max_id is not None and self.is_compact_ledger():
+            # Compact runs still open (heads from today's UTC day) can
+            # grow; batches stop before the first of them
+            day_start_ms = utc_now_ms() // DAY_MS * DAY_MS
+            open_ids = [
+                head["id"] for head in self._current_chain_heads().values()
+                if head["id"] is not None and head["ts_epoch_ms"] >= day_start_ms
+            ]
+            if open_ids:
+                max_id = min(max_id, min(open_ids) - 1)
+        if max_id is None or max_id <= last_id:
+            return None
+        if max_id - last_id < batch_size and max_age_seconds is None:
+            return None
+        
+        rows = self.conn.execute("""
+            SELECT id, check_hash, ts_epoch_ms FROM checks
+            WHERE id > ? AND id <= ? ORDER BY id LIMIT ?
+        """, (last_id, max_id, batch_size)).fetchall()
+        if not rows:
+            return None
+        
+        if len(rows) < batch_size:
+            cutoff = utc_now_ms() - int((max_age_seconds or 0) * 1000)
+            if max_age_seconds is None or rows[0]["ts_epoch_ms"] > cutoff:
+                return None
+        
+        return (
+            rows[0]["id"],
+            rows[-1]["id"],
+            len(rows),
+            merkle_root([row["check_hash"] for row in rows]),
+            previous_root,
+            datetime.utcnow().isoformat()
+        )
+    
+    def get_merkle_batch(self, check_id: int) -> Optional[Dict]:
+        """Get the sealed batch covering a check, if any"""
+        row = self.conn.execute("""
+            SELECT * FROM merkle_batches
+            WHERE last_check_id >= ?
+            ORDER BY last_check_id ASC LIMIT 1
+        """, (check_id,)).fetchone()
+        if row is None or row["first_check_id"] > check_id:
+            return None
+        return dict(row)
+    
+    def _batch_leaves(self, batch: Dict) -> List[sqlite3.Row]:
+        return self.conn.execute("""
+            SELECT id, check_hash FROM checks
+            WHERE id >= ? AND id <= ?
+            ORDER BY id
+        """, (batch["first_check_id"], batch["last_check_id"])).fetchall()
+    
+    def get_inclusion_proof(self, check_id: int) -> Optional[Dict]:
+        """
+        Prove a check is anchored in a sealed Merkle batch
+        The proof is O(log n) sibling hashes - verify it with
+        verify_inclusion_proof without touching the ledger
+        Returns None if the check is not sealed yet
+        """
+        return self.get_inclusion_proofs([check_id]).get(check_id)
+    
+    def get_inclusion_proofs(self, check_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Inclusion proofs for many checks, keyed by check id
+        Each batch tree is built once however many of its checks are
+        asked for; checks that are not sealed yet are left out
+        """
+        by_batch: Dict[int, Tuple[Dict, List[int]]] = {}
+        for check_id in check_ids:
+            batch = self.get_merkle_batch(check_id)
+            if batch is not None:
+                by_batch.setdefault(batch["id"], (batch, []))[1].append(check_id)
+        
+        proofs = {}
+        for batch, wanted in by_batch.values():
+            leaves = self._batch_leaves(batch)
+            position = {row["id"]: index for index, row in enumerate(leaves)}
+            levels = build_levels([row["check_hash"] for row in leaves])
+            for check_id in wanted:
+                index = position[check_id]
+                proofs[check_id] = {
+                    "check_id": check_id,
+                    "check_hash": leaves[index]["check_hash"],
+                    "batch_id": batch["id"],
+                    "leaf_index": index,
+                    "leaf_count": batch["leaf_count"],
+                    "root_hash": batch["root_hash"],
+                    "path": inclusion_path(levels, index)
+                }
+        return proofs
+    
+    @staticmethod
+    def verify_inclusion_proof(check_hash: str, proof: Dict,
+                               root_hash: Optional[str] = None) -> bool:
+        """Check an inclusion proof (see merkle.verify_inclusion_proof)"""
+        return verify_inclusion_proof(check_hash, proof, root_hash)
+    
+    def verify_merkle_batch(self, batch_id: int) -> Tuple[bool, List[str]]:
+        """
+        Recompute one batch root from the ledger
+        Batches are independent, so callers may verify them in parallel
+        Returns (is_valid, list_of_errors)
+        """
+        row = self.conn.execute(
+            "SELECT * FROM merkle_batches WHERE id = ?", (batch_id,)
+        ).fetchone()
+        if row is None:
+            return (False, [f"Batch {batch_id}: not found"])
+        
+        batch = dict(row)
+        errors = []
+        leaves = self._batch_leaves(batch)
+        
+        if len(leaves) != batch["leaf_count"]:
+            errors.append(
+                f"Batch {batch_id}: leaf count mismatch. "
+                f"Expected: {batch['leaf_count']}, Got: {len(leaves)}"
+            )
+        
+        if leaves:
+            root_hash = merkle_root([leaf["check_hash"] for leaf in leaves])
+            if root_hash != batch["root_hash"]:
                 errors.append(
-                    f"Check {row['id']}: check_hash mismatch. "
-                    f"Expected: {expected_hash}, Got: {row['check_hash']}"
+                    f"Batch {batch_id}: root mismatch. "
+                    f"Expected: {batch['root_hash']}, Got: {root_hash}"
                 )
-            
-            previous_hash = row["check_hash"]
+        
+        previous = self.conn.execute("""
+            SELECT root_hash FROM merkle_batches
+            WHERE last_check_id < ? ORDER BY last_check_id DESC LIMIT 1
+        """, (batch["first_check_id"],)).fetchone()
+        if batch["previous_root"] != (previous[0] if previous else self.get_merkle_anchor()[1]):
+            errors.append(f"Batch {batch_id}: previous_root does not link")
         
         return (len(errors) == 0, errors)
     
-    def get_recent_checks(self, api_name: str, limit: int = 100) -> List[Dict]:
-        """Get recent checks for an API"""
+    def get_recent_checks(self, api_name: str, limit: int = 100,
+                          vantage: str = LOCAL_VANTAGE) -> List[Dict]:
+        """Get recent checks for an API from one vantage"""
         cursor = self.conn.cursor()
         cursor.execute("""
             SELECT * FROM checks
-            WHERE api_name = ?
-            ORDER BY timestamp DESC
+            WHERE api_name = ? AND vantage = ?
+            ORDER BY ts_epoch_ms DESC
             LIMIT ?
-        """, (api_name, limit))
+        """, (api_name, vantage, limit))
         
         return [dict(row) for row in cursor.fetchall()]
     
@@ -347,10 +1808,62 @@ class TruthLedgerDB:
         
         return [dict(row) for row in cursor.fetchall()]
     
+    def _iter_table(self, table: str, filters: List[Tuple[str, object]],
+                    after_id: int, chunk_size: int) -> Iterator[Dict]:
+        """
+        Stream a table's rows in id order with keyset pagination
+        Each page is its own short query (id > last id seen), so memory
+        stays at one page and no read snapshot is held between pages
+        """
+        where = "".join(f" AND {clause}" for clause, _ in filters)
+        params = [value for _, value in filters]
+        while True:
+            cursor = self.conn.execute(f"""
+                SELECT * FROM {table}
+                WHERE id > ?{where}
+                ORDER BY id ASC
+                LIMIT ?
+            """, [after_id, *params, chunk_size])
+            rows = cursor.fetchmany(chunk_size)
+            for row in rows:
+                yield dict(row)
+            if len(rows) < chunk_size:
+                return
+            after_id = rows[-1]["id"]
+    
+    def iter_checks(self, api_name: Optional[str] = None, start_ms: Optional[int] = None,
+                    end_ms: Optional[int] = None, after_id: int = 0,
+                    chunk_size: int = 5000) -> Iterator[Dict]:
+        """
+        Stream checks in id order, optionally for one API and/or the
+        window [start_ms, end_ms), starting after after_id
+        """
+        filters = []
+        if api_name is not None:
+            filters.append(("api_name = ?", api_name))
+        if start_ms is not None:
+            filters.append(("ts_epoch_ms >= ?", start_ms))
+        if end_ms is not None:
+            filters.append(("ts_epoch_ms < ?", end_ms))
+        return self._iter_table("checks", filters, after_id, chunk_size)
+    
+    def iter_discrepancies(self, api_name: Optional[str] = None,
+                           start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                           after_id: int = 0, chunk_size: int = 5000) -> Iterator[Dict]:
+        """Stream discrepancies in id order, with the same filters as iter_checks"""
+        filters = []
+        if api_name is not None:
+            filters.append(("api_name = ?", api_name))
+        if start_ms is not None:
+            filters.append(("timestamp >= ?", epoch_ms_to_iso(start_ms)))
+        if end_ms is not None:
+            filters.append(("timestamp < ?", epoch_ms_to_iso(end_ms)))
+        return self._iter_table("discrepancies", filters, after_id, chunk_size)
+    
     def get_total_checks(self) -> int:
-        """Get total number of checks ever performed"""
+        """Get total number of checks ever performed (runs count every probe)"""
         cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM checks")
+        cursor.execute("SELECT COALESCE(SUM(run_count), 0) FROM checks")
         return cursor.fetchone()[0]
     
     def _update_metadata(self, key: str, value: str):
@@ -369,13 +1882,31 @@ class TruthLedgerDB:
         row = cursor.fetchone()
         return row[0] if row else None
     
+    def record_backup(self, backup: Dict):
+        """Record a completed backup: last_backup plus its details"""
+        self._update_metadata("last_backup", backup["created_at"])
+        self._update_metadata("last_backup_info", json.dumps(backup))
+    
+    def record_replication(self, status: Dict):
+        """Record a follower's replication position and lag"""
+        self._update_metadata("replication_status", json.dumps(status))
+    
+    def record_sync(self, stats: Dict):
+        """Record the outcome of the last anti-entropy sync with a peer"""
+        self._update_metadata("last_sync", json.dumps(stats))
+    
+    def get_replication_status(self) -> Optional[Dict]:
+        """A follower's last recorded replication status, if it is one"""
+        value = self.get_metadata("replication_status")
+        return json.loads(value) if value else None
+    
     def get_database_stats(self) -> Dict:
         """Get overall database statistics"""
         cursor = self.conn.cursor()
         
         # Get counts
-        cursor.execute("SELECT COUNT(*) FROM checks")
-        total_checks = cursor.fetchone()[0]
+        cursor.execute("SELECT COALESCE(SUM(run_count), 0), COUNT(*) FROM checks")
+        total_checks, stored_rows = cursor.fetchone()
         
         cursor.execute("SELECT COUNT(*) FROM discrepancies")
         total_discrepancies = cursor.fetchone()[0]
@@ -386,12 +1917,16 @@ class TruthLedgerDB:
         cursor.execute("SELECT COUNT(*) FROM sources WHERE active = 1")
         active_sources = cursor.fetchone()[0]
         
-        # Get size
+        # Get size; in WAL mode recent pages are still in the -wal file
         import os
-        db_size_mb = os.path.getsize(self.db_path) / (1024 * 1024)
+        db_size = os.path.getsize(self.db_path)
+        if os.path.exists(f"{self.db_path}-wal"):
+            db_size += os.path.getsize(f"{self.db_path}-wal")
+        db_size_mb = db_size / (1024 * 1024)
         
         return {
             "total_checks": total_checks,
+            "stored_rows": stored_rows,
             "total_discrepancies": total_discrepancies,
             "apis_monitored": apis_monitored,
             "active_sources": active_sources,
@@ -62,3 +62,7 @@ echo ""
 echo "Active regions: ${#REGIONS[@]}"
 echo "Geographic redundancy: ENABLED"
 echo "Consensus verification: READY"
+echo ""
+echo "Replication (follow NYC's ledger from LON/SGP):"
+echo "  ssh root@\$NYC_IP 'cd /root/PHOENIX && python3 replication.py --ship -' \\"
+echo "    | python3 replication.py --db replica_nyc.db --follow -"
@@ -5,53 +5,43 @@ Priority 11: Cryptographic Chain Verification
 
 Verifies hash chain integrity across all API monitoring records.
 Run daily via cron to detect tampering.
+
+By default only rows appended since each API's last verified
+checkpoint are re-hashed, so the daily run stays fast as the ledger
+grows. Use --full for a complete audit from genesis.
 """
-import sqlite3
-import hashlib
+import argparse
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import TruthLedgerDB, chain_key
 
 DB_PATH = "truth_ledger.db"
 
-def verify_chain():
-    print("⛓️  VERIFYING CRYPTOGRAPHIC CHAIN...")
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    
-    # Get all distinct APIs
-    cur.execute("SELECT DISTINCT api_name FROM checks")
-    apis = [row[0] for row in cur.fetchall()]
+def verify_chain(db_path=DB_PATH, full=False):
+    mode = "FULL AUDIT" if full else "INCREMENTAL"
+    print(f"⛓️  VERIFYING CRYPTOGRAPHIC CHAIN ({mode})...")
+    db = TruthLedgerDB(db_path)
     
     total_errors = 0
     
-    for api in apis:
-        print(f"   Scanning {api}...", end=" ")
-        cur.execute("""
-            SELECT id, timestamp, endpoint, status, status_code, previous_hash, check_hash 
-            FROM checks 
-            WHERE api_name = ? 
-            ORDER BY id ASC
-        """, (api,))
-        rows = cur.fetchall()
-        
-        chain_valid = True
-        
-        for i in range(len(rows)):
-            row = rows[i]
-            
-            # Verify the previous hash links to the previous row
-            if i > 0:
-                prev_row_hash = rows[i-1][6]  # check_hash of previous
-                current_prev_ptr = row[5]     # previous_hash of current
-                
-                if prev_row_hash != current_prev_ptr:
-                    print(f"BROKEN LINK at ID {row[0]}")
-                    chain_valid = False
-                    total_errors += 1
-                    break
+    # One chain per API and vantage
+    for api, vantage in db.get_chains():
+        print(f"   Scanning {chain_key(api, vantage)}...", end=" ")
+        chain_valid, errors = db.verify_chain_integrity(api, full=full, vantage=vantage)
         
         if chain_valid:
-            print("OK.")
-            
+            checkpoint = db.get_chain_checkpoint(api, vantage)
+            through = f" (verified through ID {checkpoint[0]})" if checkpoint else ""
+            print(f"OK.{through}")
+        else:
+            print(f"BROKEN: {errors[0]}")
+            total_errors += 1
+    
+    db.close()
+    
     if total_errors == 0:
         print("✅ INTEGRITY CONFIRMED. 0 ERRORS.")
         sys.exit(0)
@@ -60,4 +50,11 @@ def verify_chain():
         sys.exit(1)
 
 if __name__ == "__main__":
-    verify_chain()
+    parser = argparse.ArgumentParser(description="Truth Ledger chain verifier")
+    parser.add_argument("--db", default=DB_PATH,
+                        help=f"Database path (default: {DB_PATH})")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-hash every chain from genesis instead of "
+                             "resuming from checkpoints")
+    args = parser.parse_args()
+    verify_chain(args.db, full=args.full)
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Probe Ingest - Signed Check Batches from Remote Probe Workers
+Lets monitors in other regions record their probes in a central ledger,
+each under its own vantage, so one ledger can tell a regional network
+blip from a provider outage (see TruthLedgerDB.get_consensus_status)
+
+A worker POSTs a JSON list of checks to /ingest with three headers:
+    X-Truth-Vantage    the worker's vantage name
+    X-Truth-Timestamp  epoch milliseconds when the batch was signed
+    X-Truth-Signature  hex HMAC-SHA256 over "<vantage>\\n<timestamp>\\n"
+                       followed by the raw body, keyed with the
+                       vantage's shared secret
+
+The server rejects unknown vantages and bad signatures (401), batches
+signed too far from its clock (401) or not after the vantage's last
+accepted batch (409, a replay), oversized bodies (413) and malformed
+checks (400). Accepted checks are stamped with the header's vantage,
+whatever they claim, and written in order through the ledger service's
+single writer; the central ledger hash-chains them under (api, vantage)
+itself. The last accepted timestamp per vantage is kept in metadata
+(ingest_last:<vantage>), so replays stay rejected across restarts.
+
+A worker's own ledger keeps its probes under vantage "", chained there
+independently; feed a central ledger from a worker by ingest or by
+ledger_sync, not both, or the two copies of its chains will not link.
+
+Keys are a JSON file mapping vantage names to secrets:
+    {"eu-west": "<secret>", "ap-south": "<secret>"}
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import sqlite3
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+import requests
+
+from database import iso_to_epoch_ms, utc_now_ms
+from ledger_service import LedgerService
+from ledger_sync import VANTAGE_KEY
+
+
+logger = logging.getLogger(__name__)
+
+INGEST_PATH = "/ingest"
+LAST_ACCEPTED_PREFIX = "ingest_last:"
+
+# Batches signed further than this from the server's clock are refused
+MAX_SKEW_MS = 300_000
+MAX_BODY_BYTES = 4 * 1024 * 1024
+MAX_CHECKS = 5000
+
+REQUIRED_FIELDS = ("timestamp", "api_name", "endpoint", "status", "source")
+STATUSES = ("up", "down", "timeout", "error")
+
+
+class IngestError(ValueError):
+    """A batch the server refuses, with the HTTP status to answer"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def sign(secret: str, vantage: str, timestamp_ms: int, body: bytes) -> str:
+    """Signature a batch is sent with"""
+    message = f"{vantage}\n{timestamp_ms}\n".encode() + body
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def load_keys(path: str) -> Dict[str, str]:
+    """Vantage -> secret from a keys file"""
+    with open(path) as f:
+        keys = json.load(f)
+    if not isinstance(keys, dict) or not all(
+            isinstance(name, str) and isinstance(secret, str) and secret
+            for name, secret in keys.items()):
+        raise ValueError(f"{path} must map vantage names to non-empty secrets")
+    for name in keys:
+        if not name or "@" in name:
+            raise ValueError(f"{path}: vantage names must be non-empty and without '@'")
+    return keys
+
+
+def validate_checks(checks, vantage: str) -> List[Dict]:
+    """Checks from a batch body, stamped with the sender's vantage"""
+    if not isinstance(checks, list) or not checks:
+        raise IngestError(400, "body must be a non-empty JSON list of checks")
+    if len(checks) > MAX_CHECKS:
+        raise IngestError(413, f"at most {MAX_CHECKS} checks per batch")
+    
+    valid = []
+    for index, check in enumerate(checks):
+        if not isinstance(check, dict):
+            raise IngestError(400, f"check {index} is not an object")
+        missing = [field for field in REQUIRED_FIELDS if not check.get(field)]
+        if missing:
+            raise IngestError(400, f"check {index} is missing {', '.join(missing)}")
+        # Anything the ledger cannot store must be refused here: a batch
+        # that fails in the writer is a 500, which clients retry forever
+        for field in REQUIRED_FIELDS + ("raw_response",):
+            if check.get(field) is not None and not isinstance(check[field], str):
+                raise IngestError(400, f"check {index} has a non-string {field}")
+        if check["status"] not in STATUSES:
+            raise IngestError(400, f"check {index} has unknown status {check['status']!r}")
+        for field in ("response_time_ms", "status_code"):
+            value = check.get(field)
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+                raise IngestError(400, f"check {index} has a non-integer {field}")
+        try:
+            iso_to_epoch_ms(check["timestamp"])
+        except (TypeError, ValueError):
+            raise IngestError(400, f"check {index} has a bad timestamp")
+        valid.append(dict(check, vantage=vantage))
+    return valid
+
+
+class IngestServer(ThreadingHTTPServer):
+    """HTTP front for a ledger service that accepts signed check batches"""
+    
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int], ledger: LedgerService,
+                 keys: Dict[str, str], max_skew_ms: int = MAX_SKEW_MS,
+                 max_body: int = MAX_BODY_BYTES):
+        self.ledger = ledger
+        self.keys = keys
+        self.max_skew_ms = max_skew_ms
+        self.max_body = max_body
+        
+        with ledger.reader() as db:
+            own = db.get_metadata(VANTAGE_KEY)
+            rows = db.conn.execute(
+                "SELECT key, value FROM metadata WHERE key LIKE ?",
+                (LAST_ACCEPTED_PREFIX + "%",)
+            ).fetchall()
+        if own in keys:
+            # Its rows would collide with the ledger's own under sync
+            raise ValueError(f"{own!r} is this ledger's own vantage; it cannot be ingested")
+        self.last_accepted = {
+            row["key"][len(LAST_ACCEPTED_PREFIX):]: int(row["value"]) for row in rows
+        }
+        self._lock = threading.Lock()
+        
+        self.accepted = 0
+        self.rejected = 0
+        super().__init__(address, IngestHandler)
+    
+    def authenticate(self, vantage: str, timestamp: str, signature: str,
+                     body: bytes) -> int:
+        """The batch's timestamp once its signature and clock check out"""
+        secret = self.keys.get(vantage)
+        # Unknown vantages are checked against a dummy key, in the same time
+        expected = sign(secret or "unknown", vantage, timestamp, body)
+        if not hmac.compare_digest(expected, signature) or secret is None:
+            raise IngestError(401, "bad vantage or signature")
+        try:
+            timestamp_ms = int(timestamp)
+        except ValueError:
+            raise IngestError(401, "bad timestamp")
+        skew = abs(utc_now_ms() - timestamp_ms)
+        if skew > self.max_skew_ms:
+            raise IngestError(401, f"timestamp is {skew / 1000:.0f}s off the server clock")
+        return timestamp_ms
+    
+    def accept(self, vantage: str, timestamp_ms: int, checks: List[Dict]) -> List[str]:
+        """Write an authenticated batch unless it replays an accepted one"""
+        with self._lock:
+            previous = self.last_accepted.get(vantage)
+            if previous is not None and timestamp_ms <= previous:
+                raise IngestError(409, "batch is not newer than the last one accepted")
+            self.last_accepted[vantage] = timestamp_ms
+            # Queued under the lock, so batches land in timestamp order
+            written = self.ledger.submit_many(checks)
+            # Runs after the batch's commit; a failed batch stays resendable
+            self.ledger.call(lambda db: written.exception() is None and db._update_metadata(
+                LAST_ACCEPTED_PREFIX + vantage, str(timestamp_ms)
+            ))
+        try:
+            return written.result()
+        except sqlite3.IntegrityError:
+            # Resending would fail the same way
+            raise IngestError(400, "checks duplicate rows already in the ledger")
+        except Exception:
+            with self._lock:
+                if self.last_accepted.get(vantage) == timestamp_ms:
+                    # Let the worker resend it
+                    if previous is None:
+                        del self.last_accepted[vantage]
+                    else:
+                        self.last_accepted[vantage] = previous
+            raise
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    """POST /ingest"""
+    
+    server: IngestServer
+    
+    def do_POST(self):
+        try:
+            if self.path != INGEST_PATH:
+                raise IngestError(404, "not found")
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > self.server.max_body:
+                self.close_connection = True
+                raise IngestError(413, f"body over {self.server.max_body} bytes")
+            body = self.rfile.read(length)
+            
+            vantage = self.headers.get("X-Truth-Vantage", "")
+            timestamp_ms = self.server.authenticate(
+                vantage,
+                self.headers.get("X-Truth-Timestamp", ""),
+                self.headers.get("X-Truth-Signature", ""),
+                body
+            )
+            try:
+                checks = json.loads(body)
+            except ValueError:
+                raise IngestError(400, "body is not JSON")
+            checks = validate_checks(checks, vantage)
+            hashes = self.server.accept(vantage, timestamp_ms, checks)
+        except IngestError as e:
+            self.server.rejected += 1
+            logger.warning(f"Rejected batch from {self.client_address[0]}: {e}")
+            self._reply(e.status, {"error": str(e)})
+            return
+        except Exception as e:
+            self.server.rejected += 1
+            logger.error(f"Ingest from {self.client_address[0]} failed: {e}")
+            self._reply(500, {"error": "ledger write failed"})
+            return
+        
+        self.server.accepted += len(hashes)
+        logger.info(f"Accepted {len(hashes)} checks from {vantage}")
+        self._reply(200, {"accepted": len(hashes), "hashes": hashes})
+    
+    def _reply(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.client_address[0]} {format % args}")
+
+
+class IngestClient:
+    """
+    Sends a probe worker's checks to a central ledger
+    Batches that fail to send are kept (up to max_buffer checks) and
+    resent, in order, ahead of the next submission.
+    """
+    
+    def __init__(self, url: str, vantage: str, secret: str,
+                 timeout: float = 10.0, max_buffer: int = 50000):
+        self.url = url.rstrip("/") + INGEST_PATH if not url.endswith(INGEST_PATH) else url
+        self.vantage = vantage
+        self.secret = secret
+        self.timeout = timeout
+        self.max_buffer = max_buffer
+        self.session = requests.Session()
+        # (timestamp_ms, body, checks) of batches not yet delivered
+        self._pending: deque = deque()
+        self._last_ms = 0
+        
+        self.sent = 0
+        self.dropped = 0
+    
+    def _seal(self, checks: List[Dict]) -> Tuple[int, bytes, int]:
+        # Timestamps must rise even if the clock does not
+        self._last_ms = max(utc_now_ms(), self._last_ms + 1)
+        return self._last_ms, json.dumps(checks, separators=(",", ":")).encode(), len(checks)
+    
+    def submit(self, checks: List[Dict]) -> bool:
+        """Queue checks and send everything pending; False if some is left"""
+        if checks:
+            self._pending.append(self._seal(checks))
+            self._trim()
+        
+        while self._pending:
+            timestamp_ms, body, count = self._pending[0]
+            try:
+                response = self._post(timestamp_ms, body)
+            except requests.RequestException as e:
+                logger.warning(f"Ingest to {self.url} failed, {self.buffered()} checks kept: {e}")
+                return False
+            
+            if response.status_code == 200:
+                self.sent += count
+            elif response.status_code == 409:
+                # An earlier attempt landed but its reply was lost
+                pass
+            elif response.status_code == 401 and abs(utc_now_ms() - timestamp_ms) > MAX_SKEW_MS // 2:
+                # Held back too long to pass the server's clock check; re-sign
+                self._pending[0] = self._seal(json.loads(body))
+                continue
+            elif response.status_code >= 500:
+                logger.warning(f"Ingest server error {response.status_code}, "
+                               f"{self.buffered()} checks kept")
+                return False
+            else:
+                self.dropped += count
+                logger.error(f"Ingest refused a batch ({response.status_code}): "
+                             f"{response.text[:200]}")
+            self._pending.popleft()
+        return True
+    
+    def _post(self, timestamp_ms: int, body: bytes) -> requests.Response:
+        return self.session.post(self.url, data=body, timeout=self.timeout, headers={
+            "Content-Type": "application/json",
+            "X-Truth-Vantage": self.vantage,
+            "X-Truth-Timestamp": str(timestamp_ms),
+            "X-Truth-Signature": sign(self.secret, self.vantage, timestamp_ms, body),
+        })
+    
+    def _trim(self):
+        """Drop the oldest batches once the buffer is over its limit"""
+        while len(self._pending) > 1 and self.buffered() > self.max_buffer:
+            self.dropped += self._pending.popleft()[2]
+    
+    def buffered(self) -> int:
+        """Checks waiting to be delivered"""
+        return sum(count for _, _, count in self._pending)
+    
+    def close(self):
+        self.session.close()
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Truth Ledger Probe Ingest')
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='truth_ledger.db',
+        help='Central ledger to record ingested checks in (default: truth_ledger.db)'
+    )
+    parser.add_argument(
+        '--keys',
+        type=str,
+        required=True,
+        help='JSON file mapping vantage names to shared secrets'
+    )
+    parser.add_argument(
+        '--host',
+        type=str,
+        default='0.0.0.0',
+        help='Address to listen on (default: 0.0.0.0)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8470,
+        help='Port to listen on (default: 8470)'
+    )
+    parser.add_argument(
+        '--max-skew',
+        type=int,
+        default=MAX_SKEW_MS // 1000,
+        help='Seconds a batch timestamp may be off the server clock (default: 300)'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Store runs of identical probes as one row (marks the ledger compact)'
+    )
+    
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    
+    keys = load_keys(args.keys)
+    ledger = LedgerService(args.db, compact=args.compact)
+    try:
+        server = IngestServer((args.host, args.port), ledger, keys,
+                              max_skew_ms=args.max_skew * 1000)
+        logger.info(f"Ingesting into {args.db} on {args.host}:{args.port} "
+                    f"for {len(keys)} vantages: {', '.join(sorted(keys))}")
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ledger.close()
+        logger.info("Ingest stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Latency Histogram Module
+Compact, mergeable log-bucketed histograms of response times
+
+Values below 16ms get exact buckets. Above that every power of two is
+split into 8 sub-buckets, so a bucket is at most 12.5% wide and a
+1ms..10min range needs about 150 buckets. Histograms are stored
+sparsely as JSON {bucket_index: count} and merge by adding counts.
+Percentiles are interpolated inside the bucket that holds the rank,
+so estimates are within one bucket width of the true value.
+"""
+
+import json
+from typing import Dict, Iterable, Optional
+
+
+LINEAR_LIMIT = 16
+SUB_BUCKETS = 8
+_SUB_BITS = 3  # log2(SUB_BUCKETS)
+_LINEAR_BITS = 4  # log2(LINEAR_LIMIT)
+
+# Percentiles reported by default (p50/p90/p99/p99.9)
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def percentile_label(q: float) -> str:
+    """Display/key name for a percentile, e.g. 99.9 -> 'p99.9'"""
+    return f"p{q:g}"
+
+
+def bucket_index(value_ms: int) -> int:
+    """Bucket index for a latency in milliseconds"""
+    value_ms = max(0, int(value_ms))
+    if value_ms < LINEAR_LIMIT:
+        return value_ms
+    exponent = value_ms.bit_length() - 1
+    sub = (value_ms >> (exponent - _SUB_BITS)) & (SUB_BUCKETS - 1)
+    return LINEAR_LIMIT + (exponent - _LINEAR_BITS) * SUB_BUCKETS + sub
+
+
+def bucket_bounds(index: int) -> tuple:
+    """Inclusive lower and exclusive upper bound (ms) of a bucket"""
+    if index < LINEAR_LIMIT:
+        return index, index + 1
+    exponent = (index - LINEAR_LIMIT) // SUB_BUCKETS + _LINEAR_BITS
+    sub = (index - LINEAR_LIMIT) % SUB_BUCKETS
+    width = 1 << (exponent - _SUB_BITS)
+    lower = (1 << exponent) + sub * width
+    return lower, lower + width
+
+
+class LatencyHistogram:
+    """Sparse log-bucketed latency histogram"""
+    
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts or {})
+    
+    def add(self, value_ms: Optional[int], count: int = 1):
+        """Record a latency (None is ignored)"""
+        if value_ms is None:
+            return
+        index = bucket_index(value_ms)
+        self.counts[index] = self.counts.get(index, 0) + count
+    
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's counts into this one"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        return self
+    
+    def total(self) -> int:
+        return sum(self.counts.values())
+    
+    def to_json(self) -> str:
+        return json.dumps({str(k): v for k, v in sorted(self.counts.items())},
+                          separators=(",", ":"))
+    
+    @classmethod
+    def from_json(cls, data: Optional[str]) -> "LatencyHistogram":
+        if not data:
+            return cls()
+        return cls({int(k): v for k, v in json.loads(data).items()})
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimated latency (ms) at percentile q, None when empty"""
+        total = self.total()
+        if not total:
+            return None
+        
+        rank = max(1.0, q / 100.0 * total)
+        seen = 0
+        for index in sorted(self.counts):
+            count = self.counts[index]
+            if seen + count >= rank:
+                lower, upper = bucket_bounds(index)
+                if upper - lower == 1:
+                    return float(lower)
+                return round(lower + (rank - seen) / count * (upper - lower), 1)
+            seen += count
+        return float(bucket_bounds(max(self.counts))[1])
+    
+    def percentiles(self, quantiles: Iterable[float] = PERCENTILES) -> Dict[str, Optional[float]]:
+        """Percentile estimates keyed by label, e.g. {'p50': 120.0, ...}"""
+        return {percentile_label(q): self.percentile(q) for q in quantiles}
+    
+    @classmethod
+    def merged(cls, histograms: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        result = cls()
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+
+def merge_histogram_json(left: Optional[str], right: Optional[str]) -> str:
+    """SQL helper: merge two JSON-encoded histograms"""
+    return LatencyHistogram.from_json(left).merge(
+        LatencyHistogram.from_json(right)
+    ).to_json()
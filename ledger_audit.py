@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Ledger Audit - Parallel Full Chain Verification
+Re-hashes every check in the ledger across all CPU cores
+
+Each API's chain is split into id-range shards. Workers verify shards
+through their own read-only connections, streaming rows in chunks, and
+the coordinator stitches shard boundaries back together. Completed
+shards are recorded in a state file so an interrupted audit resumes
+where it stopped.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from database import CHAIN_COLUMNS, ChainVerifier, TruthLedgerDB, chain_key
+from merkle import merkle_root
+
+
+# Errors kept per shard - a broken chain can produce one per row
+MAX_SHARD_ERRORS = 20
+
+
+def open_read_only(db_path: str) -> sqlite3.Connection:
+    """Open a query-only connection to the ledger"""
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+def plan_shards(db_path: str, shards_per_api: int) -> List[Dict]:
+    """
+    Split every chain into id-range shards
+    Ranges cut the global id space evenly, which splits interleaved
+    per-chain rows into shards of roughly equal size
+    """
+    conn = open_read_only(db_path)
+    try:
+        min_id, max_id = conn.execute("SELECT MIN(id), MAX(id) FROM checks").fetchone()
+        chains = conn.execute(
+            "SELECT DISTINCT api_name, vantage FROM checks ORDER BY api_name, vantage"
+        ).fetchall()
+    finally:
+        conn.close()
+    
+    if min_id is None:
+        return []
+    
+    span = max_id - min_id + 1
+    step = max(1, -(-span // shards_per_api))
+    bounds = list(range(min_id - 1, max_id, step)) + [max_id]
+    
+    shards = []
+    for api_name, vantage in chains:
+        for index, (after_id, through_id) in enumerate(zip(bounds, bounds[1:])):
+            shards.append({
+                "key": f"{chain_key(api_name, vantage)}:{index}",
+                "chain": chain_key(api_name, vantage),
+                "api_name": api_name,
+                "vantage": vantage,
+                "index": index,
+                "after_id": after_id,
+                "through_id": through_id
+            })
+    return shards
+
+
+def audit_shard(db_path: str, shard: Dict, chunk_size: int) -> Dict:
+    """
+    Verify one shard in a worker process
+    The shard is hashed starting from its first row's stored
+    previous_hash; the coordinator checks that link when stitching
+    """
+    started = time.perf_counter()
+    conn = open_read_only(db_path)
+    try:
+        cursor = conn.execute(f"""
+            SELECT {CHAIN_COLUMNS}
+            FROM checks
+            WHERE api_name = ? AND vantage = ? AND id > ? AND id <= ?
+            ORDER BY id ASC
+        """, (shard["api_name"], shard["vantage"], shard["after_id"], shard["through_id"]))
+        
+        verifier = None
+        first_previous_hash = None
+        first_id = None
+        
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if verifier is None:
+                first_id = rows[0]["id"]
+                first_previous_hash = rows[0]["previous_hash"]
+                verifier = ChainVerifier(first_previous_hash)
+            for row in rows:
+                verifier.feed(row)
+    finally:
+        conn.close()
+    
+    errors = verifier.errors if verifier else []
+    return {
+        "key": shard["key"],
+        "chain": shard["chain"],
+        "api_name": shard["api_name"],
+        "index": shard["index"],
+        "rows": verifier.rows if verifier else 0,
+        "first_id": first_id,
+        "first_previous_hash": first_previous_hash,
+        "last_id": verifier.last_id if verifier else None,
+        "last_hash": verifier.previous_hash if verifier else None,
+        "last_check_hash": verifier.last_check_hash if verifier else None,
+        "error_count": len(errors),
+        "errors": errors[:MAX_SHARD_ERRORS],
+        "seconds": time.perf_counter() - started
+    }
+
+
+def stitch_api(shard_results: List[Dict], anchor: str = "") -> Dict:
+    """
+    Join a chain's shard results and check links across shard boundaries
+    anchor is what the first row links to ("" unless older rows were
+    carved out into segments)
+    """
+    shard_results = sorted(shard_results, key=lambda r: r["index"])
+    errors = []
+    error_count = 0
+    previous_hash = anchor
+    rows = 0
+    last_id = None
+    last_check_hash = None
+    
+    for result in shard_results:
+        rows += result["rows"]
+        error_count += result["error_count"]
+        errors.extend(result["errors"])
+        if not result["rows"]:
+            continue
+        if result["first_previous_hash"] != previous_hash:
+            error_count += 1
+            errors.append(
+                f"Check {result['first_id']}: previous_hash mismatch. "
+                f"Expected: {previous_hash}, Got: {result['first_previous_hash']}"
+            )
+        previous_hash = result["last_hash"]
+        last_id = result["last_id"]
+        last_check_hash = result.get("last_check_hash")
+    
+    return {
+        "rows": rows,
+        "valid": error_count == 0,
+        "error_count": error_count,
+        "errors": errors[:MAX_SHARD_ERRORS],
+        "last_id": last_id,
+        "last_hash": previous_hash,
+        "last_check_hash": last_check_hash
+    }
+
+
+class AuditState:
+    """Resumable audit progress persisted as JSON"""
+    
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.data: Dict = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.data = json.load(f)
+    
+    def matches(self, db_path: str) -> bool:
+        return self.data.get("db_path") == os.path.abspath(db_path)
+    
+    def start(self, db_path: str, shards: List[Dict]):
+        self.data = {
+            "db_path": os.path.abspath(db_path),
+            "started_at": datetime.utcnow().isoformat(),
+            "shards": shards,
+            "completed": {}
+        }
+        self.save()
+    
+    def record(self, result: Dict):
+        self.data["completed"][result["key"]] = result
+        self.save()
+    
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+
+def run_audit(db_path: str, workers: int = None, chunk_size: int = 5000,
+              shards_per_api: int = None, state_path: Optional[str] = None,
+              progress: bool = True) -> Dict:
+    """
+    Run a full parallel audit
+    Returns per-API results plus overall rows/sec
+    """
+    workers = workers or os.cpu_count() or 1
+    state = AuditState(state_path)
+    
+    if state.data and state.matches(db_path):
+        shards = state.data["shards"]
+        done = len(state.data["completed"])
+        if progress:
+            print(f"Resuming audit started {state.data['started_at']} "
+                  f"({done}/{len(shards)} shards already verified)")
+    else:
+        # Enough shards per API to keep every worker busy
+        conn = open_read_only(db_path)
+        try:
+            apis = conn.execute("SELECT COUNT(DISTINCT api_name) FROM checks").fetchone()[0]
+        finally:
+            conn.close()
+        shards_per_api = shards_per_api or max(1, -(-workers * 4 // max(1, apis)))
+        shards = plan_shards(db_path, shards_per_api)
+        state.start(db_path, shards)
+    
+    completed = state.data["completed"]
+    pending = [shard for shard in shards if shard["key"] not in completed]
+    
+    started = time.perf_counter()
+    audited_rows = 0
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(audit_shard, db_path, shard, chunk_size)
+            for shard in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            state.record(result)
+            audited_rows += result["rows"]
+            if progress:
+                elapsed = time.perf_counter() - started
+                rate = audited_rows / elapsed if elapsed else 0
+                print(
+                    f"   [{len(completed)}/{len(shards)}] {result['key']:<24} "
+                    f"{result['rows']:>10,} rows  "
+                    f"{'OK' if not result['error_count'] else 'BROKEN'}  "
+                    f"({rate:,.0f} rows/sec)"
+                )
+    
+    elapsed = time.perf_counter() - started
+    
+    by_chain: Dict[str, List[Dict]] = {}
+    for result in completed.values():
+        # Results saved before chains had vantages are the API's own chain
+        by_chain.setdefault(result.get("chain", result["api_name"]), []).append(result)
+    
+    with TruthLedgerDB(db_path, read_only=True) as db:
+        anchors = db.get_chain_anchors()
+    apis = {
+        key: stitch_api(results, anchors.get(key, ""))
+        for key, results in sorted(by_chain.items())
+    }
+    return {
+        "apis": apis,
+        "valid": all(api["valid"] for api in apis.values()),
+        "rows": sum(api["rows"] for api in apis.values()),
+        "audited_rows": audited_rows,
+        "seconds": elapsed,
+        "rows_per_sec": audited_rows / elapsed if elapsed else 0,
+        "workers": workers
+    }
+
+
+def audit_merkle_batches(db_path: str, batches: List[Dict]) -> List[Dict]:
+    """Recompute a group of batch roots in a worker process"""
+    conn = open_read_only(db_path)
+    results = []
+    try:
+        for batch in batches:
+            leaves = [row[0] for row in conn.execute("""
+                SELECT check_hash FROM checks
+                WHERE id >= ? AND id <= ? ORDER BY id
+            """, (batch["first_check_id"], batch["last_check_id"]))]
+            errors = []
+            if len(leaves) != batch["leaf_count"]:
+                errors.append(
+                    f"Batch {batch['id']}: leaf count mismatch. "
+                    f"Expected: {batch['leaf_count']}, Got: {len(leaves)}"
+                )
+            if leaves and merkle_root(leaves) != batch["root_hash"]:
+                errors.append(f"Batch {batch['id']}: root mismatch")
+            results.append({"id": batch["id"], "rows": len(leaves), "errors": errors})
+    finally:
+        conn.close()
+    return results
+
+
+def run_merkle_audit(db_path: str, workers: int = None,
+                     batches_per_task: int = 64) -> Dict:
+    """
+    Verify every sealed Merkle batch in parallel
+    Root links are checked in the coordinator; the expensive root
+    recomputation is spread across the pool
+    """
+    workers = workers or os.cpu_count() or 1
+    conn = open_read_only(db_path)
+    try:
+        batches = [dict(row) for row in conn.execute(
+            "SELECT * FROM merkle_batches ORDER BY last_check_id"
+        )]
+    finally:
+        conn.close()
+    with TruthLedgerDB(db_path, read_only=True) as db:
+        previous_root = db.get_merkle_anchor()[1]
+    
+    errors = []
+    for batch in batches:
+        if batch["previous_root"] != previous_root:
+            errors.append(f"Batch {batch['id']}: previous_root does not link")
+        previous_root = batch["root_hash"]
+    
+    started = time.perf_counter()
+    rows = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(audit_merkle_batches, db_path, batches[i:i + batches_per_task])
+            for i in range(0, len(batches), batches_per_task)
+        ]
+        for future in as_completed(futures):
+            for result in future.result():
+                rows += result["rows"]
+                errors.extend(result["errors"])
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "batches": len(batches),
+        "rows": rows,
+        "valid": not errors,
+        "errors": errors,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed else 0,
+        "workers": workers
+    }
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Truth Ledger Parallel Audit')
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='truth_ledger.db',
+        help='Database path (default: truth_ledger.db)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=5000,
+        help='Rows fetched per round trip (default: 5000)'
+    )
+    parser.add_argument(
+        '--shards-per-api',
+        type=int,
+        default=None,
+        help='Id-range shards per API chain (default: enough to fill workers)'
+    )
+    parser.add_argument(
+        '--state',
+        type=str,
+        default='audit_state.json',
+        help='Resumable state file (default: audit_state.json)'
+    )
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Ignore any saved state and audit from scratch'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        action='store_true',
+        help='On success, advance the incremental verification checkpoints'
+    )
+    parser.add_argument(
+        '--merkle',
+        action='store_true',
+        help='Verify sealed Merkle batch roots instead of hash chains'
+    )
+    
+    args = parser.parse_args()
+    
+    if args.merkle:
+        report = run_merkle_audit(args.db, workers=args.workers)
+        print(f"Verified {report['batches']:,} Merkle batches "
+              f"({report['rows']:,} leaves) in {report['seconds']:.2f}s "
+              f"with {report['workers']} workers ({report['rows_per_sec']:,.0f} rows/sec)")
+        for error in report["errors"][:20]:
+            print(f"   ✗ {error}")
+        print("✓ ALL MERKLE BATCHES VERIFIED" if report["valid"]
+              else "✗ MERKLE BATCH VERIFICATION FAILED")
+        sys.exit(0 if report["valid"] else 1)
+    
+    if args.restart and os.path.exists(args.state):
+        os.remove(args.state)
+    
+    print("=" * 60)
+    print("TRUTH LEDGER - PARALLEL FULL AUDIT")
+    print("=" * 60)
+    
+    report = run_audit(
+        args.db,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        shards_per_api=args.shards_per_api,
+        state_path=args.state
+    )
+    
+    print("-" * 60)
+    for api_name, result in report["apis"].items():
+        status = "✓" if result["valid"] else "✗"
+        print(f"{status} {api_name:20s} {result['rows']:>12,} rows  "
+              f"{result['error_count']:>6} errors")
+        for error in result["errors"][:5]:
+            print(f"      {error}")
+    print("-" * 60)
+    print(f"Audited {report['audited_rows']:,} rows in {report['seconds']:.2f}s "
+          f"with {report['workers']} workers "
+          f"({report['rows_per_sec']:,.0f} rows/sec)")
+    
+    if report["valid"]:
+        print("✓ ALL HASH CHAINS VERIFIED")
+        if args.checkpoint:
+            with TruthLedgerDB(args.db) as db:
+                for key, result in report["apis"].items():
+                    if result["last_check_hash"] is not None:
+                        db._save_chain_checkpoint(
+                            key, result["last_id"], result["last_check_hash"]
+                        )
+        if os.path.exists(args.state):
+            os.remove(args.state)
+    else:
+        print("✗ HASH CHAIN VERIFICATION FAILED")
+    print("=" * 60)
+    
+    sys.exit(0 if report["valid"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Ledger Backup - Online Full and Incremental Backups
+Copies the live ledger without stopping the monitor
+
+A full backup runs SQLite's online backup API a few pages per step. The
+source connection holds one read transaction for the whole copy, so in
+WAL mode the writer keeps committing while the copy sees a single
+consistent snapshot and never has to restart. The copy's chain heads
+are checked against the snapshot's before it replaces the destination.
+
+A backup set (--dir) starts with a full backup. After that, each
+incremental backup writes a delta file holding only:
+- checks appended since the previous backup, plus the previous chain
+  heads (compact runs grow in place)
+- rollup buckets those checks touched
+- new discrepancies and Merkle batches
+- sources and metadata
+
+Each delta's chains are verified from the previous backup's heads.
+Closed segments (see ledger_segments) are immutable, so they are copied
+once. Carving a month out of the live file starts a new full backup.
+Every successful backup updates last_backup in the source ledger.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from database import (
+    CHAIN_COLUMNS, DAY_MS, ROLLUP_TABLES, ChainVerifier, TruthLedgerDB, chain_key,
+    chain_link
+)
+from ledger_segments import MANIFEST_NAME, SEGMENT_SEAL_KEY, SegmentStore, file_sha256
+
+
+MANIFEST = "backup.json"
+
+# Tables a delta copies rows of by id
+APPEND_TABLES = ("discrepancies", "merkle_batches")
+
+
+def head_rows(conn: sqlite3.Connection, schema: str = "main") -> Dict[str, Dict]:
+    """Each chain's head: its id, check_hash and the link it hands on"""
+    rows = conn.execute(f"""
+        SELECT {CHAIN_COLUMNS} FROM {schema}.checks
+        WHERE id IN (SELECT MAX(id) FROM {schema}.checks GROUP BY api_name, vantage)
+    """)
+    return {
+        chain_key(row["api_name"], row["vantage"]): {
+            "id": row["id"], "check_hash": row["check_hash"], "link": chain_link(row)
+        }
+        for row in rows
+    }
+
+
+def _links(heads: Dict[str, Dict]) -> Dict[str, str]:
+    return {key: head["link"] for key, head in heads.items()}
+
+
+def _open_snapshot(db_path: str) -> sqlite3.Connection:
+    """
+    Read-only connection pinned to one snapshot of the ledger
+    The read transaction stays open until the caller commits, and WAL
+    lets the writer carry on meanwhile
+    """
+    conn = sqlite3.connect(
+        f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, isolation_level=None
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
+
+def _pin(conn: sqlite3.Connection):
+    conn.execute("BEGIN")
+    conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone()
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> str:
+    return ", ".join(row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})"))
+
+
+def _snapshot_info(conn: sqlite3.Connection) -> Dict:
+    """What a later incremental backup needs to know about this snapshot"""
+    last_ids = {
+        table: conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        for table in ("checks",) + APPEND_TABLES
+    }
+    seal = conn.execute(
+        "SELECT value FROM metadata WHERE key = ?", (SEGMENT_SEAL_KEY,)
+    ).fetchone()
+    return {
+        "heads": head_rows(conn),
+        "last_ids": last_ids,
+        "segment_seal": seal[0] if seal else ""
+    }
+
+
+def print_progress(copied: int, total: int, seconds: float):
+    """Default progress reporter: bytes copied and throughput"""
+    mb = 1024 * 1024
+    rate = copied / mb / seconds if seconds else 0
+    print(f"   copied {copied / mb:,.1f}/{total / mb:,.1f}MB "
+          f"({copied / total * 100 if total else 100:5.1f}%)  {rate:,.1f} MB/s",
+          end="\r", flush=True)
+
+
+def online_backup(db_path: str, dest_path: str, pages: int = 256, sleep: float = 0.0,
+                  progress: Optional[Callable[[int, int, float], None]] = None) -> Dict:
+    """
+    Full copy of a live ledger via the online backup API, pages per step
+    (sleeping between steps if asked); progress gets (bytes copied,
+    bytes total, seconds) after every step. Raises ValueError and leaves
+    dest_path untouched if the copy's chain heads differ from the source.
+    Returns the backup's details
+    """
+    tmp_path = f"{dest_path}.tmp"
+    _remove(tmp_path)
+    src = _open_snapshot(db_path)
+    page_size = src.execute("PRAGMA page_size").fetchone()[0]
+    started = time.perf_counter()
+    try:
+        _pin(src)
+        info = _snapshot_info(src)
+        dst = sqlite3.connect(tmp_path)
+        try:
+            def on_step(status, remaining, total):
+                if progress:
+                    progress((total - remaining) * page_size, total * page_size,
+                             time.perf_counter() - started)
+            
+            src.backup(dst, pages=pages, progress=on_step, sleep=sleep)
+            src.execute("COMMIT")
+            
+            # The copy is standalone, not a WAL database missing its log
+            dst.execute("PRAGMA journal_mode = DELETE")
+            dst.row_factory = sqlite3.Row
+            copy_heads = head_rows(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    elapsed = time.perf_counter() - started
+    
+    if _links(copy_heads) != _links(info["heads"]):
+        _remove(tmp_path)
+        raise ValueError("Backup copy's chain heads do not match the source")
+    os.replace(tmp_path, dest_path)
+    
+    size = os.path.getsize(dest_path)
+    return dict(info, **{
+        "kind": "full",
+        "file": os.path.basename(dest_path),
+        "created_at": datetime.utcnow().isoformat(),
+        "bytes": size,
+        "pages": size // page_size,
+        "seconds": elapsed,
+        "mb_per_sec": size / (1024 * 1024) / elapsed if elapsed else 0
+    })
+
+
+def delta_backup(db_path: str, dest_path: str, previous: Dict) -> Dict:
+    """
+    Write the rows changed since the previous backup to a delta file
+    and verify its chains continue from the previous backup's heads
+    Returns the delta's details
+    """
+    tmp_path = f"{dest_path}.tmp"
+    _remove(tmp_path)
+    TruthLedgerDB(tmp_path).close()
+    
+    src = _open_snapshot(db_path)
+    started = time.perf_counter()
+    try:
+        src.execute("ATTACH DATABASE ? AS delta", (tmp_path,))
+        _pin(src)
+        info = _snapshot_info(src)
+        
+        # Only a head row is ever updated (a compact run growing), so the
+        # previous heads plus everything after them covers every change
+        previous_heads = [head["id"] for head in previous["heads"].values()]
+        columns = _columns(src, "main", "checks")
+        src.execute(f"""
+            INSERT INTO delta.checks ({columns})
+            SELECT {columns} FROM main.checks
+            WHERE id > ? OR id IN ({",".join("?" * len(previous_heads))})
+        """, [previous["last_ids"]["checks"], *previous_heads])
+        
+        since_ms = src.execute("SELECT MIN(ts_epoch_ms) FROM delta.checks").fetchone()[0]
+        if since_ms is not None:
+            for table, _ in ROLLUP_TABLES:
+                columns = _columns(src, "main", table)
+                src.execute(f"""
+                    INSERT INTO delta.{table} ({columns})
+                    SELECT {columns} FROM main.{table} WHERE bucket_start_ms >= ?
+                """, (since_ms // DAY_MS * DAY_MS,))
+        
+        for table in APPEND_TABLES:
+            columns = _columns(src, "main", table)
+            src.execute(f"""
+                INSERT INTO delta.{table} ({columns})
+                SELECT {columns} FROM main.{table} WHERE id > ?
+            """, (previous["last_ids"].get(table, 0),))
+        
+        for table in ("sources", "metadata"):
+            columns = _columns(src, "main", table)
+            src.execute(f"DELETE FROM delta.{table}")
+            src.execute(f"""
+                INSERT INTO delta.{table} ({columns}) SELECT {columns} FROM main.{table}
+            """)
+        
+        rows = src.execute("SELECT COUNT(*) FROM delta.checks").fetchone()[0]
+        src.execute("COMMIT")
+        src.execute("DETACH DATABASE delta")
+    finally:
+        src.close()
+    
+    conn = sqlite3.connect(tmp_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode = DELETE")
+        errors = verify_delta(conn, previous["heads"], info["heads"])
+    finally:
+        conn.close()
+    if errors:
+        _remove(tmp_path)
+        raise ValueError(f"Delta does not continue the previous backup: {errors[0]}")
+    os.replace(tmp_path, dest_path)
+    
+    elapsed = time.perf_counter() - started
+    return dict(info, **{
+        "kind": "delta",
+        "file": os.path.basename(dest_path),
+        "created_at": datetime.utcnow().isoformat(),
+        "rows": rows,
+        "bytes": os.path.getsize(dest_path),
+        "seconds": elapsed
+    })
+
+
+def verify_delta(conn: sqlite3.Connection, previous_heads: Dict[str, Dict],
+                 heads: Dict[str, Dict]) -> List[str]:
+    """
+    Re-hash a delta's chains from the previous heads and check they end
+    at the snapshot's heads
+    A re-shipped head row must keep its check_hash; it is re-verified
+    from its own previous_hash, since its run may have grown
+    """
+    errors = []
+    chains = conn.execute("SELECT DISTINCT api_name, vantage FROM checks").fetchall()
+    for api_name, vantage in chains:
+        key = chain_key(api_name, vantage)
+        previous = previous_heads.get(key)
+        verifier = None
+        for row in conn.execute(f"""
+            SELECT {CHAIN_COLUMNS} FROM checks WHERE api_name = ? AND vantage = ? ORDER BY id
+        """, (api_name, vantage)):
+            if verifier is None:
+                if previous and row["id"] == previous["id"]:
+                    if row["check_hash"] != previous["check_hash"]:
+                        errors.append(f"Check {row['id']}: head changed since the last backup")
+                    verifier = ChainVerifier(row["previous_hash"])
+                else:
+                    verifier = ChainVerifier(previous["link"] if previous else "")
+            verifier.feed(row)
+        errors.extend(verifier.errors)
+        if heads.get(key, {}).get("link") != verifier.previous_hash:
+            errors.append(f"{key}: delta does not end at the snapshot's head")
+    return errors
+
+
+def _remove(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class BackupSet:
+    """A full backup plus the incremental deltas taken after it"""
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.directory / MANIFEST
+        self.data: Dict = {"chain": [], "segments": []}
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.data = json.load(f)
+    
+    def _save(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def backup(self, db_path: str, incremental: bool = True,
+               segments_dir: Optional[str] = None, pages: int = 256,
+               sleep: float = 0.0, progress=None) -> Dict:
+        """
+        Take the next backup of db_path into the set
+        A delta when incremental and the live file still continues the
+        last backup's segment seal; otherwise a new full backup, which
+        starts a fresh chain
+        """
+        chain = self.data["chain"]
+        old_files: List[str] = []
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        
+        with TruthLedgerDB(db_path, read_only=True) as db:
+            seal = db.get_metadata(SEGMENT_SEAL_KEY) or ""
+        
+        if incremental and chain and chain[-1]["segment_seal"] == seal:
+            entry = delta_backup(db_path, str(self.directory / f"delta-{stamp}.db"), chain[-1])
+        else:
+            entry = online_backup(
+                db_path, str(self.directory / f"full-{stamp}.db"),
+                pages=pages, sleep=sleep, progress=progress
+            )
+            old_files = [old["file"] for old in chain]
+            chain = self.data["chain"] = []
+        entry["sha256"] = file_sha256(self.directory / entry["file"])
+        chain.append(entry)
+        
+        if segments_dir:
+            entry["segments_copied"] = self._copy_segments(segments_dir)
+        self._save()
+        
+        # Superseded chains go only once the new base is safely recorded
+        if entry["kind"] == "full":
+            for name in old_files:
+                _remove(str(self.directory / name))
+        
+        with TruthLedgerDB(db_path) as db:
+            db.record_backup({
+                key: entry[key] for key in ("kind", "file", "created_at", "bytes", "sha256")
+            })
+        return entry
+    
+    def _copy_segments(self, segments_dir: str) -> List[str]:
+        """Copy closed segments the set does not hold yet, plus their manifest"""
+        store = SegmentStore(segments_dir)
+        target = self.directory / "segments"
+        target.mkdir(exist_ok=True)
+        copied = []
+        for segment in store.closed():
+            if segment["name"] in self.data["segments"]:
+                continue
+            shutil.copyfile(store.archive_path(segment), target / Path(segment["file"]).name)
+            self.data["segments"].append(segment["name"])
+            copied.append(segment["name"])
+        
+        # Point every copied archive at its local file
+        manifest = json.loads((store.directory / MANIFEST_NAME).read_text())
+        for segment in manifest["segments"]:
+            segment["file"] = Path(segment["file"]).name
+        (target / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+        return copied
+    
+    def restore(self, dest_path: str) -> Dict:
+        """
+        Rebuild the ledger as of the latest backup: copy the full backup,
+        apply every delta in order and check the result's chain heads
+        """
+        chain = self.data["chain"]
+        if not chain:
+            raise ValueError(f"No backups in {self.directory}")
+        for entry in chain:
+            if file_sha256(self.directory / entry["file"]) != entry["sha256"]:
+                raise ValueError(f"Backup {entry['file']} does not match its sha256")
+        
+        tmp_path = f"{dest_path}.tmp"
+        shutil.copyfile(self.directory / chain[0]["file"], tmp_path)
+        # Bring a full backup taken before a schema change up to date,
+        # so the deltas that follow it have every column to land in
+        TruthLedgerDB(tmp_path).close()
+        conn = sqlite3.connect(tmp_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            for entry in chain[1:]:
+                conn.execute("ATTACH DATABASE ? AS delta", (str(self.directory / entry["file"]),))
+                with conn:
+                    for table in ("checks", "sources", "metadata") + APPEND_TABLES + tuple(
+                        table for table, _ in ROLLUP_TABLES
+                    ):
+                        columns = _columns(conn, "delta", table)
+                        conn.execute(f"""
+                            INSERT OR REPLACE INTO main.{table} ({columns})
+                            SELECT {columns} FROM delta.{table}
+                        """)
+                conn.execute("DETACH DATABASE delta")
+            # Deltas carry no sync digests; the next sync rebuilds them
+            with conn:
+                conn.execute("DELETE FROM sync_digests")
+            heads = head_rows(conn)
+        finally:
+            conn.close()
+        
+        if _links(heads) != _links(chain[-1]["heads"]):
+            _remove(tmp_path)
+            raise ValueError("Restored ledger's chain heads do not match the last backup")
+        os.replace(tmp_path, dest_path)
+        return {"backups": len(chain), "created_at": chain[-1]["created_at"]}
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Truth Ledger Online Backup')
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='truth_ledger.db',
+        help='Database path (default: truth_ledger.db)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='Write a single full backup to this file'
+    )
+    parser.add_argument(
+        '--dir',
+        type=str,
+        default=None,
+        help='Backup set directory (full backup, then incremental deltas)'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='With --dir, start a new full backup instead of a delta'
+    )
+    parser.add_argument(
+        '--segments',
+        type=str,
+        default=None,
+        help='With --dir, also copy new closed segments from this directory'
+    )
+    parser.add_argument(
+        '--pages',
+        type=int,
+        default=256,
+        help='Pages copied per backup step (default: 256)'
+    )
+    parser.add_argument(
+        '--sleep',
+        type=float,
+        default=0.0,
+        help='Seconds to pause between backup steps (default: 0)'
+    )
+    parser.add_argument(
+        '--restore',
+        type=str,
+        default=None,
+        help='With --dir, rebuild the latest backup into this file'
+    )
+    
+    args = parser.parse_args()
+    
+    if args.dir and args.restore:
+        result = BackupSet(args.dir).restore(args.restore)
+        print(f"Restored {args.restore} from {result['backups']} backups "
+              f"(as of {result['created_at']})")
+        return
+    
+    if args.output:
+        entry = online_backup(
+            args.db, args.output, pages=args.pages, sleep=args.sleep,
+            progress=print_progress
+        )
+        with TruthLedgerDB(args.db) as db:
+            db.record_backup({key: entry[key] for key in ("kind", "file", "created_at", "bytes")})
+    elif args.dir:
+        entry = BackupSet(args.dir).backup(
+            args.db, incremental=not args.full, segments_dir=args.segments,
+            pages=args.pages, sleep=args.sleep, progress=print_progress
+        )
+    else:
+        parser.error("one of --output or --dir is required")
+    
+    print()
+    if entry["kind"] == "full":
+        print(f"✓ Full backup {entry['file']}: {entry['bytes'] / 1048576:.1f}MB in "
+              f"{entry['seconds']:.2f}s ({entry['mb_per_sec']:.1f} MB/s), "
+              f"{len(entry['heads'])} chain heads verified")
+    else:
+        print(f"✓ Incremental backup {entry['file']}: {entry['rows']:,} rows, "
+              f"{entry['bytes'] / 1048576:.1f}MB in {entry['seconds']:.2f}s, "
+              f"{len(entry['heads'])} chain heads verified")
+    for name in entry.get("segments_copied", []):
+        print(f"   copied segment {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Ledger Export - Streaming NDJSON, CSV and Columnar Export
+Writes checks or discrepancies out of the ledger in bounded memory
+
+Rows are read through TruthLedgerDB.iter_checks / iter_discrepancies,
+which page through the table by id (keyset pagination), and written one
+page at a time. After every page the output is flushed and the last
+exported id and file offset go to a state file, so an interrupted
+export resumes where it stopped instead of starting over.
+
+The columnar format (.tlcol) stores each page as a row group, with every
+column encoded on its own and zlib-compressed:
+    magic    b"TLCOL1\\n"
+    header   u32 length + JSON {"table", "columns": [[name, kind]], "codec"}
+    groups   u32 row count, then per column u32 length + zlib(column)
+    end      u32 0
+A column is a presence bitmap followed by its non-NULL values: integers
+as zigzag varint deltas, reals as 8-byte doubles and text as varint
+length + UTF-8. Ids and timestamps are nearly sequential, so their
+deltas compress to almost nothing.
+"""
+
+import csv
+import io
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from database import TruthLedgerDB, iso_to_epoch_ms
+
+
+FORMATS = ("ndjson", "csv", "columnar")
+TABLES = ("checks", "discrepancies")
+
+COLUMNAR_MAGIC = b"TLCOL1\n"
+_U32 = struct.Struct(">I")
+_F64 = struct.Struct(">d")
+
+
+def _column_kind(declared_type: str) -> str:
+    declared_type = declared_type.upper()
+    if "INT" in declared_type:
+        return "int"
+    if "REAL" in declared_type:
+        return "real"
+    return "text"
+
+
+def table_columns(db: TruthLedgerDB, table: str) -> List[List[str]]:
+    """[name, kind] for every column of a ledger table, in table order"""
+    return [
+        [row["name"], _column_kind(row["type"])]
+        for row in db.conn.execute(f"PRAGMA table_info({table})")
+    ]
+
+
+# --- Columnar encoding -------------------------------------------------------
+
+def _put_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_column(values: List, kind: str) -> bytes:
+    """Presence bitmap plus the column's non-NULL values"""
+    present = bytearray((len(values) + 7) // 8)
+    body = bytearray()
+    previous = 0
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        present[index >> 3] |= 1 << (index & 7)
+        if kind == "int":
+            delta = int(value) - previous
+            previous = int(value)
+            _put_varint(body, -2 * delta - 1 if delta < 0 else 2 * delta)
+        elif kind == "real":
+            body += _F64.pack(float(value))
+        else:
+            encoded = str(value).encode("utf-8")
+            _put_varint(body, len(encoded))
+            body += encoded
+    return bytes(present) + bytes(body)
+
+
+def decode_column(data: bytes, kind: str, count: int) -> List:
+    """Inverse of encode_column"""
+    bitmap_size = (count + 7) // 8
+    present, pos = data[:bitmap_size], bitmap_size
+    values = []
+    previous = 0
+    for index in range(count):
+        if not present[index >> 3] & (1 << (index & 7)):
+            values.append(None)
+            continue
+        if kind == "int":
+            raw, pos = _get_varint(data, pos)
+            previous += (raw >> 1) ^ -(raw & 1)
+            values.append(previous)
+        elif kind == "real":
+            values.append(_F64.unpack_from(data, pos)[0])
+            pos += 8
+        else:
+            length, pos = _get_varint(data, pos)
+            values.append(data[pos:pos + length].decode("utf-8"))
+            pos += length
+    return values
+
+
+def read_columnar(path: str) -> Iterator[Dict]:
+    """Stream rows back out of a .tlcol export, one row group at a time"""
+    with open(path, "rb") as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar ledger export")
+        header = json.loads(f.read(_U32.unpack(f.read(4))[0]))
+        columns = header["columns"]
+        while True:
+            raw = f.read(4)
+            if len(raw) < 4:
+                raise ValueError(f"{path} is truncated (no end marker)")
+            count = _U32.unpack(raw)[0]
+            if count == 0:
+                return
+            decoded = []
+            for _, kind in columns:
+                size = _U32.unpack(f.read(4))[0]
+                decoded.append(decode_column(zlib.decompress(f.read(size)), kind, count))
+            names = [name for name, _ in columns]
+            for values in zip(*decoded):
+                yield dict(zip(names, values))
+
+
+# --- Writers -----------------------------------------------------------------
+
+class PageEncoder:
+    """Turns pages of row dicts into output bytes for one format"""
+    
+    def __init__(self, fmt: str, table: str, columns: List[List[str]]):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.fmt = fmt
+        self.table = table
+        self.columns = columns
+        self.names = [name for name, _ in columns]
+    
+    def header(self) -> bytes:
+        if self.fmt == "csv":
+            return self._csv([self.names])
+        if self.fmt == "columnar":
+            header = json.dumps({
+                "table": self.table, "columns": self.columns, "codec": "zlib"
+            }).encode()
+            return COLUMNAR_MAGIC + _U32.pack(len(header)) + header
+        return b""
+    
+    def page(self, rows: List[Dict]) -> bytes:
+        if self.fmt == "ndjson":
+            return "".join(
+                json.dumps(row, separators=(",", ":")) + "\n" for row in rows
+            ).encode("utf-8")
+        if self.fmt == "csv":
+            return self._csv([[row[name] for name in self.names] for row in rows])
+        
+        parts = [_U32.pack(len(rows))]
+        for name, kind in self.columns:
+            block = zlib.compress(encode_column([row[name] for row in rows], kind))
+            parts.append(_U32.pack(len(block)))
+            parts.append(block)
+        return b"".join(parts)
+    
+    def footer(self) -> bytes:
+        return _U32.pack(0) if self.fmt == "columnar" else b""
+    
+    @staticmethod
+    def _csv(rows: List[List]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+class ExportState:
+    """Resumable export progress persisted as JSON"""
+    
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.data: Dict = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.data = json.load(f)
+    
+    def matches(self, params: Dict) -> bool:
+        return self.data.get("params") == params
+    
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+    
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def iter_rows(db: TruthLedgerDB, table: str, api_name: Optional[str] = None,
+              start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+              after_id: int = 0, chunk_size: int = 5000) -> Iterator[Dict]:
+    """Stream an exportable table with the shared filters"""
+    if table == "checks":
+        return db.iter_checks(api_name, start_ms, end_ms, after_id, chunk_size)
+    if table == "discrepancies":
+        return db.iter_discrepancies(api_name, start_ms, end_ms, after_id, chunk_size)
+    raise ValueError(f"Unknown export table: {table}")
+
+
+def export_table(db: TruthLedgerDB, table: str, output: str, fmt: str = "ndjson",
+                 api_name: Optional[str] = None, start_ms: Optional[int] = None,
+                 end_ms: Optional[int] = None, after_id: int = 0,
+                 chunk_size: int = 5000, state_path: Optional[str] = None) -> Dict:
+    """
+    Export a table to output ("-" for stdout, NDJSON/CSV only)
+    With state_path, an export of the same parameters that was cut
+    short resumes after its last flushed page; otherwise output is
+    overwritten. Returns counts, bytes and timing for this run.
+    """
+    to_stdout = output == "-"
+    if to_stdout and fmt == "columnar":
+        raise ValueError("Columnar exports need a file to write to")
+    
+    params = {
+        "db_path": os.path.abspath(str(db.db_path)), "table": table, "format": fmt,
+        "output": output if to_stdout else os.path.abspath(output),
+        "api_name": api_name, "start_ms": start_ms, "end_ms": end_ms,
+        "after_id": after_id
+    }
+    state = ExportState(None if to_stdout else state_path)
+    encoder = PageEncoder(fmt, table, table_columns(db, table))
+    
+    resumed = bool(state.data) and state.matches(params) and os.path.exists(output)
+    if resumed:
+        # Drop anything written after the last page the state recorded
+        after_id = state.data["last_id"]
+        with open(output, "r+b") as f:
+            f.truncate(state.data["offset"])
+        out = open(output, "ab")
+    else:
+        state.data = {"params": params, "last_id": after_id, "rows": 0, "offset": 0}
+        out = sys.stdout.buffer if to_stdout else open(output, "wb")
+        out.write(encoder.header())
+    
+    started = time.perf_counter()
+    rows_written = 0
+    try:
+        rows = iter_rows(db, table, api_name, start_ms, end_ms, after_id, chunk_size)
+        while True:
+            page = list(islice(rows, chunk_size))
+            if not page:
+                break
+            out.write(encoder.page(page))
+            rows_written += len(page)
+            if not to_stdout:
+                out.flush()
+                os.fsync(out.fileno())
+                state.data.update({
+                    "last_id": page[-1]["id"],
+                    "rows": state.data["rows"] + len(page),
+                    "offset": out.tell()
+                })
+                state.save()
+        out.write(encoder.footer())
+        out.flush()
+    finally:
+        if not to_stdout:
+            out.close()
+    
+    state.clear()
+    elapsed = time.perf_counter() - started
+    return {
+        "table": table,
+        "format": fmt,
+        "rows": rows_written,
+        "total_rows": state.data["rows"] if not to_stdout else rows_written,
+        "resumed": resumed,
+        "bytes": None if to_stdout else os.path.getsize(output),
+        "seconds": elapsed,
+        "rows_per_sec": rows_written / elapsed if elapsed else 0
+    }
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Truth Ledger Streaming Export')
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='truth_ledger.db',
+        help='Database path (default: truth_ledger.db)'
+    )
+    parser.add_argument(
+        '--table',
+        choices=TABLES,
+        default='checks',
+        help='Table to export (default: checks)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=FORMATS,
+        default='ndjson',
+        help='Output format (default: ndjson)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='-',
+        help='Output file, or - for stdout (default: -)'
+    )
+    parser.add_argument(
+        '--api',
+        type=str,
+        default=None,
+        help='Only export rows for this API'
+    )
+    parser.add_argument(
+        '--start',
+        type=str,
+        default=None,
+        help='Only export rows at or after this ISO-8601 UTC timestamp'
+    )
+    parser.add_argument(
+        '--end',
+        type=str,
+        default=None,
+        help='Only export rows before this ISO-8601 UTC timestamp'
+    )
+    parser.add_argument(
+        '--after-id',
+        type=int,
+        default=0,
+        help='Only export rows with a larger id (default: 0)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=5000,
+        help='Rows per page and per columnar row group (default: 5000)'
+    )
+    parser.add_argument(
+        '--state',
+        type=str,
+        default=None,
+        help='Resumable state file (default: <output>.state)'
+    )
+    
+    args = parser.parse_args()
+    
+    state_path = args.state
+    if state_path is None and args.output != '-':
+        state_path = f"{args.output}.state"
+    
+    with TruthLedgerDB(args.db, read_only=True) as db:
+        report = export_table(
+            db, args.table, args.output, args.format,
+            api_name=args.api,
+            start_ms=iso_to_epoch_ms(args.start) if args.start else None,
+            end_ms=iso_to_epoch_ms(args.end) if args.end else None,
+            after_id=args.after_id,
+            chunk_size=args.chunk_size,
+            state_path=state_path
+        )
+    
+    if args.output != '-':
+        print(f"{'Resumed' if report['resumed'] else 'Exported'} {report['rows']:,} "
+              f"{report['table']} rows ({report['total_rows']:,} in file) to {args.output} "
+              f"as {report['format']}: {report['bytes'] / 1048576:.1f}MB in "
+              f"{report['seconds']:.2f}s ({report['rows_per_sec']:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+Ledger Segments Module
+Monthly segment files for the truth ledger, sealed and compressed once closed
+
+The live ledger stays the writable active segment. Once a UTC month has
+been over for LIVE_RETENTION_MS, rotate() carves its rows, rollups and Merkle batches out of the
+live file into ledger-YYYY-MM.db, gzips it and lists it in
+segments.json. The live file keeps a chain anchor per API (the link its
+next row continues from) and the seal of the newest segment.
+
+A seal hashes the previous seal together with the segment's id range,
+chain anchors, chain heads and last Merkle root, so the closed segments
+and the live ledger form one verifiable chain. Hot verification reads
+only the manifest and the live file. Closed months can sit on cold
+storage; they are decompressed into a local cache only for a full
+verification or a query window that overlaps them.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database import (
+    CHAIN_ANCHOR_PREFIX, CHAIN_COLUMNS, DAY_MS, MERKLE_ANCHOR_KEY,
+    ROLLUP_TABLES, ChainVerifier, TruthLedgerDB, chain_key, chain_link,
+    split_chain_key, utc_now_ms
+)
+
+
+MANIFEST_NAME = "segments.json"
+
+# Live/segment metadata key holding the seal of the segment before it
+SEGMENT_SEAL_KEY = "segment_previous_seal"
+
+# Manifest fields covered by a segment's seal (not its file location)
+SEALED_FIELDS = (
+    "name", "month", "previous_seal", "first_id", "last_id", "rows",
+    "checks", "start_ms", "end_ms", "anchors", "heads", "merkle_root"
+)
+
+# Tables a query window unions across the live file and its segments
+UNION_TABLES = ("checks", "merkle_batches") + tuple(table for table, _ in ROLLUP_TABLES)
+LIVE_TABLES = ("metadata", "discrepancies", "sources")
+
+# A finished month stays in the live file this long, so the windows
+# readers query from the live file alone stay whole across a month
+# boundary: 7 days at most, 8 with reveal_truth's latency baseline
+LIVE_RETENTION_MS = 9 * DAY_MS
+
+
+def month_start_ms(ts_epoch_ms: int) -> int:
+    """Start of the UTC month holding ts_epoch_ms"""
+    dt = datetime.fromtimestamp(ts_epoch_ms / 1000, timezone.utc)
+    return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp()) * 1000
+
+
+def next_month_ms(ts_epoch_ms: int) -> int:
+    """Start of the UTC month after the one holding ts_epoch_ms"""
+    dt = datetime.fromtimestamp(month_start_ms(ts_epoch_ms) / 1000, timezone.utc)
+    year, month = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp()) * 1000
+
+
+def segment_seal(entry: Dict) -> str:
+    """Seal over a manifest entry's sealed fields"""
+    sealed = {field: entry[field] for field in SEALED_FIELDS}
+    return hashlib.sha256(
+        json.dumps(sealed, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    """sha256 of a file, read in 1MB chunks"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def chain_heads(conn: sqlite3.Connection, schema: str = "main") -> Dict[str, str]:
+    """Per-chain link the next row must carry, from each chain's last row in schema"""
+    rows = conn.execute(f"""
+        SELECT {CHAIN_COLUMNS} FROM {schema}.checks
+        WHERE id IN (SELECT MAX(id) FROM {schema}.checks GROUP BY api_name, vantage)
+    """)
+    return {chain_key(row["api_name"], row["vantage"]): chain_link(row) for row in rows}
+
+
+def select_columns(conn: sqlite3.Connection, schema: str, table: str,
+                   columns: List[Tuple[str, str]]) -> str:
+    """
+    Select list for (name, default) columns from schema.table; a column
+    an older file predates is filled in with its default
+    """
+    present = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+    return ", ".join(
+        name if name in present else f"{default or 'NULL'} AS {name}"
+        for name, default in columns
+    )
+
+
+def _remove_db_files(path: Path):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        candidate = Path(f"{path}{suffix}")
+        if candidate.exists():
+            candidate.unlink()
+
+
+class SegmentStore:
+    """Closed monthly segments of a live ledger plus the query layer over them"""
+    
+    def __init__(self, directory: str = "segments", live_path: str = "truth_ledger.db",
+                 cache_dir: Optional[str] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.live_path = Path(live_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.directory / "cache"
+        self.manifest_path = self.directory / MANIFEST_NAME
+        self.segments: List[Dict] = []
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.segments = json.load(f)["segments"]
+    
+    def _save(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"segments": self.segments}, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def closed(self) -> List[Dict]:
+        """Closed segments, oldest first"""
+        return [entry for entry in self.segments if entry["state"] == "closed"]
+    
+    def last_seal(self) -> str:
+        closed = self.closed()
+        return closed[-1]["seal"] if closed else ""
+    
+    def archive_path(self, entry: Dict) -> Path:
+        """Where a closed segment's .gz currently lives"""
+        return self.directory / entry["file"]
+    
+    # --- Rotation -----------------------------------------------------------
+    
+    def rotate(self, db: TruthLedgerDB, now_ms: Optional[int] = None,
+               grace_ms: int = LIVE_RETENTION_MS, vacuum: bool = False) -> List[Dict]:
+        """
+        Close every month of the live ledger that ended at least grace_ms
+        ago (late probes still land in the live file meanwhile, and
+        recent windows never need the segments)
+        Must run on the ledger's writer connection. Freed pages are reused
+        by new checks; vacuum also shrinks the live file right away.
+        Returns the manifest entries of the segments closed
+        """
+        self.recover(db)
+        now_ms = utc_now_ms() if now_ms is None else now_ms
+        closed = []
+        row = db.conn.execute(
+            "SELECT ts_epoch_ms FROM checks ORDER BY id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return closed
+        
+        # A month whose rows all sit behind a straddling Merkle batch
+        # closes nothing; they move with the following month instead
+        month_end_ms = next_month_ms(row[0])
+        while month_end_ms + grace_ms <= now_ms:
+            entry = self.close_month(db, month_end_ms)
+            if entry is not None:
+                closed.append(entry)
+            month_end_ms = next_month_ms(month_end_ms)
+        
+        if closed and vacuum:
+            db.conn.execute("VACUUM")
+            db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return closed
+    
+    def close_month(self, db: TruthLedgerDB, month_end_ms: int) -> Optional[Dict]:
+        """
+        Carve every live row before the first one stamped at or after
+        month_end_ms into a new segment, along with rollup buckets before
+        month_end_ms and the Merkle batches of the carved rows
+        A Merkle batch is never split, so a batch straddling the month
+        leaves its rows in the live file for the next segment.
+        Returns the closed manifest entry, or None if nothing could move
+        """
+        conn = db.conn
+        if (db.get_metadata(SEGMENT_SEAL_KEY) or "") != self.last_seal():
+            raise ValueError("Live ledger does not continue the last sealed segment")
+        
+        # Seal whatever is pending so no carved row is left outside a batch
+        if conn.execute("SELECT 1 FROM merkle_batches LIMIT 1").fetchone():
+            db.seal_merkle_batches(max_age_seconds=0)
+        
+        row = conn.execute(
+            "SELECT id FROM checks WHERE ts_epoch_ms >= ? ORDER BY id LIMIT 1",
+            (month_end_ms,)
+        ).fetchone()
+        last_id = row[0] - 1 if row else conn.execute("SELECT MAX(id) FROM checks").fetchone()[0]
+        straddling = conn.execute("""
+            SELECT first_check_id FROM merkle_batches
+            WHERE first_check_id <= ? AND last_check_id > ?
+        """, (last_id, last_id)).fetchone()
+        if straddling:
+            last_id = straddling[0] - 1
+        first_id = conn.execute("SELECT MIN(id) FROM checks").fetchone()[0]
+        if first_id is None or last_id is None or last_id < first_id:
+            return None
+        
+        month = datetime.fromtimestamp((month_end_ms - 1) / 1000, timezone.utc).strftime("%Y-%m")
+        name = f"ledger-{month}"
+        path = self.directory / f"{name}.db"
+        _remove_db_files(path)
+        TruthLedgerDB(path).close()
+        
+        anchors = db.get_chain_anchors()
+        merkle_anchor = db.get_metadata(MERKLE_ANCHOR_KEY)
+        
+        conn.execute("ATTACH DATABASE ? AS segment", (str(path),))
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                entry = self._carve(db, name, month, first_id, last_id, month_end_ms, anchors)
+                
+                # Segment metadata: where its chains and batches pick up
+                segment_meta = {SEGMENT_SEAL_KEY: entry["previous_seal"], "segment_name": name}
+                segment_meta.update({
+                    CHAIN_ANCHOR_PREFIX + api_name: link for api_name, link in anchors.items()
+                })
+                if merkle_anchor:
+                    segment_meta[MERKLE_ANCHOR_KEY] = merkle_anchor
+                if db.is_compact_ledger():
+                    segment_meta["storage_mode"] = "compact"
+                
+                # Live metadata: continue from the new segment
+                live_meta = {SEGMENT_SEAL_KEY: entry["seal"]}
+                live_meta.update({
+                    CHAIN_ANCHOR_PREFIX + api_name: link
+                    for api_name, link in entry["heads"].items()
+                })
+                last_batch = conn.execute("""
+                    SELECT last_check_id, root_hash FROM segment.merkle_batches
+                    ORDER BY last_check_id DESC LIMIT 1
+                """).fetchone()
+                if last_batch:
+                    live_meta[MERKLE_ANCHOR_KEY] = json.dumps({
+                        "last_check_id": last_batch[0], "root_hash": last_batch[1]
+                    })
+                
+                now = datetime.utcnow().isoformat()
+                for schema, values in (("segment", segment_meta), ("main", live_meta)):
+                    conn.executemany(f"""
+                        INSERT OR REPLACE INTO {schema}.metadata (key, value, updated_at)
+                        VALUES (?, ?, ?)
+                    """, [(key, value, now) for key, value in values.items()])
+                
+                # Checkpoints on carved rows can no longer be resumed from
+                for key in entry["heads"]:
+                    checkpoint = db.get_chain_checkpoint(*split_chain_key(key))
+                    if checkpoint and checkpoint[0] <= last_id:
+                        conn.execute(
+                            "DELETE FROM main.metadata WHERE key = ?",
+                            (f"chain_checkpoint:{key}",)
+                        )
+                
+                # Listed before the commit, so a crash in between is recoverable
+                self.segments.append(dict(entry, state="pending"))
+                self._save()
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                self.segments = [
+                    e for e in self.segments if not (e["name"] == name and e["state"] == "pending")
+                ]
+                self._save()
+                raise
+        finally:
+            conn.execute("DETACH DATABASE segment")
+        
+        db.reload_chain_heads()
+        return self._finalize(self.segments[-1])
+    
+    def _carve(self, db: TruthLedgerDB, name: str, month: str, first_id: int,
+               last_id: int, month_end_ms: int, anchors: Dict[str, str]) -> Dict:
+        """Move rows, rollups and batches into the attached segment"""
+        conn = db.conn
+        
+        def move(table: str, where: str, params: tuple):
+            columns = ", ".join(
+                row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")
+            )
+            conn.execute(f"""
+                INSERT INTO segment.{table} ({columns})
+                SELECT {columns} FROM main.{table} WHERE {where}
+            """, params)
+            conn.execute(f"DELETE FROM main.{table} WHERE {where}", params)
+        
+        move("checks", "id <= ?", (last_id,))
+        move("merkle_batches", "last_check_id <= ?", (last_id,))
+        for table, _ in ROLLUP_TABLES:
+            move(table, "bucket_start_ms < ?", (month_end_ms,))
+        # Cached sync digests would still count the carved rows
+        conn.execute("DELETE FROM main.sync_digests WHERE bucket_start_ms < ?", (month_end_ms,))
+        
+        rows, checks, start_ms = conn.execute("""
+            SELECT COUNT(*), SUM(run_count), MIN(ts_epoch_ms) FROM segment.checks
+        """).fetchone()
+        first_bucket = conn.execute(
+            "SELECT MIN(bucket_start_ms) FROM segment.api_rollup_hourly"
+        ).fetchone()[0]
+        merkle_root = conn.execute("""
+            SELECT root_hash FROM segment.merkle_batches
+            ORDER BY last_check_id DESC LIMIT 1
+        """).fetchone()
+        
+        entry = {
+            "name": name,
+            "month": month,
+            "previous_seal": self.last_seal(),
+            "first_id": first_id,
+            "last_id": last_id,
+            "rows": rows,
+            "checks": checks,
+            # Every carved row is stamped before month_end_ms (and runs
+            # never cross a UTC day), so the segment ends there
+            "start_ms": min(start_ms, first_bucket if first_bucket is not None else start_ms),
+            "end_ms": month_end_ms,
+            "anchors": anchors,
+            "heads": dict(anchors, **chain_heads(conn, "segment")),
+            "merkle_root": merkle_root[0] if merkle_root else db.get_merkle_anchor()[1]
+        }
+        entry["seal"] = segment_seal(entry)
+        return entry
+    
+    def _finalize(self, entry: Dict) -> Dict:
+        """Vacuum, hash and gzip a carved segment file, then mark it closed"""
+        path = self.directory / f"{entry['name']}.db"
+        if not path.exists():
+            raise ValueError(f"Segment {entry['name']}: carved file is missing")
+        conn = sqlite3.connect(path)
+        try:
+            # A closed segment is a single self-contained file
+            conn.execute("PRAGMA journal_mode = DELETE")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        
+        gz_path = self.directory / f"{entry['name']}.db.gz"
+        tmp_path = Path(f"{gz_path}.tmp")
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.replace(tmp_path, gz_path)
+        
+        entry.update({
+            "state": "closed",
+            "file": gz_path.name,
+            "sha256": file_sha256(path),
+            "bytes": path.stat().st_size,
+            "compressed_bytes": gz_path.stat().st_size,
+            "closed_at": datetime.utcnow().isoformat()
+        })
+        self._save()
+        _remove_db_files(path)
+        return entry
+    
+    def recover(self, db: TruthLedgerDB):
+        """
+        Settle segments left pending by a crash: finish those the live
+        ledger already continues from, drop the rest
+        """
+        pending = [entry for entry in self.segments if entry["state"] == "pending"]
+        if not pending:
+            return
+        live_seal = db.get_metadata(SEGMENT_SEAL_KEY) or ""
+        for entry in pending:
+            if entry["seal"] == live_seal:
+                self._finalize(entry)
+            else:
+                self.segments.remove(entry)
+                self._save()
+                _remove_db_files(self.directory / f"{entry['name']}.db")
+    
+    def archive(self, name: str, target_dir: str) -> Dict:
+        """Move a closed segment's archive to target_dir (e.g. cold storage)"""
+        entry = next(e for e in self.closed() if e["name"] == name)
+        target = Path(target_dir).resolve()
+        target.mkdir(parents=True, exist_ok=True)
+        destination = target / Path(entry["file"]).name
+        shutil.move(str(self.archive_path(entry)), str(destination))
+        entry["file"] = str(destination)
+        self._save()
+        return entry
+    
+    # --- Query layer --------------------------------------------------------
+    
+    def materialize(self, entry: Dict, verify: bool = False) -> Path:
+        """
+        Local uncompressed copy of a closed segment, decompressed into the
+        cache on first use and checked against the recorded sha256
+        verify re-hashes a copy that is already cached
+        """
+        path = self.cache_dir / f"{entry['name']}.db"
+        if path.exists() and path.stat().st_size == entry["bytes"]:
+            if verify and file_sha256(path) != entry["sha256"]:
+                raise ValueError(f"Segment {entry['name']}: cached copy does not match its sha256")
+            return path
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(f"{path}.tmp")
+        with gzip.open(self.archive_path(entry), "rb") as src, open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        if file_sha256(tmp_path) != entry["sha256"]:
+            tmp_path.unlink()
+            raise ValueError(f"Segment {entry['name']}: archive does not match its sha256")
+        os.replace(tmp_path, path)
+        return path
+    
+    def drop_cache(self):
+        """Delete every decompressed segment copy"""
+        if self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir)
+    
+    def overlapping(self, start_ms: int, end_ms: Optional[int] = None) -> List[Dict]:
+        """Closed segments holding anything in [start_ms, end_ms)"""
+        return [
+            entry for entry in self.closed()
+            if entry["end_ms"] > start_ms and (end_ms is None or entry["start_ms"] < end_ms)
+        ]
+    
+    @contextmanager
+    def window(self, start_ms: int, end_ms: Optional[int] = None) -> Iterator[TruthLedgerDB]:
+        """
+        Read-only ledger over [start_ms, end_ms)
+        Attaches the live file plus only the segments overlapping the
+        window, behind temp views named like the ledger tables, so every
+        TruthLedgerDB query method works on the result:
+            with store.window(start, end) as db:
+                db.get_window_stats("github", start, end)
+        """
+        segments = self.overlapping(start_ms, end_ms)
+        conn = sqlite3.connect("file::memory:", uri=True, check_same_thread=False)
+        if len(segments) + 1 > conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED):
+            conn.close()
+            raise ValueError(
+                f"Window spans {len(segments)} segments; split it into shorter windows"
+            )
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute(
+                "ATTACH DATABASE ? AS live", (f"file:{self.live_path.resolve()}?mode=ro",)
+            )
+            schemas = ["live"]
+            for index, entry in enumerate(segments):
+                path = self.materialize(entry)
+                conn.execute(
+                    f"ATTACH DATABASE ? AS seg{index}",
+                    (f"file:{path.resolve()}?mode=ro&immutable=1",)
+                )
+                schemas.append(f"seg{index}")
+            
+            for table in UNION_TABLES:
+                # Name columns explicitly: an old live file that was
+                # migrated in place orders them differently, and segments
+                # closed before a column existed lack it altogether
+                columns = [
+                    (row[1], row[4])
+                    for row in conn.execute(f"PRAGMA live.table_info({table})")
+                ]
+                union = " UNION ALL ".join(
+                    f"SELECT {select_columns(conn, schema, table, columns)} "
+                    f"FROM {schema}.{table}"
+                    for schema in schemas
+                )
+                conn.execute(f"CREATE TEMP VIEW {table} AS {union}")
+            for table in LIVE_TABLES:
+                conn.execute(f"CREATE TEMP VIEW {table} AS SELECT * FROM live.{table}")
+            conn.execute("PRAGMA query_only = 1")
+            
+            yield TruthLedgerDB(self.live_path, connection=conn)
+        finally:
+            conn.close()
+    
+    def get_window_stats(self, api_name: str, start_ms: int,
+                         end_ms: Optional[int] = None) -> Dict:
+        """TruthLedgerDB.get_window_stats across the live file and segments"""
+        with self.window(start_ms, end_ms) as db:
+            return db.get_window_stats(api_name, start_ms, end_ms)
+    
+    # --- Verification -------------------------------------------------------
+    
+    def verify(self, db: TruthLedgerDB, full: bool = False) -> Tuple[bool, List[str]]:
+        """
+        Verify the segment chain and the live ledger's chains
+        Checks every seal and that each segment continues its predecessor's
+        seal and chain heads, then verifies the live chains from their
+        anchors (incrementally unless full). Only full decompresses closed
+        segments to re-hash their rows, so archived months need not be
+        reachable for routine checks.
+        Returns (is_valid, list_of_errors)
+        """
+        errors = []
+        previous_seal = ""
+        heads: Dict[str, str] = {}
+        
+        for entry in self.closed():
+            name = entry["name"]
+            if entry["previous_seal"] != previous_seal:
+                errors.append(f"Segment {name}: previous_seal does not link")
+            if entry["anchors"] != heads:
+                errors.append(f"Segment {name}: chain anchors do not continue the previous segment")
+            if segment_seal(entry) != entry["seal"]:
+                errors.append(f"Segment {name}: seal mismatch")
+            if full:
+                errors.extend(self._verify_segment(entry))
+            previous_seal = entry["seal"]
+            heads = entry["heads"]
+        
+        if (db.get_metadata(SEGMENT_SEAL_KEY) or "") != previous_seal:
+            errors.append("Live ledger: does not continue the last sealed segment")
+        if db.get_chain_anchors() != heads:
+            errors.append("Live ledger: chain anchors do not match the last segment's heads")
+        
+        for api_name, vantage in db.get_chains():
+            _, api_errors = db.verify_chain_integrity(api_name, full=full, vantage=vantage)
+            errors.extend(
+                f"Live ledger {chain_key(api_name, vantage)}: {error}" for error in api_errors
+            )
+        
+        return (len(errors) == 0, errors)
+    
+    def _verify_segment(self, entry: Dict) -> List[str]:
+        """Re-hash one closed segment's chains from its anchors to its heads"""
+        name = entry["name"]
+        try:
+            path = self.materialize(entry, verify=True)
+        except ValueError as e:
+            return [str(e)]
+        except OSError as e:
+            return [f"Segment {name}: {e}"]
+        
+        errors = []
+        conn = sqlite3.connect(f"file:{path.resolve()}?mode=ro&immutable=1", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM metadata").fetchall())
+            if meta.get(SEGMENT_SEAL_KEY, "") != entry["previous_seal"]:
+                errors.append(f"Segment {name}: stored previous seal does not match the manifest")
+            
+            rows, first_id, last_id = conn.execute(
+                "SELECT COUNT(*), MIN(id), MAX(id) FROM checks"
+            ).fetchone()
+            if (rows, first_id, last_id) != (entry["rows"], entry["first_id"], entry["last_id"]):
+                errors.append(f"Segment {name}: rows or id range differ from the manifest")
+            
+            # Segments closed before vantages existed hold only local chains
+            chain_columns = select_columns(conn, "main", "checks", [
+                (column.strip(), "''" if column.strip() == "vantage" else None)
+                for column in CHAIN_COLUMNS.split(",")
+            ])
+            rows = conn.execute(f"SELECT {chain_columns} FROM checks ORDER BY id ASC")
+            verifiers: Dict[str, ChainVerifier] = {}
+            for row in rows:
+                key = chain_key(row["api_name"], row["vantage"])
+                verifier = verifiers.get(key)
+                if verifier is None:
+                    verifier = verifiers[key] = ChainVerifier(entry["anchors"].get(key, ""))
+                verifier.feed(row)
+            for key, verifier in sorted(verifiers.items()):
+                errors.extend(f"Segment {name}: {error}" for error in verifier.errors)
+                if verifier.previous_hash != entry["heads"].get(key):
+                    errors.append(f"Segment {name}: {key} does not end at its sealed head")
+        finally:
+            conn.close()
+        return errors
+    
+    def stats(self) -> Dict:
+        """Sizes of the live file and every closed segment"""
+        return {
+            "live_size_mb": round(self.live_path.stat().st_size / (1024 * 1024), 2),
+            "segments": [
+                {
+                    "name": entry["name"],
+                    "rows": entry["rows"],
+                    "checks": entry["checks"],
+                    "size_mb": round(entry["bytes"] / (1024 * 1024), 2),
+                    "compressed_mb": round(entry["compressed_bytes"] / (1024 * 1024), 2),
+                    "location": str(self.archive_path(entry))
+                }
+                for entry in self.closed()
+            ]
+        }
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Truth Ledger Monthly Segments')
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='truth_ledger.db',
+        help='Live ledger path (default: truth_ledger.db)'
+    )
+    parser.add_argument(
+        '--dir',
+        type=str,
+        default='segments',
+        help='Segment directory (default: segments)'
+    )
+    parser.add_argument(
+        '--rotate',
+        action='store_true',
+        help='Close every month of the live ledger that ended over 9 days ago into a segment'
+    )
+    parser.add_argument(
+        '--vacuum',
+        action='store_true',
+        help='With --rotate, shrink the live file once months are carved out'
+    )
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Verify segment seals and the live chains'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='With --verify, decompress and re-hash every closed segment'
+    )
+    parser.add_argument(
+        '--archive-to',
+        type=str,
+        default=None,
+        help='Move closed segments older than --keep months to this directory'
+    )
+    parser.add_argument(
+        '--keep',
+        type=int,
+        default=3,
+        help='With --archive-to, newest closed segments to leave in place (default: 3)'
+    )
+    
+    args = parser.parse_args()
+    store = SegmentStore(args.dir, args.db)
+    
+    if args.rotate:
+        with TruthLedgerDB(args.db) as db:
+            for entry in store.rotate(db, vacuum=args.vacuum):
+                print(f"Closed {entry['name']}: {entry['rows']:,} rows, "
+                      f"{entry['bytes'] / 1048576:.1f}MB -> "
+                      f"{entry['compressed_bytes'] / 1048576:.1f}MB gzip")
+    
+    if args.archive_to:
+        closed = store.closed()
+        for entry in closed[:max(0, len(closed) - args.keep)]:
+            if Path(entry["file"]).is_absolute():
+                continue
+            entry = store.archive(entry["name"], args.archive_to)
+            print(f"Archived {entry['name']} to {entry['file']}")
+    
+    if args.verify:
+        with TruthLedgerDB(args.db) as db:
+            valid, errors = store.verify(db, full=args.full)
+        for error in errors[:20]:
+            print(f"   ✗ {error}")
+        print("✓ SEGMENT CHAIN VERIFIED" if valid else "✗ SEGMENT CHAIN VERIFICATION FAILED")
+        sys.exit(0 if valid else 1)
+    
+    stats = store.stats()
+    print(f"Live ledger: {stats['live_size_mb']}MB")
+    for segment in stats["segments"]:
+        print(f"   {segment['name']:<16} {segment['rows']:>10,} rows  "
+              f"{segment['compressed_mb']:>8.2f}MB  {segment['location']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Ledger Service Module
+One writer thread and a pool of read-only connections over a WAL ledger
+
+Every write goes through a bounded queue to a single writer thread that
+owns the only read-write connection and group-commits whatever has
+queued up. A full queue blocks (or times out) the producer, which is
+the back-pressure. Readers borrow query_only connections from a pool,
+so reports and dashboards never wait on ingestion and vice versa.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from database import TruthLedgerDB
+
+
+logger = logging.getLogger(__name__)
+
+# Queue marker that tells the writer thread to drain and exit
+_STOP = object()
+
+
+class ReaderPool:
+    """Fixed-size pool of read-only ledger connections"""
+    
+    def __init__(self, db_path: str, size: int = 4):
+        self._idle: queue.Queue = queue.Queue()
+        self._readers = [TruthLedgerDB(db_path, read_only=True) for _ in range(size)]
+        for reader in self._readers:
+            self._idle.put(reader)
+    
+    @contextmanager
+    def reader(self, timeout: Optional[float] = None) -> Iterator[TruthLedgerDB]:
+        """Borrow a read-only ledger; blocks while all are in use"""
+        db = self._idle.get(timeout=timeout)
+        try:
+            yield db
+        finally:
+            self._idle.put(db)
+    
+    def close(self):
+        """Close every reader, waiting for borrowed ones to come back"""
+        for _ in self._readers:
+            self._idle.get().close()
+
+
+class LedgerService:
+    """
+    Single-writer ingest queue plus a read-only connection pool
+    submit() and submit_many() return futures that resolve to the check
+    hash(es) once the group commit holding them lands.
+    """
+    
+    def __init__(self, db_path: str = "truth_ledger.db", queue_size: int = 10000,
+                 max_batch: int = 500, max_delay: float = 0.05, readers: int = 4,
+                 compact: bool = False):
+        self.db_path = db_path
+        self.compact = compact
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        
+        # The writer opens (and migrates) the ledger before readers attach
+        ready: Future = Future()
+        self._writer = threading.Thread(
+            target=self._writer_loop, args=(ready,), name="ledger-writer", daemon=True
+        )
+        self._writer.start()
+        ready.result()
+        
+        self.pool = ReaderPool(db_path, size=readers)
+    
+    def _put(self, item, timeout: Optional[float]):
+        if self._closed:
+            raise RuntimeError("Ledger service is closed")
+        self._queue.put(item, timeout=timeout)
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+    
+    def submit(self, check_data: Dict, timeout: Optional[float] = None) -> Future:
+        """
+        Queue one check for writing
+        Blocks while the queue is full; raises queue.Full after timeout
+        """
+        future: Future = Future()
+        self._put(("check", [check_data], future), timeout)
+        self.submitted += 1
+        return future
+    
+    def submit_many(self, checks: List[Dict], timeout: Optional[float] = None) -> Future:
+        """Queue checks that must land in order; resolves to their hashes"""
+        future: Future = Future()
+        if not checks:
+            future.set_result([])
+            return future
+        self._put(("checks", list(checks), future), timeout)
+        self.submitted += len(checks)
+        return future
+    
+    def call(self, fn: Callable[[TruthLedgerDB], object],
+             timeout: Optional[float] = None) -> Future:
+        """Run fn(db) on the writer thread, between group commits"""
+        future: Future = Future()
+        self._put(("call", fn, future), timeout)
+        return future
+    
+    def reader(self, timeout: Optional[float] = None):
+        """Borrow a read-only ledger: `with service.reader() as db:`"""
+        return self.pool.reader(timeout)
+    
+    def pending(self) -> int:
+        """Items waiting for the writer"""
+        return self._queue.qsize()
+    
+    def _writer_loop(self, ready: Future):
+        try:
+            db = TruthLedgerDB(self.db_path, compact=self.compact)
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+        
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                
+                # Gather everything already queued (up to max_batch checks,
+                # waiting at most max_delay for stragglers) into one commit
+                batch = []
+                size = 0
+                deadline = time.monotonic() + self.max_delay
+                while True:
+                    if item[0] == "call":
+                        self._write_checks(db, batch)
+                        batch, size = [], 0
+                        self._run_call(db, item)
+                    else:
+                        batch.append(item)
+                        size += len(item[1])
+                    
+                    if size >= self.max_batch:
+                        break
+                    try:
+                        item = self._queue.get(
+                            timeout=max(0.0, deadline - time.monotonic())
+                        )
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                
+                self._write_checks(db, batch)
+        finally:
+            db.close()
+    
+    def _write_checks(self, db: TruthLedgerDB, batch: List[tuple]):
+        if not batch:
+            return
+        checks = [check for _, items, _ in batch for check in items]
+        try:
+            hashes = db.insert_checks(checks)
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad submission must not sink everyone else's checks
+                for item in batch:
+                    self._write_checks(db, [item])
+                return
+            logger.error(f"Ledger write of {len(checks)} checks failed: {e}")
+            batch[0][2].set_exception(e)
+            return
+        
+        self.batches += 1
+        self.written += len(checks)
+        offset = 0
+        for kind, items, future in batch:
+            written = hashes[offset:offset + len(items)]
+            future.set_result(written[0] if kind == "check" else written)
+            offset += len(items)
+    
+    @staticmethod
+    def _run_call(db: TruthLedgerDB, item: tuple):
+        _, fn, future = item
+        try:
+            future.set_result(fn(db))
+        except Exception as e:
+            future.set_exception(e)
+    
+    def close(self):
+        """Flush everything queued, stop the writer and close readers"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        self.pool.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
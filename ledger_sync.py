@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+"""
+Ledger Sync - Merkle Anti-Entropy Between Regional Ledgers
+Merges the checks of monitors that probe the same APIs from different
+regions, so every ledger ends up with a multi-vantage view
+
+Each ledger has a vantage name (metadata "vantage"). Its own probes are
+stored with vantage "" and another region's with that region's name;
+every (api_name, vantage) pair is a hash chain of its own, so merged
+rows keep the hashes, and the chain, their region gave them.
+
+Both sides summarise each chain as a tree of time buckets:
+    hour   Merkle root over the sorted chain links of the hour's rows
+    day    Merkle root over the day's hour digests
+    chain  Merkle root over the chain's day digests
+A digest is sha256("<bucket_start_ms>:<rows>:<root>"). The sync compares
+chain digests, descends only into chains, then days, then hours that
+differ, and exchanges the leaves and rows of mismatched hours alone, so
+bandwidth and time grow with the difference, not the ledger.
+
+Digests of closed days (ended over an hour ago and not holding a chain
+head) are cached in sync_digests. Rows appended since the last sync are
+found by id, past a watermark, and mark their days stale, so a day that
+later gains merged rows is recomputed.
+
+Imported rows are re-hashed and must continue the local copy of their
+chain (a compact run that grew since the last sync is updated in
+place). Rows that do not link are reported and left out. Merged rows
+are added to their vantage's rollups and to total_checks; the probes a
+grown run gained are counted at its last_seen.
+
+Requests and responses are plain JSON, so a peer can sit behind any
+transport; the CLI syncs two ledger files and reports the bytes that
+would cross the wire.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from database import (
+    CHAIN_ANCHOR_PREFIX, CHAIN_COLUMNS, DAY_MS, HOUR_MS, LOCAL_VANTAGE,
+    ChainVerifier, RollupAccumulator, TruthLedgerDB, chain_key, chain_link,
+    iso_to_epoch_ms, split_chain_key, utc_now_ms
+)
+from merkle import merkle_root
+
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+
+VANTAGE_KEY = "vantage"
+WATERMARK_KEY = "sync_digests_through"
+
+# A day is closed, and its digest cached, once it ended this long ago
+CLOSE_GRACE_MS = HOUR_MS
+
+# Columns a row travels with; ids and created_at are each ledger's own
+ROW_COLUMNS = ("timestamp", "api_name", "endpoint", "status", "response_time_ms",
+               "status_code", "source", "raw_response", "check_hash", "previous_hash",
+               "ts_epoch_ms", "hash_version", "run_count", "run_last_seen",
+               "run_latency_sum", "run_digest")
+
+# (rows, root) of one bucket
+Bucket = Tuple[int, str]
+
+
+class SyncError(ValueError):
+    """Peers that cannot be synced with each other"""
+
+
+def bucket_digest(bucket_start_ms: int, bucket: Bucket) -> str:
+    """Digest a bucket is compared by"""
+    count, root = bucket
+    return hashlib.sha256(f"{bucket_start_ms}:{count}:{root}".encode()).hexdigest()
+
+
+def fold_buckets(buckets: Dict[int, Bucket]) -> Bucket:
+    """One level up: (rows, Merkle root over the buckets' digests in order)"""
+    if not buckets:
+        return 0, ""
+    starts = sorted(buckets)
+    return (sum(buckets[start][0] for start in starts),
+            merkle_root([bucket_digest(start, buckets[start]) for start in starts]))
+
+
+def get_vantage(db: TruthLedgerDB, name: Optional[str] = None) -> str:
+    """
+    The ledger's vantage name, recording name the first time one is given
+    A ledger cannot be renamed: its peers hold its rows under the old name
+    """
+    current = db.get_metadata(VANTAGE_KEY)
+    if name and "@" in name:
+        raise SyncError(f"Vantage names cannot contain '@': {name}")
+    if current and name and name != current:
+        raise SyncError(f"{db.db_path} is vantage {current!r}, not {name!r}")
+    if current:
+        return current
+    if not name:
+        raise SyncError(f"{db.db_path} has no vantage name yet; pass one")
+    if not db.read_only:
+        db._update_metadata(VANTAGE_KEY, name)
+    return name
+
+
+class SyncEndpoint:
+    """One ledger's side of a sync: answers digest, leaf, row and import requests"""
+    
+    def __init__(self, db: TruthLedgerDB, vantage: str, grace_ms: int = CLOSE_GRACE_MS):
+        self.db = db
+        self.vantage = vantage
+        self.grace_ms = grace_ms
+        # Per stored chain, for the length of one sync
+        self._days: Dict[Tuple[str, str], Dict[int, Bucket]] = {}
+        self._hours: Dict[Tuple[str, str], Dict[int, Bucket]] = {}
+        self._stale: Optional[Dict[Tuple[str, str], Set[int]]] = None
+        self._cached = self.db.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_digests'"
+        ).fetchone() is not None
+    
+    def handle(self, request: Dict) -> Dict:
+        """Answer one request"""
+        handlers = {
+            "hello": lambda: self.hello(),
+            "chains": lambda: self.chains(request.get("since_ms")),
+            "days": lambda: self.days(request["chains"], request.get("since_ms")),
+            "hours": lambda: self.hours(request["days"]),
+            "leaves": lambda: self.leaves(request["hours"]),
+            "rows": lambda: self.rows(request["links"]),
+            "import": lambda: self.import_rows(request["rows"])
+        }
+        handler = handlers.get(request.get("op"))
+        if handler is None:
+            raise SyncError(f"Unknown sync request: {request.get('op')}")
+        return handler()
+    
+    def hello(self) -> Dict:
+        return {"version": PROTOCOL_VERSION, "vantage": self.vantage,
+                "compact": self.db.is_compact_ledger()}
+    
+    def _stored(self, key: str) -> Tuple[str, str]:
+        """(api_name, vantage as stored here) for a chain key both peers share"""
+        api_name, vantage = split_chain_key(key)
+        return api_name, LOCAL_VANTAGE if vantage == self.vantage else vantage
+    
+    def _shared(self, api_name: str, vantage: str) -> str:
+        """Chain key both peers share: the local chain is named by this vantage"""
+        return chain_key(api_name, vantage or self.vantage)
+    
+    def _find_stale(self) -> Dict[Tuple[str, str], Set[int]]:
+        """
+        Days holding rows appended since the watermark; marked stale in
+        sync_digests (unless read-only) before the watermark moves past them
+        """
+        if self._stale is not None:
+            return self._stale
+        conn = self.db.conn
+        through = int(self.db.get_metadata(WATERMARK_KEY) or 0)
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM checks").fetchone()[0]
+        stale: Dict[Tuple[str, str], Set[int]] = {}
+        for api_name, vantage, day in conn.execute("""
+            SELECT DISTINCT api_name, vantage, ts_epoch_ms - ts_epoch_ms % ?
+            FROM checks WHERE id > ? AND id <= ?
+        """, (DAY_MS, through, last_id)):
+            stale.setdefault((api_name, vantage), set()).add(day)
+        
+        if self._cached and not self.db.read_only and last_id != through:
+            with conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO sync_digests
+                    (api_name, vantage, bucket_start_ms, row_count, root_hash)
+                    VALUES (?, ?, ?, 0, NULL)
+                """, [(api_name, vantage, day)
+                      for (api_name, vantage), days in stale.items() for day in days])
+                conn.execute("""
+                    INSERT OR REPLACE INTO metadata (key, value, updated_at) VALUES (?, ?, ?)
+                """, (WATERMARK_KEY, str(last_id), datetime.utcnow().isoformat()))
+        self._stale = stale
+        return stale
+    
+    def _scan(self, api_name: str, vantage: str, start_ms: int,
+              end_ms: Optional[int] = None) -> Iterable[sqlite3.Row]:
+        """A chain's rows stamped in [start_ms, end_ms)"""
+        end_clause = "AND ts_epoch_ms < ?" if end_ms is not None else ""
+        params = (api_name, vantage, start_ms) + ((end_ms,) if end_ms is not None else ())
+        return self.db.conn.execute(f"""
+            SELECT {CHAIN_COLUMNS}, ts_epoch_ms, raw_response FROM checks
+            WHERE api_name = ? AND vantage = ? AND ts_epoch_ms >= ? {end_clause}
+        """, params)
+    
+    def _hour_buckets(self, api_name: str, vantage: str, start_ms: int,
+                      end_ms: Optional[int] = None) -> Dict[int, Bucket]:
+        """Hour buckets of a chain over [start_ms, end_ms)"""
+        links: Dict[int, List[str]] = {}
+        for row in self._scan(api_name, vantage, start_ms, end_ms):
+            hour = row["ts_epoch_ms"] - row["ts_epoch_ms"] % HOUR_MS
+            links.setdefault(hour, []).append(chain_link(row))
+        return {hour: (len(hour_links), merkle_root(sorted(hour_links)))
+                for hour, hour_links in links.items()}
+    
+    def _chain_days(self, api_name: str, vantage: str) -> Dict[int, Bucket]:
+        """
+        Day buckets of a stored chain: cached closed days, plus days that
+        are stale or newer than the last cached one
+        """
+        chain = (api_name, vantage)
+        if chain in self._days:
+            return self._days[chain]
+        conn = self.db.conn
+        stale = set(self._find_stale().get(chain, ()))
+        cached: Dict[int, Bucket] = {}
+        if self._cached:
+            for start, count, root in conn.execute("""
+                SELECT bucket_start_ms, row_count, root_hash FROM sync_digests
+                WHERE api_name = ? AND vantage = ?
+            """, chain):
+                if root is None:
+                    stale.add(start)
+                else:
+                    cached[start] = (count, root)
+        for day in stale:
+            cached.pop(day, None)
+        
+        # Cached days always form a prefix of the chain (bar stale ones),
+        # so everything after the newest is new
+        scan_from = max(cached) + DAY_MS if cached else None
+        hours: Dict[int, Bucket] = {}
+        for day in sorted(stale):
+            if scan_from is not None and day < scan_from:
+                hours.update(self._hour_buckets(api_name, vantage, day, day + DAY_MS))
+        hours.update(self._hour_buckets(
+            api_name, vantage, scan_from if scan_from is not None else -2 ** 62
+        ))
+        self._hours[chain] = hours
+        
+        computed: Dict[int, Dict[int, Bucket]] = {}
+        for hour, bucket in hours.items():
+            computed.setdefault(hour - hour % DAY_MS, {})[hour] = bucket
+        days = dict(cached)
+        days.update({day: fold_buckets(day_hours) for day, day_hours in computed.items()})
+        
+        if self._cached and not self.db.read_only:
+            self._cache_days(chain, days, computed, stale, scan_from)
+        self._days[chain] = days
+        return days
+    
+    def _cache_days(self, chain: Tuple[str, str], days: Dict[int, Bucket],
+                    computed: Dict[int, Dict[int, Bucket]], stale: Set[int],
+                    scan_from: Optional[int]):
+        """Cache newly computed closed days and clear stale days that were"""
+        conn = self.db.conn
+        head = conn.execute("""
+            SELECT ts_epoch_ms FROM checks
+            WHERE id = (SELECT MAX(id) FROM checks WHERE api_name = ? AND vantage = ?)
+        """, chain).fetchone()
+        # The head's run may still grow, so its day stays open
+        open_from = utc_now_ms() - self.grace_ms - DAY_MS
+        if head is not None:
+            open_from = min(open_from, head[0] - head[0] % DAY_MS - 1)
+        
+        closed = []
+        for day in sorted(computed):
+            if day > open_from:
+                break
+            if scan_from is None or day >= scan_from or day in stale:
+                closed.append((*chain, day, *days[day]))
+        gone = [(*chain, day) for day in stale if day not in days]
+        with conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO sync_digests
+                (api_name, vantage, bucket_start_ms, row_count, root_hash)
+                VALUES (?, ?, ?, ?, ?)
+            """, closed)
+            conn.executemany("""
+                DELETE FROM sync_digests WHERE api_name = ? AND vantage = ? AND bucket_start_ms = ?
+            """, gone)
+    
+    def chains(self, since_ms: Optional[int] = None) -> Dict[str, str]:
+        """Digest of every chain, over its days from since_ms on"""
+        digests = {}
+        for api_name, vantage in self.db.get_chains():
+            days = self._since(self._chain_days(api_name, vantage), since_ms)
+            if days:
+                digests[self._shared(api_name, vantage)] = bucket_digest(0, fold_buckets(days))
+        return digests
+    
+    @staticmethod
+    def _since(buckets: Dict[int, Bucket], since_ms: Optional[int]) -> Dict[int, Bucket]:
+        if since_ms is None:
+            return buckets
+        since_day = since_ms - since_ms % DAY_MS
+        return {start: bucket for start, bucket in buckets.items() if start >= since_day}
+    
+    def days(self, keys: List[str], since_ms: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+        """Day digests of the given chains"""
+        return {
+            key: {
+                str(day): bucket_digest(day, bucket)
+                for day, bucket in self._since(self._chain_days(*self._stored(key)), since_ms).items()
+            }
+            for key in keys
+        }
+    
+    def hours(self, days: Dict[str, List[int]]) -> Dict[str, Dict[str, str]]:
+        """Hour digests of the given days, by chain"""
+        result = {}
+        for key, day_starts in days.items():
+            chain = self._stored(key)
+            hours = self._hours.get(chain, {})
+            digests = {}
+            for day in day_starts:
+                day = int(day)
+                day_hours = {hour: bucket for hour, bucket in hours.items()
+                             if day <= hour < day + DAY_MS}
+                if not day_hours:
+                    # A cached day: rebuild its hours from its rows
+                    day_hours = self._hour_buckets(*chain, day, day + DAY_MS)
+                digests.update({str(hour): bucket_digest(hour, bucket)
+                                for hour, bucket in day_hours.items()})
+            result[key] = digests
+        return result
+    
+    def leaves(self, hours: Dict[str, List[int]]) -> Dict[str, Dict[str, List[str]]]:
+        """Chain links of the rows in the given hours, by chain"""
+        result = {}
+        for key, hour_starts in hours.items():
+            chain = self._stored(key)
+            result[key] = {
+                str(int(hour)): sorted(chain_link(row) for row in self._scan(
+                    *chain, int(hour), int(hour) + HOUR_MS
+                ))
+                for hour in hour_starts
+            }
+        return result
+    
+    def rows(self, links: Dict[str, Dict[str, List[str]]]) -> Dict[str, List[Dict]]:
+        """Full rows for chain links, given with the hour each was listed under"""
+        result = {}
+        for key, by_hour in links.items():
+            chain = self._stored(key)
+            rows = []
+            for hour, hour_links in by_hour.items():
+                wanted = set(hour_links)
+                rows.extend(
+                    dict({column: row[column] for column in ROW_COLUMNS},
+                         vantage=row["vantage"] or self.vantage)
+                    for row in self._scan(*chain, int(hour), int(hour) + HOUR_MS)
+                    if chain_link(row) in wanted
+                )
+            result[key] = rows
+        return result
+    
+    def import_rows(self, rows_by_chain: Dict[str, List[Dict]]) -> Dict:
+        """
+        Append a peer's rows to the local copies of their chains
+        Each chain's rows are re-hashed in link order from the local head
+        (or the chain's anchor); rows that do not link are left out
+        """
+        conn = self.db.conn
+        anchors = self.db.get_chain_anchors()
+        result = {"imported": 0, "updated": 0, "present": 0, "unlinked": 0, "errors": []}
+        rollups = RollupAccumulator()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            probes = sum(
+                self._import_chain(key, rows, anchors, result, rollups)
+                for key, rows in sorted(rows_by_chain.items())
+            )
+            rollups.flush(conn)
+            conn.execute("""
+                UPDATE metadata
+                SET value = CAST(value AS INTEGER) + ?, updated_at = ?
+                WHERE key = 'total_checks'
+            """, (probes, datetime.utcnow().isoformat()))
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        
+        if result["imported"] or result["updated"]:
+            self.db.reload_chain_heads()
+            self._days.clear()
+            self._hours.clear()
+            self._stale = None
+        return result
+    
+    def _import_chain(self, key: str, rows: List[Dict], anchors: Dict[str, str],
+                      result: Dict, rollups: RollupAccumulator) -> int:
+        """Import one chain's rows; returns how many probes they add"""
+        conn = self.db.conn
+        probes = 0
+        api_name, vantage = self._stored(key)
+        head = conn.execute(f"""
+            SELECT {CHAIN_COLUMNS}, ts_epoch_ms FROM checks
+            WHERE id = (SELECT MAX(id) FROM checks WHERE api_name = ? AND vantage = ?)
+        """, (api_name, vantage)).fetchone()
+        
+        pending = {}
+        for row in rows:
+            if head is not None and row["check_hash"] == head["check_hash"]:
+                # The head's run grew on the peer since this copy was taken
+                if (row["run_count"] > head["run_count"]
+                        and row["previous_hash"] == head["previous_hash"]):
+                    self._regrow(head, row)
+                    grown = row["run_count"] - head["run_count"]
+                    rollups.add(
+                        api_name, row["status"], row["response_time_ms"],
+                        row["run_last_seen"], iso_to_epoch_ms(row["run_last_seen"]),
+                        count=grown,
+                        latency_sum=(None if row["run_latency_sum"] is None else
+                                     row["run_latency_sum"] - (head["run_latency_sum"]
+                                                               or head["response_time_ms"])),
+                        vantage=vantage
+                    )
+                    probes += grown
+                    head = dict(head, **{column: row[column] for column in (
+                        "run_count", "run_last_seen", "run_latency_sum", "run_digest"
+                    )})
+                    result["updated"] += 1
+                else:
+                    result["present"] += 1
+            elif conn.execute("SELECT 1 FROM checks WHERE check_hash = ?",
+                              (row["check_hash"],)).fetchone():
+                result["present"] += 1
+            else:
+                pending[row["previous_hash"]] = row
+        if not pending:
+            return probes
+        
+        if head is not None:
+            link = chain_link(head)
+        elif chain_key(api_name, vantage) in anchors:
+            link = anchors[chain_key(api_name, vantage)]
+        else:
+            # A chain new to this ledger starts wherever the peer's copy
+            # does (after rows it carved out or that --since skipped)
+            produced = {chain_link(row) for row in pending.values()}
+            starts = [previous for previous in pending if previous not in produced]
+            link = starts[0] if len(starts) == 1 else ""
+            if link:
+                conn.execute("""
+                    INSERT OR REPLACE INTO metadata (key, value, updated_at) VALUES (?, ?, ?)
+                """, (CHAIN_ANCHOR_PREFIX + chain_key(api_name, vantage), link,
+                      datetime.utcnow().isoformat()))
+        
+        verifier = ChainVerifier(link)
+        chain = []
+        while link in pending:
+            row = pending.pop(link)
+            verifier.feed(dict(row, id=row["check_hash"][:16]))
+            if verifier.errors:
+                result["errors"].append(f"{key}: {verifier.errors[0]}")
+                result["unlinked"] += 1
+                break
+            chain.append(row)
+            link = chain_link(row)
+        result["unlinked"] += len(pending)
+        if pending and not verifier.errors:
+            result["errors"].append(f"{key}: {len(pending)} rows do not continue the local chain")
+        
+        columns = ROW_COLUMNS + ("vantage",)
+        conn.executemany(f"""
+            INSERT INTO checks ({', '.join(columns)})
+            VALUES ({', '.join('?' * len(columns))})
+        """, [[row[column] for column in ROW_COLUMNS] + [vantage] for row in chain])
+        result["imported"] += len(chain)
+        for row in chain:
+            for piece in TruthLedgerDB._split_run_by_hour(row):
+                rollups.add(api_name, row["status"], row["response_time_ms"],
+                            *piece, vantage=vantage)
+            probes += row["run_count"]
+        return probes
+    
+    def _regrow(self, head: sqlite3.Row, row: Dict):
+        """Bring a stale local copy of a run up to the peer's"""
+        conn = self.db.conn
+        conn.execute("""
+            UPDATE checks
+            SET run_count = ?, run_last_seen = ?, run_latency_sum = ?, run_digest = ?
+            WHERE id = ?
+        """, (row["run_count"], row["run_last_seen"], row["run_latency_sum"],
+              row["run_digest"], head["id"]))
+        if self._cached:
+            day = head["ts_epoch_ms"] - head["ts_epoch_ms"] % DAY_MS
+            conn.execute("""
+                UPDATE sync_digests SET root_hash = NULL
+                WHERE api_name = ? AND vantage = ? AND bucket_start_ms = ?
+            """, (head["api_name"], head["vantage"], day))
+
+
+class Channel:
+    """
+    Sends requests to an endpoint as JSON, counting the bytes each way
+    as a network transport would carry them
+    """
+    
+    def __init__(self, endpoint: SyncEndpoint):
+        self.endpoint = endpoint
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+    
+    def __call__(self, request: Dict) -> Dict:
+        payload = json.dumps(request, separators=(",", ":"))
+        self.bytes_sent += len(payload)
+        response = json.dumps(self.endpoint.handle(json.loads(payload)), separators=(",", ":"))
+        self.bytes_received += len(response)
+        self.requests += 1
+        return json.loads(response)
+
+
+def _differing(mine: Dict[str, str], theirs: Dict[str, str]) -> List[str]:
+    return sorted(key for key in set(mine) | set(theirs) if mine.get(key) != theirs.get(key))
+
+
+def sync(local: SyncEndpoint, peer: Callable[[Dict], Dict],
+         since_ms: Optional[int] = None, pull_only: bool = False) -> Dict:
+    """
+    Reconcile local with a peer (reached through a request callable such
+    as Channel); returns what was compared and transferred
+    """
+    started = time.perf_counter()
+    hello = peer({"op": "hello"})
+    if hello.get("version") != PROTOCOL_VERSION:
+        raise SyncError(f"Unsupported sync protocol: {hello.get('version')}")
+    if hello["vantage"] == local.vantage:
+        raise SyncError(f"Both ledgers are vantage {local.vantage!r}")
+    
+    # Chains, then days, then hours: each level only where the last differed
+    mine, theirs = local.chains(since_ms), peer({"op": "chains", "since_ms": since_ms})
+    chains = _differing(mine, theirs)
+    levels = {"chains": len(set(mine) | set(theirs)), "chains_differing": len(chains)}
+    
+    days: Dict[str, List[int]] = {}
+    if chains:
+        mine = local.days(chains, since_ms)
+        theirs = peer({"op": "days", "chains": chains, "since_ms": since_ms})
+        for key in chains:
+            days[key] = [int(day) for day in _differing(mine[key], theirs[key])]
+    levels["days_differing"] = sum(len(d) for d in days.values())
+    
+    hours: Dict[str, List[int]] = {}
+    if days:
+        mine, theirs = local.hours(days), peer({"op": "hours", "days": days})
+        for key in days:
+            hours[key] = [int(hour) for hour in _differing(mine[key], theirs[key])]
+    levels["hours_differing"] = sum(len(h) for h in hours.values())
+    
+    want: Dict[str, Dict[str, List[str]]] = {}
+    give: Dict[str, Dict[str, List[str]]] = {}
+    if hours:
+        mine, theirs = local.leaves(hours), peer({"op": "leaves", "hours": hours})
+        for key in hours:
+            for hour in map(str, hours[key]):
+                local_links = set(mine[key].get(hour, ()))
+                peer_links = set(theirs[key].get(hour, ()))
+                if peer_links - local_links:
+                    want.setdefault(key, {})[hour] = sorted(peer_links - local_links)
+                if local_links - peer_links:
+                    give.setdefault(key, {})[hour] = sorted(local_links - peer_links)
+    
+    pulled = local.import_rows(peer({"op": "rows", "links": want})) if want else {}
+    pushed = {}
+    if give and not pull_only:
+        pushed = peer({"op": "import", "rows": local.rows(give)})
+    
+    stats = {
+        "peer": hello["vantage"],
+        "vantage": local.vantage,
+        "synced_at": datetime.utcnow().isoformat(),
+        "since_ms": since_ms,
+        "levels": levels,
+        "pulled": pulled,
+        "pushed": pushed,
+        "seconds": time.perf_counter() - started
+    }
+    if isinstance(peer, Channel):
+        stats.update({"requests": peer.requests, "bytes_sent": peer.bytes_sent,
+                      "bytes_received": peer.bytes_received})
+    if not local.db.read_only:
+        local.db.record_sync(stats)
+    return stats
+
+
+def print_stats(stats: Dict):
+    """Summarise a sync"""
+    levels = stats["levels"]
+    print(f"Synced {stats['vantage']} with {stats['peer']} in {stats['seconds']:.2f}s")
+    print(f"   Chains compared:   {levels['chains']:,} ({levels['chains_differing']:,} differ)")
+    print(f"   Days differing:    {levels['days_differing']:,}")
+    print(f"   Hours differing:   {levels['hours_differing']:,}")
+    for direction in ("pulled", "pushed"):
+        result = stats[direction]
+        if result:
+            print(f"   Rows {direction}:       {result['imported']:,} new, "
+                  f"{result['updated']:,} runs updated, {result['unlinked']:,} unlinked")
+            for error in result["errors"][:5]:
+                print(f"      {error}")
+    if "requests" in stats:
+        print(f"   Transferred:       {stats['bytes_sent'] + stats['bytes_received']:,} bytes "
+              f"in {stats['requests']} requests")
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Truth Ledger Anti-Entropy Sync')
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='truth_ledger.db',
+        help='Local ledger'
+    )
+    parser.add_argument(
+        '--peer',
+        type=str,
+        default=None,
+        help="Peer ledger to sync with"
+    )
+    parser.add_argument(
+        '--vantage',
+        type=str,
+        default=None,
+        help="Local ledger's vantage name (recorded the first time)"
+    )
+    parser.add_argument(
+        '--peer-vantage',
+        type=str,
+        default=None,
+        help="Peer ledger's vantage name, if it has none recorded yet"
+    )
+    parser.add_argument(
+        '--pull-only',
+        action='store_true',
+        help='Only import the peer\'s rows; open the peer read-only'
+    )
+    parser.add_argument(
+        '--since',
+        type=str,
+        default=None,
+        help='Only compare days from this ISO timestamp on (e.g. for carved ledgers)'
+    )
+    parser.add_argument(
+        '--status',
+        action='store_true',
+        help='Print the last sync recorded in the local ledger'
+    )
+    
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    
+    if args.status:
+        with TruthLedgerDB(args.db, read_only=True) as db:
+            value = db.get_metadata("last_sync")
+        if value is None:
+            print(f"{args.db} has not been synced")
+            return
+        print_stats(json.loads(value))
+        return
+    
+    if not args.peer:
+        parser.error("--peer is required")
+    since_ms = iso_to_epoch_ms(args.since) if args.since else None
+    with TruthLedgerDB(args.db) as db, \
+            TruthLedgerDB(args.peer, read_only=args.pull_only) as peer_db:
+        local = SyncEndpoint(db, get_vantage(db, args.vantage))
+        peer = Channel(SyncEndpoint(peer_db, get_vantage(peer_db, args.peer_vantage)))
+        stats = sync(local, peer, since_ms=since_ms, pull_only=args.pull_only)
+    print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Merkle Tree Module
+Batch anchoring and logarithmic inclusion proofs for ledger checks
+
+Leaves and interior nodes are domain-separated (0x00 / 0x01 prefixes)
+so a leaf can never be passed off as an interior node. An odd node at
+the end of a level is promoted unchanged to the next level.
+"""
+
+import hashlib
+from typing import Dict, List, Optional, Sequence
+
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(check_hash: str) -> bytes:
+    """Hash a check_hash (hex) into a Merkle leaf"""
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(check_hash)).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash two child nodes into their parent"""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def build_levels(check_hashes: Sequence[str]) -> List[List[bytes]]:
+    """Build every level of the tree, leaves first and root last"""
+    if not check_hashes:
+        raise ValueError("Cannot build a Merkle tree with no leaves")
+    
+    levels = [[leaf_hash(h) for h in check_hashes]]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parent = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parent.append(level[-1])
+        levels.append(parent)
+    return levels
+
+
+def merkle_root(check_hashes: Sequence[str]) -> str:
+    """Compute the hex Merkle root over check hashes in order"""
+    return build_levels(check_hashes)[-1][0].hex()
+
+
+def inclusion_path(levels: List[List[bytes]], index: int) -> List[List[str]]:
+    """
+    Sibling path from leaf index to the root
+    Each step is [side, hex_hash] where side says which side the
+    sibling sits on
+    """
+    path = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            side = "left" if sibling < index else "right"
+            path.append([side, level[sibling].hex()])
+        index //= 2
+    return path
+
+
+def root_from_path(check_hash: str, path: List[List[str]]) -> str:
+    """Fold a sibling path back up to the root it implies"""
+    node = leaf_hash(check_hash)
+    for side, sibling_hex in path:
+        sibling = bytes.fromhex(sibling_hex)
+        node = node_hash(sibling, node) if side == "left" else node_hash(node, sibling)
+    return node.hex()
+
+
+def verify_inclusion_proof(check_hash: str, proof: Dict,
+                           root_hash: Optional[str] = None) -> bool:
+    """
+    Check that check_hash is a leaf under the proof's batch root
+    Pass root_hash to pin the root to an independently trusted value
+    """
+    expected_root = root_hash or proof.get("root_hash")
+    if not expected_root or proof.get("check_hash", check_hash) != check_hash:
+        return False
+    try:
+        return root_from_path(check_hash, proof["path"]) == expected_root
+    except (KeyError, ValueError):
+        return False
@@ -8,21 +8,48 @@ import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import LOCAL_VANTAGE, TruthLedgerDB, chain_key, utc_now_ms
+
 # Database path (adjust based on deployment)
 DB_PATH = Path(__file__).parent.parent / "truth_ledger.db"
 
+
+def from_epoch_ms(ts_epoch_ms):
+    """Ledger epoch milliseconds to a naive UTC datetime"""
+    return datetime.utcfromtimestamp(ts_epoch_ms / 1000)
+
 def print_header(title):
     """Print formatted header"""
     print("\n" + "=" * 80)
     print(f"{title:^80}")
     print("=" * 80 + "\n")
 
-def get_db_connection():
-    """Get database connection"""
+def get_ledger():
+    """
+    Open the ledger read-only so the dashboard never blocks ingestion
+    (chain checkpoints are only advanced by the monitor). A ledger from
+    before the current schema is opened read-write once to migrate it.
+    """
     if not DB_PATH.exists():
         print(f"ERROR: Database not found at {DB_PATH}")
         sys.exit(1)
-    return sqlite3.connect(DB_PATH)
+    ledger = TruthLedgerDB(DB_PATH, read_only=True)
+    if ledger.needs_migration():
+        ledger.close()
+        try:
+            TruthLedgerDB(DB_PATH).close()
+        except sqlite3.OperationalError as e:
+            print(f"ERROR: {DB_PATH} uses an older schema and could not be migrated ({e})")
+            print("Run the monitor once (python truth_ledger.py --once) to migrate it")
+            sys.exit(1)
+        ledger = TruthLedgerDB(DB_PATH, read_only=True)
+    return ledger
+
+def get_db_connection():
+    """Get database connection"""
+    return get_ledger().conn
 
 def check_service_status():
     """Check if data collection is active"""
@@ -31,13 +58,13 @@ def check_service_status():
     conn = get_db_connection()
     cur = conn.cursor()
     
-    # Get latest check time
-    cur.execute("SELECT MAX(timestamp) FROM checks")
+    # Get latest check time (of the ledger's own probes, not merged ones)
+    cur.execute("SELECT MAX(ts_epoch_ms) FROM checks WHERE vantage = ?", (LOCAL_VANTAGE,))
     latest_timestamp = cur.fetchone()[0]
     
     if latest_timestamp:
-        latest_time = datetime.fromtimestamp(latest_timestamp)
-        time_since = datetime.now() - latest_time
+        latest_time = from_epoch_ms(latest_timestamp)
+        time_since = datetime.utcnow() - latest_time
         
         print(f"Latest check: {latest_time.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"Time since last check: {time_since}")
@@ -58,21 +85,25 @@ def get_data_summary():
     conn = get_db_connection()
     cur = conn.cursor()
     
-    # Total checks
-    cur.execute("SELECT COUNT(*) FROM checks")
+    # Total checks (a compact run row counts every probe it holds); rows
+    # merged from other vantages by sync or ingest are not ours
+    cur.execute("SELECT COALESCE(SUM(run_count), 0) FROM checks WHERE vantage = ?",
+                (LOCAL_VANTAGE,))
     total_checks = cur.fetchone()[0]
     
     # Unique APIs
-    cur.execute("SELECT COUNT(DISTINCT api_name) FROM checks")
+    cur.execute("SELECT COUNT(DISTINCT api_name) FROM checks WHERE vantage = ?",
+                (LOCAL_VANTAGE,))
     unique_apis = cur.fetchone()[0]
     
     # Date range
-    cur.execute("SELECT MIN(timestamp), MAX(timestamp) FROM checks")
+    cur.execute("SELECT MIN(ts_epoch_ms), MAX(ts_epoch_ms) FROM checks WHERE vantage = ?",
+                (LOCAL_VANTAGE,))
     min_ts, max_ts = cur.fetchone()
     
     if min_ts and max_ts:
-        first_check = datetime.fromtimestamp(min_ts)
-        last_check = datetime.fromtimestamp(max_ts)
+        first_check = from_epoch_ms(min_ts)
+        last_check = from_epoch_ms(max_ts)
         duration = last_check - first_check
         
         print(f"Total checks: {total_checks:,}")
@@ -100,19 +131,22 @@ def get_api_breakdown():
     conn = get_db_connection()
     cur = conn.cursor()
     
+    # Daily rollups already hold every check, so this is one row per API-day
+    # (of the ledger's own probes; other vantages have their own rollups)
     cur.execute("""
         SELECT 
             api_name,
-            COUNT(*) as total_checks,
-            SUM(CASE WHEN status = 'UP' THEN 1 ELSE 0 END) as up_count,
-            SUM(CASE WHEN status != 'UP' THEN 1 ELSE 0 END) as down_count,
-            AVG(response_time_ms) as avg_response_ms,
-            MIN(datetime(timestamp, 'unixepoch')) as first_check,
-            MAX(datetime(timestamp, 'unixepoch')) as last_check
-        FROM checks
+            SUM(total_count) as total_checks,
+            SUM(up_count) as up_count,
+            SUM(total_count - up_count) as down_count,
+            CAST(SUM(latency_sum) AS REAL) / NULLIF(SUM(latency_count), 0) as avg_response_ms,
+            MIN(first_timestamp) as first_check,
+            MAX(last_timestamp) as last_check
+        FROM api_rollup_daily
+        WHERE vantage = ?
         GROUP BY api_name
         ORDER BY api_name
-    """)
+    """, (LOCAL_VANTAGE,))
     
     results = cur.fetchall()
     
@@ -127,6 +161,30 @@ def get_api_breakdown():
     
     conn.close()
 
+def get_consensus_breakdown():
+    """Per-API status agreed across vantages, when several regions probe"""
+    print_header("CONSENSUS ACROSS VANTAGES (Last 24 Hours)")
+    
+    db = get_ledger()
+    apis = sorted({api_name for api_name, _ in db.get_chains()})
+    rows = []
+    for api_name in apis:
+        uptime = db.get_api_uptime(api_name, hours=24, vantage=None)
+        if len(uptime.get("vantages", ())) > 1:
+            rows.append((api_name, uptime))
+    db.close()
+    
+    if not rows:
+        print("Single vantage - nothing to compare")
+        return
+    
+    print(f"{'API':<15} {'Vantages':<25} {'Uptime %':<10} {'Down hrs':<10} {'Regional hrs':<12}")
+    print("-" * 80)
+    for api_name, uptime in rows:
+        vantages = ", ".join(vantage or "local" for vantage in uptime["vantages"])
+        print(f"{api_name:<15} {vantages:<25} {uptime['uptime']:>8.2f}%  "
+              f"{uptime['down_hours']:<10} {uptime['regional_hours']:<12}")
+
 def get_recent_issues():
     """Get recent downtime or errors"""
     print_header("RECENT ISSUES (Last 24 Hours)")
@@ -134,20 +192,19 @@ def get_recent_issues():
     conn = get_db_connection()
     cur = conn.cursor()
     
-    yesterday = datetime.now() - timedelta(days=1)
-    yesterday_ts = yesterday.timestamp()
+    yesterday_ms = utc_now_ms() - 24 * 3600 * 1000
     
     cur.execute("""
         SELECT 
-            datetime(timestamp, 'unixepoch') as check_time,
+            datetime(ts_epoch_ms / 1000, 'unixepoch') as check_time,
             api_name,
             status,
             status_code
         FROM checks
-        WHERE timestamp > ? AND status != 'UP'
-        ORDER BY timestamp DESC
+        WHERE ts_epoch_ms > ? AND status != 'up' AND vantage = ?
+        ORDER BY ts_epoch_ms DESC
         LIMIT 20
-    """, (yesterday_ts,))
+    """, (yesterday_ms, LOCAL_VANTAGE))
     
     results = cur.fetchall()
     
@@ -163,48 +220,27 @@ def get_recent_issues():
     conn.close()
 
 def verify_chain_integrity():
-    """Verify cryptographic chain integrity"""
+    """Verify cryptographic chain integrity (incremental from checkpoints)"""
     print_header("CHAIN INTEGRITY VERIFICATION")
     
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    # Get all unique APIs
-    cur.execute("SELECT DISTINCT api_name FROM checks ORDER BY api_name")
-    apis = [row[0] for row in cur.fetchall()]
+    db = get_ledger()
     
     all_valid = True
     
-    for api_name in apis:
-        # Get all checks for this API
-        cur.execute("""
-            SELECT id, previous_hash, check_hash
-            FROM checks
-            WHERE api_name = ?
-            ORDER BY id ASC
-        """, (api_name,))
-        
-        rows = cur.fetchall()
+    # One chain per API and vantage
+    for api_name, vantage in db.get_chains():
+        chain_valid, errors = db.verify_chain_integrity(api_name, full=False, vantage=vantage)
+        label = chain_key(api_name, vantage)
         
-        if not rows:
-            continue
-        
-        # Verify chain links
-        broken_links = 0
-        for i in range(1, len(rows)):
-            prev_check_hash = rows[i-1][2]  # check_hash of previous
-            current_prev_hash = rows[i][1]  # previous_hash of current
-            
-            if prev_check_hash != current_prev_hash:
-                broken_links += 1
-        
-        if broken_links == 0:
-            print(f"✅ {api_name:<15} Chain intact ({len(rows)} links)")
+        if chain_valid:
+            checkpoint = db.get_chain_checkpoint(api_name, vantage)
+            through = checkpoint[0] if checkpoint else "-"
+            print(f"✅ {label:<15} Chain intact (verified through check #{through})")
         else:
-            print(f"❌ {api_name:<15} Chain broken ({broken_links} breaks in {len(rows)} links)")
+            print(f"❌ {label:<15} Chain broken ({len(errors)} errors, first: {errors[0]})")
             all_valid = False
     
-    conn.close()
+    db.close()
     
     print()
     if all_valid:
@@ -222,15 +258,16 @@ def check_7day_readiness():
     cur = conn.cursor()
     
     # Get date range
-    cur.execute("SELECT MIN(timestamp), MAX(timestamp) FROM checks")
+    cur.execute("SELECT MIN(ts_epoch_ms), MAX(ts_epoch_ms) FROM checks WHERE vantage = ?",
+                (LOCAL_VANTAGE,))
     min_ts, max_ts = cur.fetchone()
     
     if not min_ts or not max_ts:
         print("❌ No data available")
         return False
     
-    first_check = datetime.fromtimestamp(min_ts)
-    last_check = datetime.fromtimestamp(max_ts)
+    first_check = from_epoch_ms(min_ts)
+    last_check = from_epoch_ms(max_ts)
     duration = last_check - first_check
     
     days_collected = duration.days + (duration.seconds / 86400)
@@ -256,12 +293,13 @@ def generate_full_report():
     """Generate complete monitoring report"""
     print("\n" + "=" * 80)
     print("TRUTH LEDGER - 7-DAY MONITORING DASHBOARD")
-    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
     print("=" * 80)
     
     check_service_status()
     get_data_summary()
     get_api_breakdown()
+    get_consensus_breakdown()
     get_recent_issues()
     chain_valid = verify_chain_integrity()
     ready = check_7day_readiness()
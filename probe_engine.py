@@ -0,0 +1,80 @@
+"""
+Probe Engine Module
+Runs API probes concurrently with global and per-host limits
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from api_sources import get_api_config
+
+
+# Returned in place of a result for probes skipped by a cycle deadline
+DEFERRED = object()
+
+
+class AsyncProbeEngine:
+    """
+    Concurrent probe scheduler built on asyncio
+    Blocking probe functions run on a worker pool while asyncio
+    semaphores bound how many are in flight overall and per host
+    """
+    
+    def __init__(self, probe: Callable[[str], Optional[Dict]],
+                 max_concurrency: int = 64, per_host_concurrency: int = 4):
+        if max_concurrency < 1 or per_host_concurrency < 1:
+            raise ValueError("Concurrency limits must be at least 1")
+        
+        self.probe = probe
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="probe"
+        )
+    
+    @staticmethod
+    def host_for(api_name: str) -> str:
+        """Host an API's probes are sent to (used for per-host limits)"""
+        endpoint = (get_api_config(api_name) or {}).get("endpoint", "")
+        return urlsplit(endpoint).hostname or api_name
+    
+    async def probe_all(self, api_names: List[str],
+                        deadline: Optional[float] = None) -> List[Optional[Dict]]:
+        """
+        Probe every API concurrently
+        Returns results in the same order as api_names
+        Probes still queued at deadline (time.monotonic) are not started
+        and come back as DEFERRED
+        """
+        loop = asyncio.get_running_loop()
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        
+        async def probe_one(api_name: str) -> Optional[Dict]:
+            host = self.host_for(api_name)
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+            
+            # Take the host slot first so a busy host never holds global slots
+            async with host_limits[host]:
+                async with global_limit:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return DEFERRED
+                    return await loop.run_in_executor(
+                        self._executor, self.probe, api_name
+                    )
+        
+        return await asyncio.gather(*(probe_one(name) for name in api_names))
+    
+    def run(self, api_names: List[str],
+            deadline: Optional[float] = None) -> List[Optional[Dict]]:
+        """Blocking wrapper around probe_all"""
+        return asyncio.run(self.probe_all(api_names, deadline))
+    
+    def close(self):
+        """Shut down the worker pool"""
+        self._executor.shutdown(wait=True)
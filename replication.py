@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+"""
+Ledger Replication - Log Shipping to Follower Ledgers
+Streams a primary ledger's appended checks, with their hashes, to
+follower ledgers in other regions
+
+The shipper reads the primary through a read-only connection, one
+snapshot per poll, and turns what was appended since its cursor into
+NDJSON frames:
+    hello      storage mode, genesis and chain/Merkle anchors
+    rows       new checks, compact heads whose run grew in place, the
+               rollup buckets they touched, new discrepancies and
+               Merkle batches
+    heartbeat  the primary's last check id while nothing is appended
+
+A follower applies each rows frame in one transaction, inserting rows
+with the primary's ids and hashes. Every row is re-hashed and must link
+to the follower's own chain head, so a gap, a reordering or an edited
+row stops replication instead of forking the ledger. Applying a frame
+twice is a no-op, so transports may replay from any earlier point.
+
+Transports are pluggable:
+    path              append-only log file the follower tails
+    -                 stdout to stdin, e.g. over `ssh primary ... |`
+    tcp://host:port   the shipper listens; each follower connects and
+                      subscribes from its own position
+
+Lag is recorded in the follower's replication_status metadata: rows
+behind the primary's last check id, and milliseconds between the
+shipper reading a frame and the follower committing it (across hosts
+this includes any clock skew).
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from database import (
+    CHAIN_ANCHOR_PREFIX, CHAIN_COLUMNS, LOCAL_VANTAGE, MERKLE_ANCHOR_KEY, ROLLUP_TABLES,
+    ChainVerifier, TruthLedgerDB, chain_key, chain_link, iso_to_epoch_ms, utc_now_ms
+)
+from ledger_backup import head_rows
+
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+
+# Tables shipped by id alongside the checks
+APPEND_TABLES = ("discrepancies", "merkle_batches")
+
+# Fields a re-shipped head must keep; only its run_* columns may change
+_FIXED_FIELDS = ("timestamp", "api_name", "endpoint", "status", "response_time_ms",
+                 "status_code", "source", "check_hash", "previous_hash", "hash_version",
+                 "vantage")
+
+
+class ReplicationError(ValueError):
+    """A frame that would break the follower's chains"""
+
+
+def empty_cursor() -> Dict:
+    """Position before the first row of a ledger"""
+    return {"checks": 0, "discrepancies": 0, "merkle_batches": 0, "heads": {}}
+
+
+def _insert(conn: sqlite3.Connection, table: str, rows: List[Dict], verb: str = "INSERT"):
+    """Insert rows that share one set of columns (as SELECT * gave them)"""
+    if not rows:
+        return
+    columns = list(rows[0])
+    conn.executemany(
+        f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [[row[column] for column in columns] for row in rows]
+    )
+
+
+class LogShipper:
+    """
+    Reads what a primary ledger appended after a cursor, as frames
+    The cursor records the last shipped id per table and each chain's
+    last shipped head (id, run_count, run_last_seen), which is how runs
+    that grew in place on a compact primary are noticed
+    """
+    
+    def __init__(self, db_path: str, cursor: Optional[Dict] = None,
+                 batch_size: int = 1000):
+        self.db = TruthLedgerDB(db_path, read_only=True)
+        self.cursor = cursor or empty_cursor()
+        self.batch_size = batch_size
+    
+    def hello(self) -> Dict:
+        """First frame of every stream"""
+        return {
+            "type": "hello",
+            "version": PROTOCOL_VERSION,
+            "genesis": self.db.get_metadata("genesis_timestamp"),
+            "compact": self.db.is_compact_ledger(),
+            "chain_anchors": self.db.get_chain_anchors(),
+            "merkle_anchor": list(self.db.get_merkle_anchor())
+        }
+    
+    def poll(self) -> Dict:
+        """
+        Next rows frame from one snapshot of the primary, or a heartbeat
+        if nothing changed. "more" is set while a backlog remains.
+        """
+        conn = self.db.conn
+        cursor = self.cursor
+        conn.execute("BEGIN")
+        try:
+            read_at_ms = utc_now_ms()
+            primary_last_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM checks"
+            ).fetchone()[0]
+            
+            # Only a head row is ever updated (a compact run growing)
+            shipped = {head["id"]: head for head in cursor["heads"].values()}
+            regrown = []
+            if shipped:
+                regrown = [
+                    dict(row) for row in conn.execute(f"""
+                        SELECT * FROM checks WHERE id IN ({",".join("?" * len(shipped))})
+                        ORDER BY id
+                    """, list(shipped))
+                    if row["run_count"] != shipped[row["id"]]["run_count"]
+                ]
+            rows = [dict(row) for row in conn.execute("""
+                SELECT * FROM checks WHERE id > ? ORDER BY id LIMIT ?
+            """, (cursor["checks"], self.batch_size))]
+            
+            last_check_id = rows[-1]["id"] if rows else cursor["checks"]
+            appended = {
+                "discrepancies": [dict(row) for row in conn.execute("""
+                    SELECT * FROM discrepancies WHERE id > ? ORDER BY id LIMIT ?
+                """, (cursor["discrepancies"], self.batch_size))],
+                # A batch goes out once every check it covers has
+                "merkle_batches": [dict(row) for row in conn.execute("""
+                    SELECT * FROM merkle_batches
+                    WHERE id > ? AND last_check_id <= ? ORDER BY id
+                """, (cursor["merkle_batches"], last_check_id))]
+            }
+            
+            # Rollup buckets from the earliest probe each API shipped on;
+            # they are the primary's as of this snapshot
+            since: Dict[str, int] = {}
+            for row in regrown:
+                head = shipped[row["id"]]
+                probe_ms = iso_to_epoch_ms(head["run_last_seen"] or row["timestamp"])
+                since[row["api_name"]] = min(since.get(row["api_name"], probe_ms), probe_ms)
+            for row in rows:
+                probe_ms = row["ts_epoch_ms"]
+                since[row["api_name"]] = min(since.get(row["api_name"], probe_ms), probe_ms)
+            rollups = {}
+            for table, width in ROLLUP_TABLES:
+                rollups[table] = [
+                    dict(row)
+                    for api_name, probe_ms in since.items()
+                    for row in conn.execute(f"""
+                        SELECT * FROM {table} WHERE api_name = ? AND bucket_start_ms >= ?
+                    """, (api_name, probe_ms - probe_ms % width))
+                ]
+        finally:
+            conn.commit()
+        
+        if not regrown and not rows and not any(appended.values()):
+            return {"type": "heartbeat", "primary_last_id": primary_last_id,
+                    "read_at_ms": read_at_ms}
+        
+        for row in regrown + rows:
+            cursor["heads"][chain_key(row["api_name"], row["vantage"])] = {
+                "id": row["id"], "run_count": row["run_count"],
+                "run_last_seen": row["run_last_seen"]
+            }
+        cursor["checks"] = last_check_id
+        for table, table_rows in appended.items():
+            if table_rows:
+                cursor[table] = table_rows[-1]["id"]
+        
+        return dict(appended, **{
+            "type": "rows",
+            "checks": regrown + rows,
+            "rollups": rollups,
+            "primary_last_id": primary_last_id,
+            "read_at_ms": read_at_ms,
+            "more": (len(rows) == self.batch_size or
+                     len(appended["discrepancies"]) == self.batch_size)
+        })
+    
+    def close(self):
+        self.db.close()
+
+
+class Follower:
+    """A ledger that applies frames shipped from a primary"""
+    
+    def __init__(self, db_path: str):
+        self.db = TruthLedgerDB(db_path)
+        self.frames = 0
+        self.rows_applied = 0
+    
+    def cursor(self) -> Dict:
+        """Where a shipper should resume for this follower"""
+        conn = self.db.conn
+        cursor = {
+            table: conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+            for table in ("checks",) + APPEND_TABLES
+        }
+        cursor["heads"] = {
+            chain_key(row["api_name"], row["vantage"]): {
+                "id": row["id"], "run_count": row["run_count"],
+                "run_last_seen": row["run_last_seen"]
+            }
+            for row in conn.execute("""
+                SELECT id, api_name, vantage, run_count, run_last_seen FROM checks
+                WHERE id IN (SELECT MAX(id) FROM checks GROUP BY api_name, vantage)
+            """)
+        }
+        return cursor
+    
+    def apply(self, frame: Dict, position: Optional[int] = None) -> Dict:
+        """
+        Apply one frame and record the follower's lag
+        position is the transport's offset after this frame, saved so a
+        file follower resumes there. Raises ReplicationError (leaving
+        the follower as it was) if the frame does not continue its chains
+        """
+        kind = frame.get("type")
+        if kind == "hello":
+            self._hello(frame)
+            return self.db.get_replication_status() or {}
+        if kind not in ("rows", "heartbeat"):
+            raise ReplicationError(f"Unknown frame type: {kind}")
+        
+        conn = self.db.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            applied = self._apply_rows(frame) if kind == "rows" else 0
+            applied_last_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM checks"
+            ).fetchone()[0]
+        except BaseException:
+            conn.rollback()
+            raise
+        
+        status = {
+            "primary_last_id": frame["primary_last_id"],
+            "applied_last_id": applied_last_id,
+            "lag_rows": max(0, frame["primary_last_id"] - applied_last_id),
+            "lag_ms": max(0, utc_now_ms() - frame["read_at_ms"]),
+            "last_frame_at": datetime.utcnow().isoformat(),
+            "frames": self.frames + 1,
+            "rows_applied": self.rows_applied + applied
+        }
+        if position is not None:
+            status["log_offset"] = position
+        
+        # Commits the frame together with the status that records it
+        self.db.record_replication(status)
+        self.frames += 1
+        self.rows_applied += applied
+        if applied:
+            self.db.reload_chain_heads()
+        return status
+    
+    def _hello(self, frame: Dict):
+        if frame.get("version") != PROTOCOL_VERSION:
+            raise ReplicationError(f"Unsupported replication protocol: {frame.get('version')}")
+        
+        genesis = frame["genesis"] or ""
+        replica_of = self.db.get_metadata("replica_of")
+        if replica_of is not None and replica_of != genesis:
+            raise ReplicationError("Follower already replicates a different primary")
+        meta = {"replica_of": genesis}
+        
+        # Mark the mode so local tools read the follower like its primary
+        if frame["compact"]:
+            meta["storage_mode"] = "compact"
+        
+        # A fresh follower of a carved primary starts where its live file does
+        conn = self.db.conn
+        if conn.execute("SELECT 1 FROM checks LIMIT 1").fetchone() is None:
+            meta.update({
+                CHAIN_ANCHOR_PREFIX + key: anchor
+                for key, anchor in frame["chain_anchors"].items()
+            })
+            last_check_id, root_hash = frame["merkle_anchor"]
+            if root_hash:
+                meta[MERKLE_ANCHOR_KEY] = json.dumps(
+                    {"last_check_id": last_check_id, "root_hash": root_hash}
+                )
+        
+        now = datetime.utcnow().isoformat()
+        with conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO metadata (key, value, updated_at) VALUES (?, ?, ?)
+            """, [(key, value, now) for key, value in meta.items()])
+    
+    def _apply_rows(self, frame: Dict) -> int:
+        """Apply a rows frame inside the caller's transaction"""
+        conn = self.db.conn
+        heads = head_rows(conn)
+        anchors = self.db.get_chain_anchors()
+        local_last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM checks").fetchone()[0]
+        verifiers: Dict[str, ChainVerifier] = {}
+        new_rows = []
+        probes = 0
+        regrown = 0
+        
+        for row in frame["checks"]:
+            # Primaries that predate vantages only ship their own probes
+            row.setdefault("vantage", LOCAL_VANTAGE)
+            key = chain_key(row["api_name"], row["vantage"])
+            existing = None
+            if row["id"] <= local_last_id:
+                existing = conn.execute(
+                    f"SELECT {CHAIN_COLUMNS} FROM checks WHERE id = ?", (row["id"],)
+                ).fetchone()
+            if existing is not None:
+                grown = self._regrow(existing, row, heads.get(key))
+                if grown:
+                    heads[key] = {"id": row["id"], "link": chain_link(row)}
+                    verifiers.pop(key, None)
+                    probes += grown
+                    regrown += 1
+                continue
+            
+            verifier = verifiers.get(key)
+            if verifier is None:
+                head = heads.get(key)
+                verifier = verifiers[key] = ChainVerifier(
+                    head["link"] if head else anchors.get(key, "")
+                )
+            verifier.feed(row)
+            if verifier.errors:
+                raise ReplicationError(f"{key}: {verifier.errors[0]}")
+            heads[key] = {"id": row["id"], "link": verifier.previous_hash}
+            new_rows.append(row)
+            probes += row["run_count"]
+        _insert(conn, "checks", new_rows)
+        
+        # A replayed frame's buckets are older than the follower's own
+        applied = len(new_rows) + regrown
+        if applied:
+            for table, _ in ROLLUP_TABLES:
+                _insert(conn, table, frame["rollups"][table], "INSERT OR REPLACE")
+        _insert(conn, "discrepancies", frame["discrepancies"], "INSERT OR IGNORE")
+        for batch in frame["merkle_batches"]:
+            if conn.execute("SELECT 1 FROM merkle_batches WHERE id = ?",
+                            (batch["id"],)).fetchone():
+                continue
+            _insert(conn, "merkle_batches", [batch])
+            is_valid, errors = self.db.verify_merkle_batch(batch["id"])
+            if not is_valid:
+                raise ReplicationError(errors[0])
+        
+        conn.execute("""
+            UPDATE metadata
+            SET value = CAST(value AS INTEGER) + ?, updated_at = ?
+            WHERE key = 'total_checks'
+        """, (probes, datetime.utcnow().isoformat()))
+        return applied
+    
+    def _regrow(self, existing: sqlite3.Row, row: Dict, head: Optional[Dict]) -> int:
+        """
+        Apply a re-shipped row the follower already holds; returns how
+        many probes its run gained (0 for a replayed or older copy)
+        """
+        if any(existing[field] != row[field] for field in _FIXED_FIELDS):
+            raise ReplicationError(f"Check {row['id']}: follower holds a different row")
+        grown = row["run_count"] - existing["run_count"]
+        if grown <= 0:
+            return 0
+        if head is None or head["id"] != row["id"]:
+            raise ReplicationError(f"Check {row['id']}: only a chain head's run can grow")
+        self.db.conn.execute("""
+            UPDATE checks
+            SET run_count = ?, run_last_seen = ?, run_latency_sum = ?, run_digest = ?
+            WHERE id = ?
+        """, (row["run_count"], row["run_last_seen"], row["run_latency_sum"],
+              row["run_digest"], row["id"]))
+        return grown
+    
+    def close(self):
+        self.db.close()
+
+
+class StreamTransport:
+    """NDJSON frames over a pair of byte streams (pipes, sockets)"""
+    
+    def __init__(self, reader: Optional[BinaryIO] = None,
+                 writer: Optional[BinaryIO] = None):
+        self.reader = reader
+        self.writer = writer
+        self.position: Optional[int] = None
+    
+    def send(self, frame: Dict):
+        self.writer.write(json.dumps(frame, separators=(",", ":")).encode() + b"\n")
+        self.writer.flush()
+    
+    def frames(self) -> Iterator[Dict]:
+        """Frames until the other end closes"""
+        for line in self.reader:
+            if line.strip():
+                yield json.loads(line)
+    
+    def close(self):
+        for stream in (self.reader, self.writer):
+            if stream is not None and stream not in (sys.stdin.buffer, sys.stdout.buffer):
+                stream.close()
+
+
+class FileTransport:
+    """
+    Append-only NDJSON log file: the shipper appends (and fsyncs) every
+    frame, followers tail it from a byte offset
+    """
+    
+    def __init__(self, path: str, position: int = 0, poll: float = 0.5,
+                 follow: bool = True):
+        self.path = path
+        self.position = position
+        self.poll = poll
+        self.follow = follow
+        self._log: Optional[BinaryIO] = None
+    
+    def send(self, frame: Dict):
+        if self._log is None:
+            self._log = open(self.path, "ab")
+        self._log.write(json.dumps(frame, separators=(",", ":")).encode() + b"\n")
+        self._log.flush()
+        os.fsync(self._log.fileno())
+    
+    def frames(self) -> Iterator[Dict]:
+        """
+        Frames from position on; waits for more at the end of the log
+        unless follow is off. position moves past each frame as it is
+        handed out, so it is the offset to resume from once applied.
+        """
+        while not os.path.exists(self.path):
+            if not self.follow:
+                return
+            time.sleep(self.poll)
+        with open(self.path, "rb") as log:
+            if os.path.getsize(self.path) < self.position:
+                self.position = 0
+            log.seek(self.position)
+            while True:
+                line = log.readline()
+                if line.endswith(b"\n"):
+                    self.position += len(line)
+                    if line.strip():
+                        yield json.loads(line)
+                    continue
+                
+                # End of the log, or a frame still being written
+                if not self.follow:
+                    return
+                log.seek(self.position)
+                time.sleep(self.poll)
+    
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def _save_cursor(path: Optional[str], cursor: Dict):
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cursor, f)
+    os.replace(tmp_path, path)
+
+
+def ship(shipper: LogShipper, transport, interval: float = 1.0,
+         heartbeat: float = 10.0, once: bool = False,
+         state_path: Optional[str] = None):
+    """
+    Send frames until the transport breaks, polling the primary every
+    interval seconds once caught up and sending a heartbeat at least
+    every heartbeat seconds. once returns as soon as it is caught up.
+    state_path keeps the shipper's cursor across restarts.
+    """
+    transport.send(shipper.hello())
+    last_sent = time.monotonic()
+    while True:
+        frame = shipper.poll()
+        if frame["type"] == "rows":
+            transport.send(frame)
+            last_sent = time.monotonic()
+            _save_cursor(state_path, shipper.cursor)
+            if frame["more"]:
+                continue
+        elif time.monotonic() - last_sent >= heartbeat or once:
+            transport.send(frame)
+            last_sent = time.monotonic()
+        if once:
+            return
+        time.sleep(interval)
+
+
+def follow(follower: Follower, transport, progress=None):
+    """Apply frames until the transport ends; progress gets each status"""
+    for frame in transport.frames():
+        status = follower.apply(frame, transport.position)
+        if progress and frame["type"] != "hello":
+            progress(status)
+
+
+def serve(db_path: str, host: str, port: int, interval: float = 1.0,
+          heartbeat: float = 10.0, batch_size: int = 1000):
+    """
+    Ship the primary to every follower that connects, each from the
+    cursor it subscribes with
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            transport = StreamTransport(self.rfile, self.wfile)
+            subscribe = next(transport.frames(), None)
+            if not subscribe or subscribe.get("type") != "subscribe":
+                return
+            logger.info(f"Follower {self.client_address[0]} subscribed "
+                        f"after check {subscribe['cursor']['checks']}")
+            shipper = LogShipper(db_path, subscribe["cursor"], batch_size)
+            try:
+                ship(shipper, transport, interval, heartbeat)
+            except (BrokenPipeError, ConnectionResetError):
+                logger.info(f"Follower {self.client_address[0]} disconnected")
+            finally:
+                shipper.close()
+    
+    class Server(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+    
+    with Server((host, port), Handler) as server:
+        server.serve_forever()
+
+
+def subscribe(follower: Follower, host: str, port: int) -> StreamTransport:
+    """Connect to a serving shipper and ask for frames after the follower's cursor"""
+    sock = socket.create_connection((host, port))
+    transport = StreamTransport(sock.makefile("rb"), sock.makefile("wb"))
+    transport.send({"type": "subscribe", "cursor": follower.cursor()})
+    return transport
+
+
+def _address(target: str):
+    host, _, port = target[len("tcp://"):].rpartition(":")
+    return host or "0.0.0.0", int(port)
+
+
+def print_status(status: Dict):
+    """Default follower progress line"""
+    print(f"   applied through check {status['applied_last_id']:,} "
+          f"(primary {status['primary_last_id']:,}), lag {status['lag_rows']:,} rows "
+          f"/ {status['lag_ms'] / 1000:.2f}s", end="\r", flush=True)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Truth Ledger Replication')
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='truth_ledger.db',
+        help='Ledger path: the primary with --ship, the follower with --follow'
+    )
+    parser.add_argument(
+        '--ship',
+        type=str,
+        default=None,
+        help='Ship to a log file, - (stdout) or tcp://host:port (listen)'
+    )
+    parser.add_argument(
+        '--follow',
+        type=str,
+        default=None,
+        help='Follow a log file, - (stdin) or tcp://host:port (connect)'
+    )
+    parser.add_argument(
+        '--state',
+        type=str,
+        default=None,
+        help='Shipper cursor file for log/stdout targets (default: <log>.state)'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=1.0,
+        help='Seconds between polls of the primary once caught up (default: 1)'
+    )
+    parser.add_argument(
+        '--heartbeat',
+        type=float,
+        default=10.0,
+        help='Seconds between heartbeats while idle (default: 10)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1000,
+        help='Checks per frame (default: 1000)'
+    )
+    parser.add_argument(
+        '--once',
+        action='store_true',
+        help='Stop once caught up (shipper) or at the end of the log (follower)'
+    )
+    parser.add_argument(
+        '--status',
+        action='store_true',
+        help="Print the follower's replication status"
+    )
+    
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    
+    if args.status:
+        with TruthLedgerDB(args.db, read_only=True) as db:
+            status = db.get_replication_status()
+        if status is None:
+            print(f"{args.db} is not a follower")
+            return
+        print(f"Follower {args.db}")
+        print(f"   Applied through check: {status['applied_last_id']:,}")
+        print(f"   Primary last check:    {status['primary_last_id']:,}")
+        print(f"   Lag:                   {status['lag_rows']:,} rows, "
+              f"{status['lag_ms'] / 1000:.2f}s")
+        print(f"   Last frame:            {status['last_frame_at']}")
+        return
+    
+    if args.ship:
+        if args.ship.startswith("tcp://"):
+            host, port = _address(args.ship)
+            logger.info(f"Shipping {args.db} on {host}:{port}")
+            serve(args.db, host, port, args.interval, args.heartbeat, args.batch_size)
+            return
+        
+        if args.ship == "-":
+            transport = StreamTransport(writer=sys.stdout.buffer)
+            state_path = args.state
+        else:
+            transport = FileTransport(args.ship)
+            state_path = args.state or f"{args.ship}.state"
+        cursor = None
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as f:
+                cursor = json.load(f)
+        shipper = LogShipper(args.db, cursor, args.batch_size)
+        try:
+            ship(shipper, transport, args.interval, args.heartbeat, args.once, state_path)
+        except BrokenPipeError:
+            pass
+        finally:
+            shipper.close()
+            transport.close()
+        return
+    
+    if not args.follow:
+        parser.error("one of --ship, --follow or --status is required")
+    
+    follower = Follower(args.db)
+    if args.follow.startswith("tcp://"):
+        transport = subscribe(follower, *_address(args.follow))
+    elif args.follow == "-":
+        transport = StreamTransport(reader=sys.stdin.buffer)
+    else:
+        status = follower.db.get_replication_status() or {}
+        transport = FileTransport(
+            args.follow, position=status.get("log_offset", 0), follow=not args.once
+        )
+    try:
+        follow(follower, transport, print_status)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        transport.close()
+        follower.close()
+    print()
+
+
+if __name__ == "__main__":
+    main()
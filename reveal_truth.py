@@ -4,15 +4,18 @@ Reveal Truth - Discrepancy Detection Script
 Compares official status claims vs our measured reality
 """
 
-import requests
-from bs4 import BeautifulSoup
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 import logging
 import sys
 
-from database import TruthLedgerDB
-from api_sources import get_api_config, get_all_apis
+from database import HOUR_MS, TruthLedgerDB, utc_now_ms
+from latency_histogram import PERCENTILES, percentile_label
+from api_sources import API_SOURCES
+from ledger_segments import SegmentStore
+from status_sources import StatusReader
+from streaming_detector import STATUS_FLOOR, UPTIME_TOLERANCE, severity_for
 
 
 logging.basicConfig(
@@ -22,104 +25,114 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Most recent checks cited as proof with each discrepancy
+PROOF_CHECKS = 10
+
 
 class DiscrepancyDetector:
     """Detects discrepancies between claimed and actual API status"""
     
-    def __init__(self, db_path: str = "truth_ledger.db"):
+    def __init__(self, db_path: str = "truth_ledger.db",
+                 status_cache: Optional[str] = None, max_stale: float = 0,
+                 workers: int = 16, sources: Optional[Dict[str, Dict]] = None,
+                 status_archive: Optional[str] = None,
+                 segments_dir: Optional[str] = None):
+        # Writes (sealing, discrepancies) use self.db; the measurement
+        # queries go through a query_only connection so they never hold
+        # up the monitor's writer
         self.db = TruthLedgerDB(db_path)
-        self.session = requests.Session()
+        self.reader = TruthLedgerDB(db_path, read_only=True)
+        # Months the monitor carved into segments are read back through
+        # the segment store when a window reaches them
+        self.segments = SegmentStore(segments_dir, db_path) if segments_dir else None
+        # Status pages are fetched conditionally against a validator cache
+        # kept between runs, so unchanged pages are neither downloaded
+        # nor parsed again. Pages that are downloaded go into the snapshot
+        # archive, and discrepancies cite the snapshots they were judged on
+        self.status_reader = StatusReader(cache_path=status_cache, max_stale=max_stale,
+                                          archive_path=status_archive)
+        # Status pages fetched at once during a sweep
+        self.workers = workers
+        self.sources = API_SOURCES if sources is None else sources
     
-    def scrape_official_status(self, api_name: str) -> Optional[Dict]:
+    def fetch_official_status(self, api_name: str, hours: int = 24) -> Optional[Dict]:
         """
-        Scrape official status page
-        Returns claimed uptime and status
+        What the API's official status page claims
+        Returns claimed status and uptime, per component where the page has them
         """
-        config = get_api_config(api_name)
-        verification_sources = config.get("verification_sources", [])
-        
-        if not verification_sources:
+        config = self.sources.get(api_name, {})
+        if not config.get("verification_sources"):
             logger.info(f"No verification sources for {api_name}")
             return None
-        
-        # Use first official source
-        for source in verification_sources:
-            if source["type"] == "official_status":
-                try:
-                    response = self.session.get(source["url"], timeout=10)
-                    if response.status_code != 200:
-                        continue
-                    
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Look for common status indicators
-                    # Most status pages use "operational", "up", "all systems operational"
-                    text = soup.get_text().lower()
-                    
-                    if "operational" in text or "all systems" in text:
-                        claimed_status = "up"
-                    elif "outage" in text or "down" in text:
-                        claimed_status = "down"
-                    elif "degraded" in text or "issues" in text:
-                        claimed_status = "degraded"
-                    else:
-                        claimed_status = "unknown"
-                    
-                    # Try to find uptime percentage if present
-                    claimed_uptime = self._extract_uptime(text)
-                    
-                    return {
-                        "claimed_status": claimed_status,
-                        "claimed_uptime": claimed_uptime,
-                        "source_url": source["url"]
-                    }
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to scrape {source['url']}: {e}")
-                    continue
-        
-        return None
+        return self.status_reader.official_status(config, hours=hours)
     
-    def _extract_uptime(self, text: str) -> Optional[float]:
-        """Extract uptime percentage from text"""
-        import re
-        
-        # Look for patterns like "99.9%", "99.95% uptime"
-        patterns = [
-            r'(\d+\.\d+)%\s*uptime',
-            r'uptime.*?(\d+\.\d+)%',
-            r'(\d+\.\d+)%.*?availability'
-        ]
+    @contextmanager
+    def measurement_reader(self, hours: int = 24,
+                           baseline_factor: int = 7) -> Iterator[TruthLedgerDB]:
+        """
+        Reader covering the last hours and the latency baseline before it
+        The live file alone when that span is all there, otherwise a
+        window over the live file and the closed segments it reaches
+        """
+        start_ms = utc_now_ms() - hours * (baseline_factor + 1) * HOUR_MS
+        if self.segments and self.segments.overlapping(start_ms):
+            with self.segments.window(start_ms) as reader:
+                yield reader
+        else:
+            yield self.reader
+    
+    def compare_tail_latency(self, api_name: str, hours: int = 24,
+                             baseline_factor: int = 7,
+                             reader: Optional[TruthLedgerDB] = None) -> Dict:
+        """
+        Tail latency for the window next to the preceding baseline
+        The baseline covers the baseline_factor windows before this one,
+        so a p99 regression shows up even while the mean looks normal
+        """
+        reader = reader or self.reader
+        now_ms = utc_now_ms()
+        window = reader.get_latency_percentiles(api_name, hours=hours, end_ms=now_ms)
+        baseline = reader.get_latency_percentiles(
+            api_name, hours=hours * baseline_factor, end_ms=now_ms - hours * HOUR_MS
+        )
         
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    return float(match.group(1))
-                except:
-                    pass
+        changes = {}
+        for q in PERCENTILES:
+            label = percentile_label(q)
+            if window[label] is not None and baseline[label]:
+                changes[label] = round((window[label] / baseline[label] - 1) * 100, 1)
         
-        return None
+        return {"window": window, "baseline": baseline, "change_percent": changes}
     
     def compare_status(self, api_name: str, hours: int = 24) -> Optional[Dict]:
         """
         Compare official claimed status vs our measurements
         Returns discrepancy data if variance > 2%
         """
-        # Get our measured uptime
-        measured = self.db.get_api_uptime(api_name, hours=hours)
-        
-        if measured['total_checks'] == 0:
-            logger.info(f"No data for {api_name}")
-            return None
-        
-        # Get official claimed status
-        official = self.scrape_official_status(api_name)
-        
-        if not official:
-            logger.info(f"Could not get official status for {api_name}")
-            return None
-        
+        with self.measurement_reader(hours) as reader:
+            # Get our measured uptime
+            measured = reader.get_api_uptime(api_name, hours=hours)
+            
+            if measured['total_checks'] == 0:
+                logger.info(f"No data for {api_name}")
+                return None
+            
+            # Get official claimed status
+            official = self.fetch_official_status(api_name, hours=hours)
+            
+            if not official:
+                logger.info(f"Could not get official status for {api_name}")
+                return None
+            
+            return self._compare(api_name, measured, official, hours, reader)
+    
+    def _compare(self, api_name: str, measured: Dict, official: Dict,
+                 hours: int, reader: Optional[TruthLedgerDB] = None) -> Optional[Dict]:
+        """
+        A discrepancy between our measurements and an official claim, if any
+        Tail latency is read only once a discrepancy is found and travels
+        with it as supporting evidence
+        """
         # Compare
         measured_uptime = measured['uptime']
         claimed_uptime = official.get('claimed_uptime')
@@ -130,7 +143,7 @@ class DiscrepancyDetector:
             claimed_status = official['claimed_status']
             
             # If they claim "up" but we measure < 95%, that's a discrepancy
-            if claimed_status == "up" and measured_uptime < 95.0:
+            if claimed_status == "up" and measured_uptime < STATUS_FLOOR:
                 variance = 100.0 - measured_uptime
                 severity = self._calculate_severity(variance)
                 
@@ -143,13 +156,17 @@ class DiscrepancyDetector:
                     "variance_percent": variance,
                     "severity": severity,
                     "evidence_url": official['source_url'],
-                    "checks_count": measured['total_checks']
+                    "checks_count": measured['total_checks'],
+                    "latency_percentiles": self.compare_tail_latency(
+                        api_name, hours=hours, reader=reader),
+                    "claimed_components": official['components'],
+                    "snapshot_hashes": official.get('snapshots', [])
                 }
         else:
             # Percentage comparison
             variance = abs(claimed_uptime - measured_uptime)
             
-            if variance > 2.0:  # More than 2% difference
+            if variance > UPTIME_TOLERANCE:  # More than 2% difference
                 severity = self._calculate_severity(variance)
                 
                 return {
@@ -161,55 +178,97 @@ class DiscrepancyDetector:
                     "variance_percent": variance,
                     "severity": severity,
                     "evidence_url": official['source_url'],
-                    "checks_count": measured['total_checks']
+                    "checks_count": measured['total_checks'],
+                    "latency_percentiles": self.compare_tail_latency(
+                        api_name, hours=hours, reader=reader),
+                    "claimed_components": official['components'],
+                    "snapshot_hashes": official.get('snapshots', [])
                 }
         
         return None
     
     def _calculate_severity(self, variance: float) -> str:
         """Calculate severity based on variance"""
-        if variance >= 10.0:
-            return "critical"
-        elif variance >= 5.0:
-            return "high"
-        elif variance >= 2.0:
-            return "medium"
-        else:
-            return "low"
+        return severity_for(variance)
     
-    def detect_all_discrepancies(self, hours: int = 24) -> List[Dict]:
-        """Check all APIs for discrepancies"""
-        apis = get_all_apis()
-        discrepancies = []
+    def detect_all_discrepancies(self, hours: int = 24,
+                                 apis: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Check APIs (default: all configured) for discrepancies
+        Measured uptimes come from grouped queries over every API at once;
+        status pages are fetched concurrently (up to self.workers, each
+        URL once) and each API is compared as soon as its claim arrives.
+        """
+        apis = list(self.sources if apis is None else apis)
         
         logger.info(f"Checking {len(apis)} APIs for discrepancies...")
         
-        for api_name in apis:
-            logger.info(f"Checking {api_name}...")
-            discrepancy = self.compare_status(api_name, hours=hours)
+        # Seal everything pending so every proof hash gets an inclusion proof
+        self.db.seal_merkle_batches(max_age_seconds=0)
+        
+        with self.measurement_reader(hours) as reader:
+            measured = reader.get_api_uptimes(apis, hours=hours)
+            configs = {}
+            for api_name in apis:
+                if measured[api_name]['total_checks'] == 0:
+                    logger.info(f"No data for {api_name}")
+                elif not self.sources.get(api_name, {}).get("verification_sources"):
+                    logger.info(f"No verification sources for {api_name}")
+                else:
+                    configs[api_name] = self.sources[api_name]
             
-            if discrepancy:
-                # Get proof hashes
-                recent_checks = self.db.get_recent_checks(api_name, limit=100)
-                proof_hashes = [check['check_hash'] for check in recent_checks[:10]]
-                
-                discrepancy['proof_hashes'] = proof_hashes
-                discrepancy['timestamp'] = datetime.utcnow().isoformat()
-                
-                # Store in database
-                self.db.insert_discrepancy(discrepancy)
-                
-                discrepancies.append(discrepancy)
+            logger.info(f"Fetching official status for {len(configs)} APIs "
+                        f"({self.workers} at a time)...")
+            discrepancies = []
+            for api_name, official in self.status_reader.official_statuses(
+                    configs, hours=hours, workers=self.workers):
+                if not official:
+                    logger.info(f"Could not get official status for {api_name}")
+                    continue
                 
-                logger.warning(
-                    f"⚠ DISCREPANCY FOUND: {api_name} - "
-                    f"Claimed: {discrepancy['claimed_status']}, "
-                    f"Actual: {discrepancy['actual_status']}, "
-                    f"Variance: {discrepancy['variance_percent']:.2f}%"
-                )
+                discrepancy = self._compare(api_name, measured[api_name], official, hours, reader)
+                if discrepancy:
+                    discrepancies.append(discrepancy)
         
+        # Claims arrive in any order; report in configuration order
+        order = {api_name: index for index, api_name in enumerate(apis)}
+        discrepancies.sort(key=lambda discrepancy: order[discrepancy['api_name']])
+        self._record(discrepancies)
         return discrepancies
     
+    def _record(self, discrepancies: List[Dict]):
+        """Attach proof of the measurements and store discrepancies"""
+        proof_checks = {
+            discrepancy['api_name']: self.reader.get_recent_checks(
+                discrepancy['api_name'], limit=PROOF_CHECKS)
+            for discrepancy in discrepancies
+        }
+        
+        # O(log n) inclusion proofs against sealed Merkle batch roots; the
+        # APIs' recent checks share batches, so each tree is built once
+        proofs = self.reader.get_inclusion_proofs(
+            check['id'] for checks in proof_checks.values() for check in checks
+        )
+        
+        for discrepancy in discrepancies:
+            api_name = discrepancy['api_name']
+            checks = proof_checks[api_name]
+            discrepancy['proof_hashes'] = [check['check_hash'] for check in checks]
+            discrepancy['merkle_proofs'] = [
+                proofs[check['id']] for check in checks if check['id'] in proofs
+            ]
+            discrepancy['timestamp'] = datetime.utcnow().isoformat()
+            
+            # Store in database
+            self.db.insert_discrepancy(discrepancy)
+            
+            logger.warning(
+                f"⚠ DISCREPANCY FOUND: {api_name} - "
+                f"Claimed: {discrepancy['claimed_status']}, "
+                f"Actual: {discrepancy['actual_status']}, "
+                f"Variance: {discrepancy['variance_percent']:.2f}%"
+            )
+    
     def generate_report(self, discrepancies: List[Dict], output_file: str = "discrepancy_report.md"):
         """Generate markdown report of discrepancies"""
         if not discrepancies:
@@ -239,14 +298,72 @@ class DiscrepancyDetector:
             report.append(f"- **We Measured:** {disc['actual_status']}\n")
             report.append(f"- **Based On:** {disc['checks_count']} checks over 24 hours\n\n")
             
+            components = disc.get('claimed_components')
+            if components:
+                report.append("### Claimed Component Status\n")
+                # Anything not up first; a large page lists only those
+                ordered = sorted(components.items(), key=lambda item: (item[1] == "up", item[0]))
+                shown = [item for item in ordered if item[1] != "up"] or ordered
+                for name, status in shown[:20]:
+                    report.append(f"- {name}: {status}\n")
+                if len(components) > len(shown[:20]):
+                    report.append(f"- ({len(components) - len(shown[:20])} more components)\n")
+                report.append("\n")
+            
+            latency = disc.get('latency_percentiles')
+            if latency and latency['window']['samples']:
+                report.append("### Tail Latency\n")
+                report.append("| Percentile | Window | Baseline | Change |\n")
+                report.append("|---|---|---|---|\n")
+                for q in PERCENTILES:
+                    label = percentile_label(q)
+                    window_ms = latency['window'][label]
+                    baseline_ms = latency['baseline'][label]
+                    change = latency['change_percent'].get(label)
+                    report.append(
+                        f"| {label} | {window_ms:,.0f}ms | "
+                        f"{f'{baseline_ms:,.0f}ms' if baseline_ms is not None else 'N/A'} | "
+                        f"{f'{change:+.1f}%' if change is not None else 'N/A'} |\n"
+                    )
+                report.append("\n")
+            
             report.append("### Cryptographic Proof\n")
             report.append("Proof hashes (first 10 checks):\n")
             for i, hash_val in enumerate(disc['proof_hashes'][:10], 1):
                 report.append(f"{i}. `{hash_val}`\n")
             
+            merkle_roots = sorted({
+                (proof['batch_id'], proof['root_hash'])
+                for proof in disc.get('merkle_proofs', [])
+            })
+            if merkle_roots:
+                report.append("\nAnchored in Merkle batches (inclusion proofs stored with the discrepancy):\n")
+                for batch_id, root_hash in merkle_roots:
+                    report.append(f"- Batch {batch_id}: root `{root_hash}`\n")
+            
             report.append(f"\n**Evidence:** [{disc['evidence_url']}]({disc['evidence_url']})\n")
+            snapshots = disc.get('snapshot_hashes')
+            if snapshots:
+                report.append("\nArchived status documents (`status_archive.py --show HASH`):\n")
+                for snapshot in snapshots:
+                    report.append(f"- `{snapshot}`\n")
             report.append("\n---\n")
         
+        cache = self.status_reader.cache_stats()
+        report.append("\n## Status Page Fetches\n")
+        report.append(f"- **Cache hit rate:** {cache['hit_rate']:.1f}%\n")
+        report.append(f"- **Unchanged (304):** {cache['not_modified']}\n")
+        report.append(f"- **Reused without asking:** {cache['fresh']}\n")
+        report.append(f"- **Shared with another API's source:** {cache['shared']}\n")
+        report.append(f"- **Downloaded:** {cache['downloaded']} "
+                      f"({cache['bytes_downloaded'] / 1024:,.1f} KB)\n")
+        report.append(f"- **Failed:** {cache['failed']}\n")
+        archived = self.status_reader.archive_stats()
+        if archived:
+            report.append(f"- **Archived:** {archived['full'] + archived['delta']} new snapshots "
+                          f"({archived['delta']} as deltas, "
+                          f"{archived['bytes_stored'] / 1024:,.1f} KB stored)\n")
+        
         # Write report
         with open(output_file, 'w') as f:
             f.write(''.join(report))
@@ -258,17 +375,20 @@ class DiscrepancyDetector:
         print("DISCREPANCY REPORT SUMMARY")
         print("="*60)
         for disc in discrepancies:
+            p99 = disc.get('latency_percentiles', {}).get('window', {}).get('p99')
             print(
                 f"{disc['api_name']:20s} | "
                 f"Variance: {disc['variance_percent']:6.2f}% | "
-                f"Severity: {disc['severity']:8s}"
+                f"Severity: {disc['severity']:8s} | "
+                f"p99: {f'{p99:,.0f}ms' if p99 is not None else 'N/A'}"
             )
         print("="*60 + "\n")
     
     def close(self):
         """Close connections"""
+        self.reader.close()
         self.db.close()
-        self.session.close()
+        self.status_reader.close()
 
 
 def main():
@@ -299,19 +419,62 @@ def main():
         default='truth_ledger.db',
         help='Database path (default: truth_ledger.db)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=16,
+        help='Status pages fetched at once (default: 16)'
+    )
+    parser.add_argument(
+        '--status-cache',
+        type=str,
+        default='status_cache.json',
+        help='Validator cache for status pages (default: status_cache.json)'
+    )
+    parser.add_argument(
+        '--no-status-cache',
+        action='store_true',
+        help='Download every status page in full'
+    )
+    parser.add_argument(
+        '--archive',
+        type=str,
+        default='status_archive.db',
+        help='Snapshot archive for downloaded status pages (default: status_archive.db)'
+    )
+    parser.add_argument(
+        '--no-archive',
+        action='store_true',
+        help='Do not archive status pages'
+    )
+    parser.add_argument(
+        '--segments',
+        type=str,
+        default=None,
+        help='Segment directory the monitor carves finished months into (see --segments there)'
+    )
+    parser.add_argument(
+        '--max-stale',
+        type=float,
+        default=0,
+        help='Seconds a cached status page is reused without revalidating (default: 0)'
+    )
     
     args = parser.parse_args()
     
-    detector = DiscrepancyDetector(args.db)
+    detector = DiscrepancyDetector(
+        args.db,
+        status_cache=None if args.no_status_cache else args.status_cache,
+        max_stale=args.max_stale,
+        workers=args.workers,
+        status_archive=None if args.no_archive else args.archive,
+        segments_dir=args.segments
+    )
     
     try:
         if args.api:
-            logger.info(f"Checking {args.api}...")
-            discrepancy = detector.compare_status(args.api, hours=args.hours)
-            if discrepancy:
-                discrepancies = [discrepancy]
-            else:
-                discrepancies = []
+            discrepancies = detector.detect_all_discrepancies(hours=args.hours, apis=[args.api])
+            if not discrepancies:
                 logger.info(f"No discrepancy found for {args.api}")
         else:
             discrepancies = detector.detect_all_discrepancies(hours=args.hours)
@@ -320,6 +483,14 @@ def main():
             detector.generate_report(discrepancies, output_file=args.report)
         else:
             logger.info("✓ All APIs match their official status claims")
+        
+        cache = detector.status_reader.cache_stats()
+        logger.info(
+            f"Status pages: {cache['hit_rate']:.1f}% cache hits "
+            f"({cache['not_modified']} unchanged, {cache['fresh']} reused, "
+            f"{cache['shared']} shared, "
+            f"{cache['downloaded']} downloaded, {cache['bytes_downloaded'] / 1024:,.1f} KB)"
+        )
     
     finally:
         detector.close()
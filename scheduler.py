@@ -0,0 +1,162 @@
+"""
+Probe Scheduler Module
+Heap-based scheduler that checks each API on its own interval
+"""
+
+import heapq
+import logging
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeScheduler:
+    """
+    Schedules probes by next-due time
+    Each API sits in a min-heap keyed on when it is next due, so a tick
+    only touches the APIs that are actually due instead of the whole
+    catalogue. Supports per-API intervals, jitter, a catch-up policy
+    for stalls, and a per-cycle deadline.
+    """
+    
+    # run_once: an overdue API is probed once, then rescheduled from now
+    # skip: overdue slots are dropped and the API keeps its original phase
+    CATCH_UP_POLICIES = ("run_once", "skip")
+    
+    def __init__(self, run_batch: Callable[[List[str], Optional[float]], List[str]],
+                 intervals: Dict[str, float], jitter: float = 0.1,
+                 catch_up: str = "run_once", cycle_deadline: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        """
+        run_batch(api_names, deadline) checks the due APIs and returns
+        the names it deferred because the deadline passed
+        """
+        if catch_up not in self.CATCH_UP_POLICIES:
+            raise ValueError(
+                f"Unknown catch-up policy: {catch_up} "
+                f"(expected one of {', '.join(self.CATCH_UP_POLICIES)})"
+            )
+        if not 0 <= jitter < 1:
+            raise ValueError("Jitter must be a fraction in [0, 1)")
+        
+        self.run_batch = run_batch
+        self.intervals = dict(intervals)
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.cycle_deadline = cycle_deadline
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        
+        self._heap: List[tuple] = []
+        self._seq = 0
+        self.ticks = 0
+        self.probes_run = 0
+        self.probes_deferred = 0
+        self.slots_skipped = 0
+        
+        # Spread first runs across each interval so the fleet never
+        # starts in lockstep
+        now = self.clock()
+        for api_name, interval in self.intervals.items():
+            self._push(now + self.rng.uniform(0, interval * self.jitter), api_name)
+    
+    def _push(self, due: float, api_name: str):
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, api_name))
+    
+    def _jittered(self, interval: float) -> float:
+        if not self.jitter:
+            return interval
+        spread = interval * self.jitter
+        return interval + self.rng.uniform(-spread, spread)
+    
+    def next_due(self) -> Optional[float]:
+        """Clock time of the earliest scheduled probe"""
+        return self._heap[0][0] if self._heap else None
+    
+    def pop_due(self, now: float) -> List[tuple]:
+        """Remove and return (due, api_name) for every API due at now"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, _, api_name = heapq.heappop(self._heap)
+            due.append((due_at, api_name))
+        return due
+    
+    def _reschedule(self, due_at: float, api_name: str, now: float):
+        interval = self.intervals[api_name]
+        next_due = due_at + self._jittered(interval)
+        
+        if next_due <= now:
+            if self.catch_up == "skip":
+                missed = int((now - due_at) // interval)
+                self.slots_skipped += missed
+                next_due = due_at + (missed + 1) * interval
+            else:
+                next_due = now + self._jittered(interval)
+        
+        self._push(next_due, api_name)
+    
+    def tick(self) -> int:
+        """
+        Run every probe that is due now
+        Returns the number of APIs checked
+        """
+        now = self.clock()
+        due = self.pop_due(now)
+        if not due:
+            return 0
+        
+        self.ticks += 1
+        
+        if self.catch_up == "skip":
+            # Overdue by a full interval or more: drop the stale slot
+            fresh = []
+            for due_at, api_name in due:
+                if now - due_at >= self.intervals[api_name]:
+                    self._reschedule(due_at, api_name, now)
+                else:
+                    fresh.append((due_at, api_name))
+            due = fresh
+            if not due:
+                return 0
+        
+        deadline = now + self.cycle_deadline if self.cycle_deadline else None
+        names = [api_name for _, api_name in due]
+        deferred = set(self.run_batch(names, deadline) or [])
+        
+        finished = self.clock()
+        for due_at, api_name in due:
+            if api_name in deferred:
+                # Keep the original due time so it sorts first next tick
+                self._push(due_at, api_name)
+            else:
+                self._reschedule(due_at, api_name, finished)
+        
+        self.probes_run += len(names) - len(deferred)
+        self.probes_deferred += len(deferred)
+        
+        if deferred:
+            logger.warning(
+                f"Cycle deadline hit: {len(deferred)} of {len(names)} "
+                f"probes deferred to the next tick"
+            )
+        
+        return len(names) - len(deferred)
+    
+    def run_forever(self, max_sleep: float = 60.0,
+                    on_tick: Optional[Callable[[], None]] = None):
+        """Tick until interrupted, sleeping until the next probe is due"""
+        while True:
+            if self.tick() and on_tick:
+                on_tick()
+            
+            next_due = self.next_due()
+            if next_due is None:
+                return
+            self.sleep(max(0.0, min(next_due - self.clock(), max_sleep)))
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Status Archive Module
+Content-addressed archive of the status documents the detector read
+
+Every status document downloaded in full (summary.json, incidents.json,
+scraped HTML) is stored under the sha256 of its bytes, and each
+discrepancy names the snapshots its claim came from. Anyone holding the
+archive can replay exactly what the provider's page said at the time.
+
+Storage grows with what changed, not with how often pages are read:
+- a page that did not change is answered 304 by the fetcher and never
+  reaches the archive
+- a document already archived (from any URL, in any run) only gets a
+  version row
+- a changed document is stored as a zlib-compressed delta against the
+  URL's previous snapshot. Both are cut into content-defined chunks
+  (cut points depend on the bytes around them, so an edit does not
+  shift every chunk after it). The delta copies the chunks the base
+  already has and carries only the new ones.
+
+Delta chains are capped at MAX_DEPTH; the next change after that is
+stored whole, so reading any snapshot applies at most MAX_DEPTH deltas.
+Reading a snapshot re-hashes the result against its address.
+"""
+
+import hashlib
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Chunks end just after one of these bytes (tags, JSON objects, lines)...
+CHUNK_BOUNDARY = re.compile(rb'[\n>},;]')
+# ...when the bytes before it hash to a cut point: about 1 in 8 candidates
+CUT_WINDOW = 16
+CUT_MASK = 0x7
+MIN_CHUNK = 64
+# Runs without a boundary byte (inline data) are cut at fixed lengths
+MAX_CHUNK = 4096
+
+# Deltas applied at most to read a snapshot
+MAX_DEPTH = 16
+
+COPY = b"C"
+LITERAL = b"L"
+
+
+class ArchiveError(Exception):
+    """A snapshot that is missing or does not match its hash"""
+
+
+def content_hash(content: bytes) -> str:
+    """Address of a document in the archive"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def split_chunks(data: bytes) -> List[Tuple[int, int]]:
+    """Content-defined (start, end) chunks covering data"""
+    chunks = []
+    start = 0
+    position = MIN_CHUNK - 1
+    while True:
+        match = CHUNK_BOUNDARY.search(data, position)
+        if match is None:
+            break
+        end = match.end()
+        if end - start > MAX_CHUNK:
+            chunks.append((start, start + MAX_CHUNK))
+            start += MAX_CHUNK
+            position = start + MIN_CHUNK - 1
+        elif zlib.crc32(data[end - CUT_WINDOW:end]) & CUT_MASK == 0:
+            chunks.append((start, end))
+            start = end
+            position = start + MIN_CHUNK - 1
+        else:
+            position = end
+    while start < len(data):
+        chunks.append((start, min(start + MAX_CHUNK, len(data))))
+        start += MAX_CHUNK
+    return chunks
+
+
+def chunk_index(data: bytes) -> Dict[bytes, int]:
+    """Offset of each distinct chunk of data"""
+    index = {}
+    for start, end in split_chunks(data):
+        index.setdefault(data[start:end], start)
+    return index
+
+
+def make_delta(base: bytes, data: bytes,
+               base_index: Optional[Dict[bytes, int]] = None) -> Tuple[bytes, Dict[bytes, int]]:
+    """
+    Compressed delta that rebuilds data from base (see apply_delta),
+    and data's chunk index for use as the next delta's base_index
+    """
+    offsets = chunk_index(base) if base_index is None else base_index
+    index = {}
+    ops = []
+    copy_start = copy_end = None
+    literal = bytearray()
+    
+    def flush_copy():
+        if copy_start is not None:
+            ops.append(COPY + struct.pack(">II", copy_start, copy_end - copy_start))
+    
+    for start, end in split_chunks(data):
+        piece = data[start:end]
+        index.setdefault(piece, start)
+        offset = offsets.get(piece)
+        if offset is None:
+            flush_copy()
+            copy_start = None
+            literal += piece
+            continue
+        if literal:
+            ops.append(LITERAL + struct.pack(">I", len(literal)) + bytes(literal))
+            literal = bytearray()
+        if copy_start is not None and copy_end == offset:
+            copy_end += len(piece)
+        else:
+            flush_copy()
+            copy_start, copy_end = offset, offset + len(piece)
+    flush_copy()
+    if literal:
+        ops.append(LITERAL + struct.pack(">I", len(literal)) + bytes(literal))
+    return zlib.compress(b"".join(ops)), index
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild a document from its base and a make_delta delta"""
+    ops = zlib.decompress(delta)
+    parts = []
+    position = 0
+    while position < len(ops):
+        op = ops[position:position + 1]
+        if op == COPY:
+            offset, length = struct.unpack_from(">II", ops, position + 1)
+            parts.append(base[offset:offset + length])
+            position += 9
+        elif op == LITERAL:
+            (length,) = struct.unpack_from(">I", ops, position + 1)
+            parts.append(ops[position + 5:position + 5 + length])
+            position += 5 + length
+        else:
+            raise ArchiveError(f"Corrupt delta op {op!r} at {position}")
+    return b"".join(parts)
+
+
+class StatusArchive:
+    """
+    Snapshots of status documents, addressed by content hash
+    Safe to share between the fetcher's threads (one connection, locked)
+    """
+    
+    def __init__(self, path: str = "status_archive.db"):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA busy_timeout = 5000")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                base TEXT,
+                depth INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                stored INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS versions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                hash TEXT NOT NULL REFERENCES blobs(hash),
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_versions_url ON versions(url, id);
+        """)
+        self._lock = threading.Lock()
+        # Each URL's latest (hash, document, chunk index) this run, so the
+        # next delta neither rebuilds nor re-chunks its base
+        self._latest: Dict[str, Tuple[str, bytes, Optional[Dict[bytes, int]]]] = {}
+        # unchanged: same as the URL's last snapshot; shared: already
+        # archived from elsewhere; full / delta: newly stored
+        self.stats = {"unchanged": 0, "shared": 0, "full": 0, "delta": 0,
+                      "bytes_in": 0, "bytes_stored": 0}
+    
+    def put(self, url: str, content: bytes) -> str:
+        """Archive a document fetched from url; returns its snapshot hash"""
+        digest = content_hash(content)
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            head = self.conn.execute(
+                "SELECT id, hash FROM versions WHERE url = ? ORDER BY id DESC LIMIT 1", (url,)
+            ).fetchone()
+            self.stats["bytes_in"] += len(content)
+            
+            index = None
+            if head is not None and head["hash"] == digest:
+                self.conn.execute("UPDATE versions SET last_seen = ? WHERE id = ?",
+                                  (now, head["id"]))
+                self.stats["unchanged"] += 1
+            else:
+                if self._has(digest):
+                    self.stats["shared"] += 1
+                else:
+                    index = self._store(digest, content, head["hash"] if head else None,
+                                        self._latest.get(url), now)
+                self.conn.execute("""
+                    INSERT INTO versions (url, hash, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?)
+                """, (url, digest, now, now))
+            self.conn.commit()
+            latest = self._latest.get(url)
+            if index is None and latest and latest[0] == digest:
+                index = latest[2]
+            self._latest[url] = (digest, content, index)
+        return digest
+    
+    def _has(self, digest: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM blobs WHERE hash = ?", (digest,)
+        ).fetchone() is not None
+    
+    def _store(self, digest: str, content: bytes, base: Optional[str],
+               latest: Optional[Tuple], now: str) -> Optional[Dict[bytes, int]]:
+        """Store content as a delta against base, or whole; returns its chunk index"""
+        depth = 0
+        data = index = None
+        if base is not None:
+            row = self.conn.execute("SELECT depth FROM blobs WHERE hash = ?", (base,)).fetchone()
+            if row is not None and row["depth"] < MAX_DEPTH:
+                if latest and latest[0] == base:
+                    base_content, base_index = latest[1], latest[2]
+                else:
+                    base_content, base_index = self._read(base), None
+                delta, index = make_delta(base_content, content, base_index)
+                # A rewritten page is cheaper stored whole
+                if len(delta) < len(content) // 4:
+                    data, depth = delta, row["depth"] + 1
+        if data is None:
+            data, base = zlib.compress(content), None
+        
+        self.conn.execute("""
+            INSERT INTO blobs (hash, base, depth, size, stored, data, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (digest, base, depth, len(content), len(data), data, now))
+        self.stats["delta" if base else "full"] += 1
+        self.stats["bytes_stored"] += len(data)
+        return index
+    
+    def get(self, digest: str) -> bytes:
+        """The archived document with this hash"""
+        with self._lock:
+            return self._read(digest)
+    
+    def _read(self, digest: str) -> bytes:
+        chain = []
+        current = digest
+        while current is not None:
+            row = self.conn.execute(
+                "SELECT base, data FROM blobs WHERE hash = ?", (current,)
+            ).fetchone()
+            if row is None:
+                raise ArchiveError(f"Snapshot {current} is not in the archive")
+            chain.append(row["data"])
+            current = row["base"]
+        
+        content = zlib.decompress(chain.pop())
+        while chain:
+            content = apply_delta(content, chain.pop())
+        if content_hash(content) != digest:
+            raise ArchiveError(f"Snapshot {digest} does not match its content")
+        return content
+    
+    def history(self, url: str) -> List[Dict]:
+        """Versions of a URL, oldest first"""
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT v.hash, v.first_seen, v.last_seen, b.size, b.stored, b.depth
+                FROM versions v JOIN blobs b ON b.hash = v.hash
+                WHERE v.url = ? ORDER BY v.id
+            """, (url,)).fetchall()
+        return [dict(row) for row in rows]
+    
+    def verify(self) -> Tuple[bool, List[str]]:
+        """
+        Rebuild every snapshot and check it against its hash
+        Returns (is_valid, list_of_errors)
+        """
+        errors = []
+        with self._lock:
+            hashes = [row[0] for row in self.conn.execute("SELECT hash FROM blobs")]
+            for digest in hashes:
+                try:
+                    self._read(digest)
+                except (ArchiveError, zlib.error, struct.error) as e:
+                    errors.append(str(e))
+        return (not errors, errors)
+    
+    def totals(self) -> Dict:
+        """Archive-wide counts and sizes"""
+        with self._lock:
+            blobs = self.conn.execute("""
+                SELECT COUNT(*) AS snapshots, SUM(base IS NOT NULL) AS deltas,
+                       COALESCE(SUM(size), 0) AS size, COALESCE(SUM(stored), 0) AS stored
+                FROM blobs
+            """).fetchone()
+            versions = self.conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT url) FROM versions"
+            ).fetchone()
+        return {
+            "snapshots": blobs["snapshots"],
+            "deltas": blobs["deltas"] or 0,
+            "versions": versions[0],
+            "urls": versions[1],
+            "document_bytes": blobs["size"],
+            "stored_bytes": blobs["stored"],
+        }
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Truth Ledger Status Page Archive')
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='status_archive.db',
+        help='Archive path (default: status_archive.db)'
+    )
+    parser.add_argument(
+        '--show',
+        type=str,
+        help='Write the snapshot with this hash to stdout'
+    )
+    parser.add_argument(
+        '--history',
+        type=str,
+        help='List the archived versions of a status document URL'
+    )
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Rebuild every snapshot and check it against its hash'
+    )
+    
+    args = parser.parse_args()
+    archive = StatusArchive(args.db)
+    
+    try:
+        if args.show:
+            sys.stdout.buffer.write(archive.get(args.show))
+            return
+        
+        if args.history:
+            for version in archive.history(args.history):
+                print(f"{version['hash']}  {version['first_seen']} .. {version['last_seen']}  "
+                      f"{version['size']:>9,} bytes  "
+                      f"{'delta' if version['depth'] else 'whole'} {version['stored']:,}")
+            return
+        
+        if args.verify:
+            valid, errors = archive.verify()
+            for error in errors[:20]:
+                print(f"   ✗ {error}")
+            print("✓ ARCHIVE VERIFIED" if valid else "✗ ARCHIVE VERIFICATION FAILED")
+            sys.exit(0 if valid else 1)
+        
+        totals = archive.totals()
+        print(f"{totals['versions']:,} versions of {totals['urls']:,} documents, "
+              f"{totals['snapshots']:,} snapshots ({totals['deltas']:,} deltas)")
+        print(f"{totals['document_bytes'] / 1024:,.1f} KB of documents stored in "
+              f"{totals['stored_bytes'] / 1024:,.1f} KB")
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
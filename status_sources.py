@@ -0,0 +1,688 @@
+"""
+Status Sources Module
+Adapters that read what a provider's status page claims
+
+Each official_status source in api_sources.py names its adapter with
+"method":
+    statuspage  Atlassian Statuspage (and compatible) sites. Reads the
+                small /api/v2/summary.json and /api/v2/incidents.json
+                documents instead of the rendered page. Status is per
+                component; claimed uptime is the share of the window not
+                covered by the provider's own major or critical incidents.
+    scrape      Downloads the HTML page and keyword-searches its text,
+                or only the text of the elements matching the source's
+                "selector" (simple CSS: tag, .class, #id). The fallback
+                for pages without the JSON API; statuspage sources keep
+                their selector so the fallback stays targeted.
+
+A source may list "components": name fragments (case-insensitive) of
+the components that cover the monitored API, e.g. ["API Requests"].
+The claimed status is then the worst of those components, not the
+page-wide indicator, and only incidents touching them count against
+claimed uptime. With no list, or none matching, every component counts.
+
+Documents are fetched through a Fetcher. Given a cache file, it keeps
+each URL's ETag / Last-Modified and the parsed document between runs,
+asks with If-None-Match / If-Modified-Since, and reuses the parsed
+result on 304. An unchanged page then costs one small round trip and no
+parsing. Results validated within max_stale seconds are reused unasked.
+
+Every adapter returns the same claim:
+    claimed_status   up / maintenance / degraded / down / unknown
+    claimed_uptime   percent over the window, or None if unknown
+    components       {component name: status} that the claim covers
+    incidents        incidents overlapping the window
+    source_url       the status page, as evidence
+    adapter          which adapter produced the claim
+    snapshots        archive hashes of the documents read (see
+                     status_archive), when the reader has an archive
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+import lxml.html
+from lxml import etree
+
+from database import HOUR_MS, iso_to_epoch_ms, utc_now_ms
+from status_archive import ArchiveError, StatusArchive
+
+
+logger = logging.getLogger(__name__)
+
+# Statuspage component states in our vocabulary
+COMPONENT_STATUS = {
+    "operational": "up",
+    "under_maintenance": "maintenance",
+    "degraded_performance": "degraded",
+    "partial_outage": "degraded",
+    "major_outage": "down",
+}
+
+# Worst wins when several components cover one API
+STATUS_SEVERITY = ("up", "maintenance", "degraded", "down")
+
+# Page-wide indicator, used when no component matches
+INDICATOR_STATUS = {"none": "up", "maintenance": "maintenance", "minor": "degraded",
+                    "major": "down", "critical": "down"}
+
+# Incident impacts that count as downtime against claimed uptime
+OUTAGE_IMPACTS = ("major", "critical")
+
+
+class StatusSourceError(Exception):
+    """A status source that could not be read with this adapter"""
+
+
+class NotStatuspage(StatusSourceError):
+    """A page that does not serve the Statuspage API at all"""
+
+
+class Fetcher:
+    """
+    GETs status documents and keeps what they parsed to
+    With a cache file, each URL's ETag / Last-Modified validators and
+    parsed result persist between runs. Requests are conditional, and a
+    304 reuses the parsed result without downloading or parsing the page
+    again. A result validated within max_stale seconds is reused without
+    asking the server at all.
+    
+    Safe to share between threads (each gets its own session). Within a
+    sweep (see new_sweep) every URL is fetched at most once; threads
+    asking for a URL already in flight wait for that fetch.
+    """
+    
+    # 2: scrape results are kept per (URL, selector)
+    CACHE_VERSION = 2
+    
+    def __init__(self, session: Optional[requests.Session] = None, timeout: float = 10,
+                 cache_path: Optional[str] = None, max_stale: float = 0,
+                 archive: Optional[StatusArchive] = None):
+        self.session = session or requests.Session()
+        self.archive = archive
+        # Snapshot hash of each URL's document as last fetched or validated
+        self.snapshots: Dict[str, Optional[str]] = {}
+        self._sessions = [self.session]
+        self._local = threading.local()
+        self._sweep: Dict[str, Future] = {}
+        self.timeout = timeout
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries: Dict[str, Dict] = {}
+        if self.cache_path and self.cache_path.exists():
+            try:
+                with open(self.cache_path) as f:
+                    cache = json.load(f)
+                if cache.get("version") == self.CACHE_VERSION:
+                    self.entries = cache["entries"]
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                logger.warning(f"Ignoring unreadable status cache {self.cache_path}: {e}")
+        
+        # fresh: reused unasked; not_modified: 304; downloaded: full 200s;
+        # shared: answered by a fetch of the same URL earlier in the sweep
+        self.stats = {"fresh": 0, "not_modified": 0, "downloaded": 0, "failed": 0,
+                      "shared": 0, "bytes_downloaded": 0}
+    
+    def _thread_session(self) -> requests.Session:
+        """The calling thread's session (Session is not thread-safe)"""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.session.headers)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+    
+    def new_sweep(self):
+        """Forget this sweep's fetches, so the next ones revalidate"""
+        with self._lock:
+            self._sweep = {}
+    
+    def get(self, url: str, parse: Callable[[requests.Response], object],
+            accept: Optional[str] = None, key: Optional[str] = None):
+        """
+        parse(response) for url, or the cached result if it is unchanged
+        parse raises StatusSourceError for responses it cannot use; they
+        are not cached. Results are kept under key (default: url), so
+        different parses of one URL are cached apart.
+        """
+        key = key or url
+        with self._lock:
+            pending = self._sweep.get(key)
+            if pending is None:
+                future = self._sweep[key] = Future()
+            else:
+                self.stats["shared"] += 1
+        if pending is not None:
+            return pending.result()
+        
+        try:
+            parsed = self._fetch(url, parse, accept, key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(parsed)
+        return parsed
+    
+    def _fetch(self, url: str, parse: Callable[[requests.Response], object],
+               accept: Optional[str], key: str):
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(key) if self.cache_path else None
+            if entry and now - entry["validated_at"] <= self.max_stale:
+                self.stats["fresh"] += 1
+                self.snapshots[url] = entry.get("snapshot")
+                return entry["parsed"]
+        
+        headers = {"Accept": accept} if accept else {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            response = self._thread_session().get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException:
+            with self._lock:
+                self.stats["failed"] += 1
+            raise
+        
+        with self._lock:
+            self.stats["bytes_downloaded"] += len(response.content)
+            if response.status_code == 304 and entry:
+                self.stats["not_modified"] += 1
+                entry["validated_at"] = now
+                self.snapshots[url] = entry.get("snapshot")
+                self._dirty = True
+                return entry["parsed"]
+        
+        try:
+            parsed = parse(response)
+        except StatusSourceError:
+            with self._lock:
+                self.stats["failed"] += 1
+            raise
+        
+        snapshot = None
+        if self.archive is not None:
+            try:
+                snapshot = self.archive.put(url, response.content)
+            except (sqlite3.Error, ArchiveError) as e:
+                logger.warning(f"Could not archive {url}: {e}")
+        
+        with self._lock:
+            self.stats["downloaded"] += 1
+            self.snapshots[url] = snapshot
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if self.cache_path and (etag or last_modified or self.max_stale):
+                self.entries[key] = {"etag": etag, "last_modified": last_modified,
+                                     "validated_at": now, "parsed": parsed,
+                                     "snapshot": snapshot}
+                self._dirty = True
+            elif self.entries.pop(key, None):
+                self._dirty = True
+        return parsed
+    
+    def snapshot(self, url: str) -> Optional[str]:
+        """Archive hash of the document url last returned, if archived"""
+        with self._lock:
+            return self.snapshots.get(url)
+    
+    def hit_rate(self) -> float:
+        """Share of lookups answered without downloading, in percent"""
+        hits = self.stats["fresh"] + self.stats["not_modified"]
+        lookups = hits + self.stats["downloaded"]
+        return hits / lookups * 100 if lookups else 0.0
+    
+    def save(self):
+        """Write the cache file if anything changed"""
+        with self._lock:
+            if not self.cache_path or not self._dirty:
+                return
+            tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"version": self.CACHE_VERSION, "entries": self.entries}, f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+    
+    def close(self):
+        self.save()
+        for session in self._sessions:
+            session.close()
+
+
+def worst_status(statuses) -> str:
+    """Most severe of several statuses ("unknown" if there are none)"""
+    ranked = [status for status in statuses if status in STATUS_SEVERITY]
+    if not ranked:
+        return "unknown"
+    return max(ranked, key=STATUS_SEVERITY.index)
+
+
+def _epoch_ms(timestamp: Optional[str]) -> Optional[int]:
+    """Statuspage timestamp (ISO-8601 with offset, maybe Z) to epoch ms"""
+    if not timestamp:
+        return None
+    return iso_to_epoch_ms(timestamp.replace("Z", "+00:00"))
+
+
+def _wanted(name: str, fragments: List[str]) -> bool:
+    name = name.lower()
+    return any(fragment.lower() in name for fragment in fragments)
+
+
+class StatuspageAdapter:
+    """Claims from a Statuspage site's JSON API"""
+    
+    name = "statuspage"
+    
+    def fetch(self, fetcher: "Fetcher", source: Dict, hours: int) -> Dict:
+        base = source["url"].rstrip("/")
+        summary_url = f"{base}/api/v2/summary.json"
+        incidents_url = f"{base}/api/v2/incidents.json"
+        summary = fetcher.get(summary_url, self._parse_summary, accept="application/json")
+        snapshots = [fetcher.snapshot(summary_url)]
+        
+        fragments = source.get("components") or []
+        components = {
+            component["name"]: COMPONENT_STATUS.get(component["status"], "unknown")
+            for component in summary["components"]
+            # Groups only restate their children's status
+            if not component["group"]
+        }
+        matched = {name: status for name, status in components.items()
+                   if fragments and _wanted(name, fragments)}
+        if fragments and not matched:
+            logger.debug(f"No component of {base} matches {fragments}; using all")
+        if matched:
+            claimed_status = worst_status(matched.values())
+        else:
+            claimed_status = INDICATOR_STATUS.get(
+                summary["indicator"], worst_status(components.values())
+            )
+        
+        end_ms = utc_now_ms()
+        start_ms = end_ms - hours * HOUR_MS
+        try:
+            listed = fetcher.get(incidents_url, self._parse_incidents,
+                                 accept="application/json")
+            snapshots.append(fetcher.snapshot(incidents_url))
+        except StatusSourceError as e:
+            logger.warning(f"No incident history from {base}: {e}")
+            listed = None
+        
+        incidents = []
+        claimed_uptime = None
+        if listed is not None:
+            incidents = self._window_incidents(listed, set(matched), start_ms, end_ms)
+            outage_ms = self._covered_ms([
+                (incident["started_ms"], incident["resolved_ms"])
+                for incident in incidents if incident["impact"] in OUTAGE_IMPACTS
+            ])
+            claimed_uptime = round((1 - outage_ms / (end_ms - start_ms)) * 100, 4)
+        
+        return {
+            "claimed_status": claimed_status,
+            "claimed_uptime": claimed_uptime,
+            "components": matched or components,
+            "incidents": [
+                {key: incident[key] for key in ("name", "impact", "status",
+                                                "started_at", "resolved_at")}
+                for incident in incidents
+            ],
+            "source_url": source["url"],
+            "adapter": self.name,
+            "snapshots": [snapshot for snapshot in snapshots if snapshot],
+        }
+    
+    @staticmethod
+    def _json(response: requests.Response) -> Dict:
+        if response.status_code == 404:
+            raise NotStatuspage(f"{response.url} not found")
+        if response.status_code != 200:
+            raise StatusSourceError(f"{response.url} returned {response.status_code}")
+        try:
+            document = response.json()
+        except ValueError:
+            raise NotStatuspage(f"{response.url} is not JSON")
+        if not isinstance(document, dict):
+            raise NotStatuspage(f"{response.url} is not a Statuspage document")
+        return document
+    
+    @classmethod
+    def _parse_summary(cls, response: requests.Response) -> Dict:
+        """The parts of summary.json a claim is built from"""
+        document = cls._json(response)
+        if "components" not in document or "status" not in document:
+            raise NotStatuspage(f"{response.url} has no Statuspage summary")
+        return {
+            "indicator": document["status"].get("indicator"),
+            "components": [
+                {"name": component["name"], "status": component.get("status"),
+                 "group": bool(component.get("group"))}
+                for component in document["components"]
+            ],
+        }
+    
+    @classmethod
+    def _parse_incidents(cls, response: requests.Response) -> List[Dict]:
+        """The parts of incidents.json a claim is built from"""
+        return [
+            {
+                "name": incident.get("name", ""),
+                "impact": incident.get("impact", "none"),
+                "status": incident.get("status", ""),
+                "started_at": incident.get("started_at") or incident.get("created_at"),
+                "resolved_at": incident.get("resolved_at"),
+                "components": [component["name"]
+                               for component in incident.get("components") or []],
+            }
+            for incident in cls._json(response).get("incidents", [])
+        ]
+    
+    @staticmethod
+    def _window_incidents(listed: List[Dict], components: set, start_ms: int,
+                          end_ms: int) -> List[Dict]:
+        """Incidents overlapping the window that touch the chosen components"""
+        incidents = []
+        for incident in listed:
+            started_ms = _epoch_ms(incident["started_at"])
+            if started_ms is None or started_ms >= end_ms:
+                continue
+            resolved_ms = _epoch_ms(incident["resolved_at"]) or end_ms
+            if resolved_ms <= start_ms:
+                continue
+            affected = set(incident["components"])
+            # An incident with no components listed is page-wide
+            if components and affected and not affected & components:
+                continue
+            incidents.append(dict(
+                incident,
+                started_ms=max(started_ms, start_ms),
+                resolved_ms=min(resolved_ms, end_ms)
+            ))
+        return incidents
+    
+    @staticmethod
+    def _covered_ms(intervals: List[Tuple[int, int]]) -> int:
+        """Length of the union of [start, end) intervals"""
+        covered = 0
+        current_start = current_end = None
+        for start, end in sorted(intervals):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    covered += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            covered += current_end - current_start
+        return covered
+
+
+class HTMLScrapeAdapter:
+    """
+    Claims from keywords in a status page's text
+    With a "selector" on the source, only the text of the matching
+    elements is read: the page is pull-parsed in chunks, elements outside
+    a match are dropped as soon as they close, and parsing stops once
+    max_matches elements have been read. Pages where the selector matches
+    nothing are read whole.
+    """
+    
+    name = "scrape"
+    
+    # Patterns like "99.9%", "99.95% uptime"
+    UPTIME_PATTERNS = tuple(re.compile(pattern) for pattern in (
+        r'(\d+\.\d+)%\s*uptime',
+        r'uptime.*?(\d+\.\d+)%',
+        r'(\d+\.\d+)%.*?availability'
+    ))
+    
+    # Enough component rows for a claim without parsing the page history
+    MAX_MATCHES = 50
+    CHUNK_SIZE = 16 * 1024
+    
+    def fetch(self, fetcher: "Fetcher", source: Dict, hours: int) -> Dict:
+        selector = source.get("selector")
+        max_matches = source.get("max_matches", self.MAX_MATCHES)
+        claim = fetcher.get(
+            source["url"],
+            lambda response: self._parse_page(response, selector, max_matches),
+            key=f"{source['url']} {selector}" if selector else None,
+        )
+        snapshot = fetcher.snapshot(source["url"])
+        return dict(claim, components={}, incidents=[], source_url=source["url"],
+                    adapter=self.name, snapshots=[snapshot] if snapshot else [])
+    
+    def _parse_page(self, response: requests.Response, selector: Optional[str],
+                    max_matches: int) -> Dict:
+        if response.status_code != 200:
+            raise StatusSourceError(f"{response.url} returned {response.status_code}")
+        return self.parse_html(response.content, selector, max_matches)
+    
+    def parse_html(self, content: bytes, selector: Optional[str] = None,
+                   max_matches: int = MAX_MATCHES) -> Dict:
+        """Claimed status and uptime from a page (the selected part, if any)"""
+        text = None
+        if selector:
+            texts = selected_text(content, selector, max_matches, self.CHUNK_SIZE)
+            if texts:
+                text = " ".join(texts)
+            else:
+                logger.debug(f"Selector {selector!r} matched nothing; reading whole page")
+        if text is None:
+            text = document_text(content)
+        text = text.lower()
+        
+        # Most status pages use "operational", "up", "all systems operational"
+        if "operational" in text or "all systems" in text:
+            claimed_status = "up"
+        elif "outage" in text or "down" in text:
+            claimed_status = "down"
+        elif "degraded" in text or "issues" in text:
+            claimed_status = "degraded"
+        else:
+            claimed_status = "unknown"
+        
+        return {"claimed_status": claimed_status, "claimed_uptime": self.extract_uptime(text)}
+    
+    def extract_uptime(self, text: str) -> Optional[float]:
+        """Extract uptime percentage from text"""
+        for pattern in self.UPTIME_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                try:
+                    return float(match.group(1))
+                except ValueError:
+                    pass
+        return None
+
+
+SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?(?:([.#])([\w-]+))?$')
+
+
+def compile_selector(selector: str) -> Optional[Callable[[etree._Element], bool]]:
+    """
+    A match function for simple CSS selectors - tag, .class, #id,
+    tag.class, tag#id, or a comma-separated list of them. None for
+    anything else (combinators, attributes, pseudo-classes).
+    """
+    tests = []
+    for part in selector.split(","):
+        match = SIMPLE_SELECTOR.match(part.strip())
+        if not match or not any(match.groups()):
+            return None
+        tag, kind, value = match.groups()
+        tests.append((tag.lower() if tag else None, kind, value))
+    
+    def matches(element: etree._Element) -> bool:
+        for tag, kind, value in tests:
+            if tag and element.tag != tag:
+                continue
+            if kind == "." and value not in (element.get("class") or "").split():
+                continue
+            if kind == "#" and element.get("id") != value:
+                continue
+            return True
+        return False
+    return matches
+
+
+def selected_text(content: bytes, selector: str, max_matches: int = 50,
+                  chunk_size: int = 16 * 1024) -> List[str]:
+    """
+    Text of up to max_matches elements matching selector, read with a
+    streaming parse that stops once it has them. Elements nested in a
+    match count as part of it. [] if the selector is unsupported or
+    matches nothing.
+    """
+    matches = compile_selector(selector)
+    if matches is None:
+        logger.debug(f"Unsupported selector {selector!r}; reading whole page")
+        return []
+    
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    texts = []
+    inside = 0
+    for offset in range(0, len(content), chunk_size):
+        parser.feed(content[offset:offset + chunk_size])
+        for event, element in parser.read_events():
+            if not isinstance(element.tag, str):
+                continue
+            if event == "start":
+                if matches(element):
+                    inside += 1
+                continue
+            
+            if matches(element):
+                inside -= 1
+                if inside == 0:
+                    texts.append(" ".join(element.itertext()))
+                    if len(texts) >= max_matches:
+                        return texts
+            if inside == 0:
+                # Closed and outside any match: drop it and its older siblings
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+    return texts
+
+
+def document_text(content: bytes) -> str:
+    """All text in an HTML page"""
+    if not content.strip():
+        return ""
+    return lxml.html.document_fromstring(content).text_content()
+
+
+def official_sources(config: Dict) -> List[Dict]:
+    """An API config's official status sources, in preference order"""
+    return [source for source in config.get("verification_sources", [])
+            if source["type"] == "official_status"]
+
+
+ADAPTERS = {
+    StatuspageAdapter.name: StatuspageAdapter(),
+    HTMLScrapeAdapter.name: HTMLScrapeAdapter(),
+}
+
+
+class StatusReader:
+    """
+    Reads official claims for APIs, trying each source's adapter and
+    falling back to HTML scraping. A page found not to serve the
+    Statuspage API is scraped directly from then on.
+    """
+    
+    def __init__(self, session: Optional[requests.Session] = None, timeout: float = 10,
+                 cache_path: Optional[str] = None, max_stale: float = 0,
+                 archive_path: Optional[str] = None):
+        self.archive = StatusArchive(archive_path) if archive_path else None
+        self.fetcher = Fetcher(session, timeout, cache_path, max_stale, self.archive)
+        self._no_json = set()
+    
+    def adapters_for(self, source: Dict) -> List:
+        """Adapters to try for a source, in order"""
+        method = source.get("method", "scrape")
+        if method == StatuspageAdapter.name and source["url"] not in self._no_json:
+            return [ADAPTERS[StatuspageAdapter.name], ADAPTERS[HTMLScrapeAdapter.name]]
+        return [ADAPTERS[HTMLScrapeAdapter.name]]
+    
+    def read(self, source: Dict, hours: int = 24) -> Optional[Dict]:
+        """The source's claim, or None if no adapter could read it"""
+        for adapter in self.adapters_for(source):
+            try:
+                return adapter.fetch(self.fetcher, source, hours)
+            except StatusSourceError as e:
+                if isinstance(e, NotStatuspage):
+                    self._no_json.add(source["url"])
+                logger.warning(f"{adapter.name} could not read {source['url']}: {e}")
+            except requests.RequestException as e:
+                logger.warning(f"Failed to fetch {source['url']}: {e}")
+        return None
+    
+    def official_status(self, config: Dict, hours: int = 24) -> Optional[Dict]:
+        """Claim from the first readable official source of an API config"""
+        self.fetcher.new_sweep()
+        return self._first_claim(official_sources(config), hours)
+    
+    def official_statuses(self, configs: Dict[str, Dict], hours: int = 24,
+                          workers: int = 16) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        (api_name, claim) for each API config, in the order claims arrive
+        Sources are read by up to workers threads at once. APIs with the
+        same official sources share one read, and each URL is fetched at
+        most once per call.
+        """
+        self.fetcher.new_sweep()
+        reads: Dict[str, Future] = {}
+        waiting: Dict[Future, List[str]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers),
+                                thread_name_prefix="status-fetch") as pool:
+            for api_name, config in configs.items():
+                sources = official_sources(config)
+                key = json.dumps(sources, sort_keys=True)
+                if key not in reads:
+                    reads[key] = pool.submit(self._first_claim, sources, hours)
+                waiting.setdefault(reads[key], []).append(api_name)
+            
+            for future in as_completed(waiting):
+                for api_name in waiting[future]:
+                    yield api_name, future.result()
+    
+    def _first_claim(self, sources: List[Dict], hours: int) -> Optional[Dict]:
+        for source in sources:
+            claim = self.read(source, hours)
+            if claim:
+                return claim
+        return None
+    
+    def cache_stats(self) -> Dict:
+        """Fetch counts, bytes and hit rate of the validator cache"""
+        return dict(self.fetcher.stats, hit_rate=round(self.fetcher.hit_rate(), 1),
+                    cached_urls=len(self.fetcher.entries))
+    
+    def archive_stats(self) -> Optional[Dict]:
+        """What this reader added to the snapshot archive, if it has one"""
+        return dict(self.archive.stats) if self.archive else None
+    
+    def close(self):
+        """Save the cache, close the session and the archive"""
+        self.fetcher.close()
+        if self.archive:
+            self.archive.close()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Streaming Detector Module
+Raises discrepancies as checks arrive instead of in a batch run
+
+Each API keeps a ring of bucket counters per window (1h in minutes, 24h
+and 7d in hours). A check adds to one bucket of each, and buckets that
+slide out of a window are subtracted as the window moves. Updating
+measured uptime is therefore O(1) per check, whatever the window holds.
+At startup the rings are seeded from the ledger: the last hour of
+checks for the 1h window, and the hourly rollups for the others.
+
+Claims are cached per API. ClaimRefresher re-reads the status pages in
+the background, so checks never wait on the network. Each check and
+each new claim is compared with the windows a claim is about:
+- a claimed status ("up") is compared with the shortest window that
+  holds min_checks: what the API is doing now where it is probed often
+  enough, the last day or week for APIs probed hourly
+- a claimed uptime percentage is compared with the window of the
+  claim's length (24h by default)
+The batch detector (reveal_truth.py) uses the same thresholds. A
+discrepancy is raised when the measurement starts to diverge from the
+claim. It is raised again only after it has recovered, or when the
+claim itself changes.
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from database import DAY_MS, HOUR_MS, LOCAL_VANTAGE, TruthLedgerDB, iso_to_epoch_ms, utc_now_ms
+from status_sources import StatusReader, official_sources
+
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60 * 1000
+
+# (label, window length, bucket width), shortest first
+WINDOWS = (
+    ("1h", HOUR_MS, MINUTE_MS),
+    ("24h", DAY_MS, HOUR_MS),
+    ("7d", 7 * DAY_MS, HOUR_MS),
+)
+
+# A claimed "up" is contradicted below this measured uptime (percent)...
+STATUS_FLOOR = 95.0
+# ...and a claimed uptime by a difference of more than this many points
+UPTIME_TOLERANCE = 2.0
+
+# Checks a window needs before it can contradict a claim
+MIN_CHECKS = 5
+
+# Most recent check hashes cited as proof with each discrepancy
+PROOF_CHECKS = 10
+
+
+def severity_for(variance: float) -> str:
+    """Severity of a discrepancy from its variance in percentage points"""
+    if variance >= 10.0:
+        return "critical"
+    elif variance >= 5.0:
+        return "high"
+    elif variance >= 2.0:
+        return "medium"
+    else:
+        return "low"
+
+
+class WindowCounter:
+    """
+    Check and success counts over a sliding window, in a ring of buckets
+    The window covers the newest bucket seen and the ones before it, so
+    it spans between window_ms - bucket_ms and window_ms of time.
+    """
+    
+    __slots__ = ("bucket_ms", "size", "buckets", "totals", "ups", "head", "total", "up")
+    
+    def __init__(self, window_ms: int, bucket_ms: int):
+        self.bucket_ms = bucket_ms
+        self.size = window_ms // bucket_ms
+        # Bucket number each slot holds, and its counts
+        self.buckets: List[Optional[int]] = [None] * self.size
+        self.totals = [0] * self.size
+        self.ups = [0] * self.size
+        self.head: Optional[int] = None
+        self.total = 0
+        self.up = 0
+    
+    def advance(self, ts_ms: int):
+        """Slide the window forward to cover ts_ms"""
+        bucket = ts_ms // self.bucket_ms
+        if self.head is not None and bucket <= self.head:
+            return
+        first = bucket - self.size + 1
+        if self.head is not None:
+            first = max(first, self.head + 1)
+        for expired in range(first, bucket + 1):
+            self._reset(expired % self.size, expired)
+        self.head = bucket
+    
+    def add(self, ts_ms: int, up: int, total: int = 1) -> bool:
+        """Count checks at ts_ms; False if they are older than the window"""
+        self.advance(ts_ms)
+        bucket = ts_ms // self.bucket_ms
+        if bucket <= self.head - self.size:
+            return False
+        slot = bucket % self.size
+        if self.buckets[slot] != bucket:
+            self._reset(slot, bucket)
+        self.totals[slot] += total
+        self.ups[slot] += up
+        self.total += total
+        self.up += up
+        return True
+    
+    def _reset(self, slot: int, bucket: int):
+        self.total -= self.totals[slot]
+        self.up -= self.ups[slot]
+        self.totals[slot] = self.ups[slot] = 0
+        self.buckets[slot] = bucket
+    
+    def uptime(self) -> Optional[float]:
+        """Percent of the window's checks that were up (None if none)"""
+        return self.up / self.total * 100 if self.total else None
+
+
+class StreamingDetector:
+    """
+    Sliding-window uptime per API, compared with cached claims as each
+    check arrives
+    Safe to feed checks and claims from different threads.
+    on_discrepancy is called (outside the lock) with each discrepancy
+    raised, shaped like reveal_truth's.
+    """
+    
+    def __init__(self, windows: Iterable[Tuple[str, int, int]] = WINDOWS,
+                 claim_hours: int = 24, min_checks: int = MIN_CHECKS,
+                 on_discrepancy: Optional[Callable[[Dict], None]] = None):
+        self.windows = tuple(windows)
+        # Claimed uptime covers claim_hours; compare it with the window
+        # closest to that length
+        self.claim_window = min(
+            self.windows, key=lambda window: abs(window[1] - claim_hours * HOUR_MS)
+        )[0]
+        # Claimed status is compared with the shortest window holding
+        # enough checks, so it falls back to longer ones for APIs probed
+        # less often than min_checks times a window
+        self.status_windows = tuple(
+            label for label, _, _ in sorted(self.windows, key=lambda window: window[1])
+        )
+        self.min_checks = min_checks
+        self.on_discrepancy = on_discrepancy
+        self.counters: Dict[str, Dict[str, WindowCounter]] = {}
+        self.claims: Dict[str, Dict] = {}
+        self.proofs: Dict[str, Deque[str]] = {}
+        # (api_name, "status" or "uptime") -> claim the open discrepancy
+        # contradicted
+        self.diverging: Dict[Tuple[str, str], Tuple] = {}
+        self._lock = threading.Lock()
+    
+    def _counters(self, api_name: str) -> Dict[str, WindowCounter]:
+        counters = self.counters.get(api_name)
+        if counters is None:
+            counters = self.counters[api_name] = {
+                label: WindowCounter(window_ms, bucket_ms)
+                for label, window_ms, bucket_ms in self.windows
+            }
+            self.proofs[api_name] = deque(maxlen=PROOF_CHECKS)
+        return counters
+    
+    def seed(self, db: TruthLedgerDB, vantage: str = LOCAL_VANTAGE,
+             now_ms: Optional[int] = None):
+        """Fill the windows from checks already in the ledger"""
+        now_ms = utc_now_ms() if now_ms is None else now_ms
+        with self._lock:
+            for label, window_ms, bucket_ms in self.windows:
+                start_ms = (now_ms // bucket_ms + 1) * bucket_ms - window_ms
+                for api_name, bucket_start_ms, total, up in db.get_bucket_counts(
+                        start_ms, bucket_ms, vantage):
+                    counter = self._counters(api_name)[label]
+                    counter.advance(now_ms)
+                    counter.add(bucket_start_ms, up or 0, total)
+    
+    def observe(self, check: Dict, check_hash: Optional[str] = None) -> List[Dict]:
+        """Count one check; returns the discrepancies it raised"""
+        return self.observe_many([check], [check_hash])
+    
+    def observe_many(self, checks: List[Dict],
+                     hashes: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """Count checks (in order); returns the discrepancies they raised"""
+        raised = []
+        with self._lock:
+            touched = {}
+            for check, check_hash in zip(checks, hashes or [None] * len(checks)):
+                api_name = check["api_name"]
+                ts_ms = check.get("ts_epoch_ms") or iso_to_epoch_ms(check["timestamp"])
+                up = 1 if check["status"] == "up" else 0
+                for counter in self._counters(api_name).values():
+                    counter.add(ts_ms, up)
+                if check_hash:
+                    self.proofs[api_name].append(check_hash)
+                touched[api_name] = None
+            for api_name in touched:
+                raised.extend(self._evaluate(api_name))
+        self._emit(raised)
+        return raised
+    
+    def set_claim(self, api_name: str, claim: Optional[Dict]) -> List[Dict]:
+        """Cache an API's latest claim; returns the discrepancies it raised"""
+        with self._lock:
+            if claim is None:
+                self.claims.pop(api_name, None)
+                return []
+            self.claims[api_name] = claim
+            raised = self._evaluate(api_name) if api_name in self.counters else []
+        self._emit(raised)
+        return raised
+    
+    def measured(self, api_name: str, now_ms: Optional[int] = None) -> Dict[str, Dict]:
+        """Uptime and check counts per window, as of now_ms (default: now)"""
+        now_ms = utc_now_ms() if now_ms is None else now_ms
+        with self._lock:
+            counters = self.counters.get(api_name, {})
+            result = {}
+            for label, counter in counters.items():
+                counter.advance(now_ms)
+                uptime = counter.uptime()
+                result[label] = {
+                    "uptime": round(uptime, 4) if uptime is not None else None,
+                    "total_checks": counter.total,
+                    "successful_checks": counter.up,
+                }
+            return result
+    
+    def _evaluate(self, api_name: str) -> List[Dict]:
+        """Compare an API's windows with its claim (lock held)"""
+        claim = self.claims.get(api_name)
+        if claim is None:
+            return []
+        claimed_uptime = claim.get("claimed_uptime")
+        counters = self.counters[api_name]
+        if claimed_uptime is None:
+            label = next(
+                (label for label in self.status_windows
+                 if counters[label].total >= self.min_checks),
+                self.status_windows[0]
+            )
+            kind, other = "status", "uptime"
+        else:
+            label = self.claim_window
+            kind, other = "uptime", "status"
+        counter = counters[label]
+        key = (api_name, kind)
+        signature = (claim["claimed_status"], claimed_uptime)
+        # A claim that switched kind starts over
+        self.diverging.pop((api_name, other), None)
+        
+        variance = None
+        if counter.total >= self.min_checks:
+            measured_uptime = counter.uptime()
+            if claimed_uptime is None:
+                if claim["claimed_status"] == "up" and measured_uptime < STATUS_FLOOR:
+                    variance = 100.0 - measured_uptime
+            elif abs(claimed_uptime - measured_uptime) > UPTIME_TOLERANCE:
+                variance = abs(claimed_uptime - measured_uptime)
+        
+        if variance is None:
+            if self.diverging.pop(key, None) is not None:
+                logger.info(f"{api_name} matches its claim again over {label}")
+            return []
+        if self.diverging.get(key) == signature:
+            return []
+        self.diverging[key] = signature
+        
+        return [{
+            "api_name": api_name,
+            "claimed_status": (claim["claimed_status"] if claimed_uptime is None
+                               else f"{claimed_uptime}% uptime"),
+            "actual_status": f"{measured_uptime:.2f}% uptime over {label}",
+            "claimed_uptime": claimed_uptime,
+            "measured_uptime": round(measured_uptime, 4),
+            "variance_percent": variance,
+            "severity": severity_for(variance),
+            "evidence_url": claim.get("source_url", ""),
+            "checks_count": counter.total,
+            "window": label,
+            "claimed_components": claim.get("components", {}),
+            "snapshot_hashes": claim.get("snapshots", []),
+            "proof_hashes": list(reversed(self.proofs[api_name])),
+            "merkle_proofs": [],
+            "timestamp": datetime.utcnow().isoformat(),
+        }]
+    
+    def _emit(self, raised: List[Dict]):
+        for discrepancy in raised:
+            logger.warning(
+                f"⚠ DISCREPANCY FOUND: {discrepancy['api_name']} - "
+                f"Claimed: {discrepancy['claimed_status']}, "
+                f"Actual: {discrepancy['actual_status']}, "
+                f"Variance: {discrepancy['variance_percent']:.2f}%"
+            )
+            if self.on_discrepancy:
+                self.on_discrepancy(discrepancy)
+
+
+class ClaimRefresher:
+    """
+    Re-reads official claims every interval seconds on a background
+    thread and hands them to a StreamingDetector
+    """
+    
+    def __init__(self, detector: StreamingDetector, sources: Dict[str, Dict],
+                 reader: Optional[StatusReader] = None, interval: float = 300,
+                 hours: int = 24, workers: int = 16):
+        self.detector = detector
+        self.configs = {api_name: config for api_name, config in sources.items()
+                        if official_sources(config)}
+        self.reader = reader or StatusReader()
+        self.interval = interval
+        self.hours = hours
+        self.workers = workers
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def refresh(self) -> int:
+        """Read every claim once; returns how many were read"""
+        read = 0
+        for api_name, claim in self.reader.official_statuses(
+                self.configs, hours=self.hours, workers=self.workers):
+            if claim:
+                read += 1
+            self.detector.set_claim(api_name, claim)
+        self.reader.fetcher.save()
+        return read
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                read = self.refresh()
+                logger.info(f"Refreshed {read}/{len(self.configs)} official claims")
+            except Exception as e:
+                logger.error(f"Claim refresh failed: {e}")
+            self._stop.wait(self.interval)
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="claim-refresh", daemon=True)
+        self._thread.start()
+    
+    def close(self):
+        """Stop refreshing and close the status reader"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.reader.close()
@@ -1,19 +1,30 @@
 #!/usr/bin/env python3
 """
 Truth Ledger - Main Monitoring Script
-Checks API status every hour and logs to immutable database
+Checks API status on per-API schedules and logs to immutable database
 """
 
 import requests
 import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 import sys
+import threading
 from pathlib import Path
 
-from database import TruthLedgerDB
-from api_sources import get_api_config, get_all_apis, get_priority_apis
+from database import chain_key
+from ingest import IngestClient, load_keys
+from ledger_segments import SegmentStore
+from ledger_service import LedgerService
+from ledger_sync import get_vantage
+from probe_engine import AsyncProbeEngine, DEFERRED
+from scheduler import ProbeScheduler
+from status_sources import StatusReader
+from streaming_detector import ClaimRefresher, StreamingDetector
+from api_sources import (
+    API_SOURCES, get_api_config, get_all_apis, get_priority_apis, get_check_interval
+)
 
 
 # Configure logging
@@ -31,17 +42,65 @@ logger = logging.getLogger(__name__)
 class APIMonitor:
     """Monitors APIs and logs results to truth ledger"""
     
-    def __init__(self, db_path: str = "truth_ledger.db"):
-        self.db = TruthLedgerDB(db_path)
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, db_path: str = "truth_ledger.db",
+                 max_concurrency: int = 64, per_host_concurrency: int = 4,
+                 readers: int = 2, compact: bool = False,
+                 segments_dir: Optional[str] = None, vantage: Optional[str] = None,
+                 forwarder: Optional[IngestClient] = None,
+                 detector: Optional[StreamingDetector] = None):
+        # All writes go through the service's single writer thread; stats
+        # and verification read from its query_only pool
+        self.ledger = LedgerService(db_path, readers=readers, compact=compact)
+        # Probes are recorded locally under vantage ""; the name is how
+        # peers and a central ledger know this monitor's region
+        if vantage:
+            self.ledger.call(lambda db: get_vantage(db, vantage)).result()
+        # Each cycle's checks are also sent on to a central ledger
+        self.forwarder = forwarder
+        # Checks also feed sliding-window uptime, compared with cached
+        # claims as they arrive; the windows start from the ledger
+        self.detector = detector
+        if detector:
+            detector.on_discrepancy = self._record_discrepancy
+            with self.ledger.reader() as db:
+                detector.seed(db)
+        # Finished months are carved into sealed segment files
+        self.segments = SegmentStore(segments_dir, db_path) if segments_dir else None
+        self.session = self._new_session()
+        self._sessions = [self.session]
+        self._sessions_lock = threading.Lock()
+        self._local = threading.local()
+        self.engine = AsyncProbeEngine(
+            self.probe_api,
+            max_concurrency=max_concurrency,
+            per_host_concurrency=per_host_concurrency
+        )
+    
+    def _new_session(self) -> requests.Session:
+        """Create an HTTP session with the monitor's headers"""
+        session = requests.Session()
+        session.headers.update({
             'User-Agent': 'TruthLedger/1.0 (API Monitoring)'
         })
+        return session
     
-    def check_api(self, api_name: str) -> Dict:
+    def _thread_session(self) -> requests.Session:
+        """Get the calling thread's session (Session is not thread-safe)"""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._new_session()
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
+    def probe_api(self, api_name: str) -> Optional[Dict]:
         """
-        Check if an API is up
+        Probe an API without recording the result
         Returns status, response time, and status code
+        Safe to call from probe engine worker threads
         """
         config = get_api_config(api_name)
         
@@ -49,6 +108,7 @@ class APIMonitor:
             logger.error(f"No configuration found for API: {api_name}")
             return None
         
+        session = self._thread_session()
         timestamp = datetime.utcnow().isoformat()
         
         try:
@@ -62,11 +122,11 @@ class APIMonitor:
             start_time = time.time()
             
             if method == "GET":
-                response = self.session.get(url, headers=headers, timeout=timeout)
+                response = session.get(url, headers=headers, timeout=timeout)
             elif method == "HEAD":
-                response = self.session.head(url, headers=headers, timeout=timeout)
+                response = session.head(url, headers=headers, timeout=timeout)
             elif method == "POST":
-                response = self.session.post(url, headers=headers, timeout=timeout)
+                response = session.post(url, headers=headers, timeout=timeout)
             else:
                 logger.error(f"Unsupported method: {method}")
                 return None
@@ -77,7 +137,7 @@ class APIMonitor:
             success_codes = config.get("success_codes", [200])
             is_up = response.status_code in success_codes
             
-            check_data = {
+            return {
                 "timestamp": timestamp,
                 "api_name": api_name,
                 "endpoint": url,
@@ -88,20 +148,9 @@ class APIMonitor:
                 "raw_response": ""  # Don't store full response to save space
             }
             
-            # Insert into database
-            check_hash = self.db.insert_check(check_data)
-            
-            logger.info(
-                f"✓ {api_name}: {check_data['status']} "
-                f"({response_time_ms}ms, {response.status_code}) "
-                f"hash={check_hash[:8]}..."
-            )
-            
-            return check_data
-            
         except requests.exceptions.Timeout:
             logger.warning(f"✗ {api_name}: TIMEOUT")
-            check_data = {
+            return {
                 "timestamp": timestamp,
                 "api_name": api_name,
                 "endpoint": config["endpoint"],
@@ -111,12 +160,10 @@ class APIMonitor:
                 "source": "direct_check",
                 "raw_response": "timeout"
             }
-            self.db.insert_check(check_data)
-            return check_data
             
         except requests.exceptions.ConnectionError:
             logger.warning(f"✗ {api_name}: CONNECTION ERROR")
-            check_data = {
+            return {
                 "timestamp": timestamp,
                 "api_name": api_name,
                 "endpoint": config["endpoint"],
@@ -126,12 +173,10 @@ class APIMonitor:
                 "source": "direct_check",
                 "raw_response": "connection_error"
             }
-            self.db.insert_check(check_data)
-            return check_data
             
         except Exception as e:
             logger.error(f"✗ {api_name}: ERROR - {str(e)}")
-            check_data = {
+            return {
                 "timestamp": timestamp,
                 "api_name": api_name,
                 "endpoint": config["endpoint"],
@@ -141,33 +186,119 @@ class APIMonitor:
                 "source": "direct_check",
                 "raw_response": str(e)
             }
-            self.db.insert_check(check_data)
-            return check_data
+    
+    def _log_recorded(self, check_data: Dict, check_hash: str):
+        """Log a check that reached the ledger"""
+        if check_data["status_code"]:
+            logger.info(
+                f"✓ {check_data['api_name']}: {check_data['status']} "
+                f"({check_data['response_time_ms']}ms, {check_data['status_code']}) "
+                f"hash={check_hash[:8]}..."
+            )
+    
+    def check_api(self, api_name: str) -> Dict:
+        """
+        Check if an API is up and record the result
+        Returns status, response time, and status code
+        """
+        check_data = self.probe_api(api_name)
+        if check_data:
+            check_hash = self.ledger.submit(check_data).result()
+            self._log_recorded(check_data, check_hash)
+            if self.forwarder:
+                self.forwarder.submit([check_data])
+            if self.detector:
+                self.detector.observe(check_data, check_hash)
+        return check_data
+    
+    def _run_cycle(self, apis: List[str],
+                   deadline: Optional[float] = None) -> Tuple[Dict, List[str]]:
+        """
+        Probe APIs concurrently and record results in check order
+        All results go to the ledger in one group commit
+        Returns (results, APIs deferred by the deadline)
+        """
+        checks = []
+        deferred = []
+        for api_name, result in zip(apis, self.engine.run(apis, deadline)):
+            if result is DEFERRED:
+                deferred.append(api_name)
+            elif result:
+                checks.append(result)
+        
+        hashes = self.ledger.submit_many(checks).result()
+        if self.forwarder:
+            # Failed sends are buffered and retried with the next cycle
+            self.forwarder.submit(checks)
+        if self.detector:
+            self.detector.observe_many(checks, hashes)
+        
+        # Anchor full batches, plus any partial batch older than an hour;
+        # sealing runs on the writer thread, so there's no need to wait
+        self.ledger.call(lambda db: db.seal_merkle_batches(max_age_seconds=3600))
+        if self.segments:
+            self.ledger.call(self.segments.rotate)
+        
+        results = {}
+        for check_data, check_hash in zip(checks, hashes):
+            self._log_recorded(check_data, check_hash)
+            results[check_data["api_name"]] = check_data
+        return results, deferred
+    
+    def _record_discrepancy(self, discrepancy: Dict):
+        """Store a discrepancy raised by the streaming detector"""
+        self.ledger.call(lambda db: db.insert_discrepancy(discrepancy))
+    
+    def check_apis(self, apis: List[str]) -> Dict:
+        """Probe APIs concurrently and record the results"""
+        results, _ = self._run_cycle(apis)
+        return results
+    
+    def run_due(self, apis: List[str], deadline: Optional[float] = None) -> List[str]:
+        """
+        Scheduler callback - check the APIs that are due
+        Returns the APIs deferred because the cycle deadline passed
+        """
+        results, deferred = self._run_cycle(apis, deadline)
+        logger.info(f"Checked {len(results)} due APIs: {', '.join(sorted(results))}")
+        return deferred
     
     def check_all_apis(self):
         """Check all configured APIs"""
         apis = get_all_apis()
         logger.info(f"Starting check of {len(apis)} APIs...")
         
-        results = {}
-        for api_name in apis:
-            result = self.check_api(api_name)
-            if result:
-                results[api_name] = result
-            time.sleep(1)  # Rate limiting
+        results = self.check_apis(apis)
         
         logger.info(f"Completed check of {len(results)} APIs")
         return results
     
-    def verify_integrity(self):
-        """Verify hash chain integrity for all APIs"""
-        apis = get_all_apis()
+    def verify_integrity(self, full: bool = False):
+        """
+        Verify every hash chain: each API's, from every vantage (chains
+        merged by sync or written by ingest included)
+        Incremental from each chain's checkpoint unless full is set
+        """
+        with self.ledger.reader() as db:
+            chains = db.get_chains()
         all_valid = True
         
-        for api_name in apis:
-            is_valid, errors = self.db.verify_chain_integrity(api_name)
+        logger.info(f"Verifying hash chains ({'full audit' if full else 'incremental'})...")
+        
+        for api_name, vantage in chains:
+            if full:
+                # A full re-hash is long; keep it off the writer thread
+                with self.ledger.reader() as db:
+                    is_valid, errors = db.verify_chain_integrity(
+                        api_name, full=True, vantage=vantage
+                    )
+            else:
+                # Incremental runs advance checkpoints, which is a write
+                is_valid, errors = self.ledger.call(
+                    lambda db: db.verify_chain_integrity(api_name, full=False, vantage=vantage)
+                ).result()
             if not is_valid:
-                logger.error(f"Chain integrity failure for {api_name}:")
+                logger.error(f"Chain integrity failure for {chain_key(api_name, vantage)}:")
                 for error in errors:
                     logger.error(f"  {error}")
                 all_valid = False
@@ -181,16 +312,18 @@ class APIMonitor:
     
     def get_stats(self) -> Dict:
         """Get monitoring statistics"""
-        stats = self.db.get_database_stats()
-        
-        # Add per-API uptime
-        apis = get_all_apis()
-        api_uptimes = {}
-        
-        for api_name in apis:
-            uptime_data = self.db.get_api_uptime(api_name, hours=24)
-            if uptime_data['total_checks'] > 0:
-                api_uptimes[api_name] = uptime_data
+        with self.ledger.reader() as db:
+            stats = db.get_database_stats()
+            
+            # Add per-API uptime
+            apis = get_all_apis()
+            api_uptimes = {}
+            
+            for api_name in apis:
+                uptime_data = db.get_api_uptime(api_name, hours=24)
+                if uptime_data['total_checks'] > 0:
+                    uptime_data['latency'] = db.get_latency_percentiles(api_name, hours=24)
+                    api_uptimes[api_name] = uptime_data
         
         stats['api_uptimes'] = api_uptimes
         return stats
@@ -215,6 +348,7 @@ class APIMonitor:
             uptime = uptime_data['uptime']
             checks = uptime_data['total_checks']
             avg_time = uptime_data['avg_response_time_ms']
+            latency = uptime_data['latency']
             
             # Color coding
             if uptime >= 99.9:
@@ -228,13 +362,24 @@ class APIMonitor:
                 f"{status} {api_name:20s} {uptime:6.2f}% "
                 f"({checks:4d} checks, {avg_time:6.0f}ms avg)"
             )
+            if latency['samples']:
+                print(
+                    "    " + "  ".join(
+                        f"{label} {value:,.0f}ms"
+                        for label, value in latency.items() if label != 'samples'
+                    )
+                )
         
         print("="*60 + "\n")
     
     def close(self):
         """Close connections"""
-        self.db.close()
-        self.session.close()
+        self.engine.close()
+        if self.forwarder:
+            self.forwarder.close()
+        self.ledger.close()
+        for session in self._sessions:
+            session.close()
 
 
 def main():
@@ -250,8 +395,28 @@ def main():
     parser.add_argument(
         '--interval',
         type=int,
-        default=3600,
-        help='Check interval in seconds (default: 3600 = 1 hour)'
+        default=None,
+        help='Check every API at this interval in seconds '
+             '(default: per-API tiers, 300s priority / 3600s standard)'
+    )
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=0.1,
+        help='Random spread as a fraction of each interval (default: 0.1)'
+    )
+    parser.add_argument(
+        '--catch-up',
+        choices=ProbeScheduler.CATCH_UP_POLICIES,
+        default='run_once',
+        help='What to do with slots missed during a stall (default: run_once)'
+    )
+    parser.add_argument(
+        '--cycle-deadline',
+        type=float,
+        default=None,
+        help='Seconds a cycle may spend starting probes before the rest '
+             'are deferred to the next tick (default: no deadline)'
     )
     parser.add_argument(
         '--stats',
@@ -261,7 +426,12 @@ def main():
     parser.add_argument(
         '--verify',
         action='store_true',
-        help='Verify chain integrity and exit'
+        help='Verify chain integrity since the last checkpoint and exit'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='With --verify, re-hash every chain from genesis'
     )
     parser.add_argument(
         '--db',
@@ -269,10 +439,101 @@ def main():
         default='truth_ledger.db',
         help='Database path (default: truth_ledger.db)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=64,
+        help='Maximum probes in flight (default: 64)'
+    )
+    parser.add_argument(
+        '--per-host',
+        type=int,
+        default=4,
+        help='Maximum probes in flight per host (default: 4)'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Store runs of identical probes as one row (marks the ledger compact)'
+    )
+    parser.add_argument(
+        '--segments',
+        type=str,
+        default=None,
+        help='Carve finished months into sealed segment files in this directory'
+    )
+    parser.add_argument(
+        '--vantage',
+        type=str,
+        default=None,
+        help="This monitor's region name, e.g. eu-west (recorded in the ledger)"
+    )
+    parser.add_argument(
+        '--detect',
+        action='store_true',
+        help='Compare checks with official claims as they arrive and record discrepancies'
+    )
+    parser.add_argument(
+        '--claim-refresh',
+        type=float,
+        default=300,
+        help='With --detect, seconds between reads of the status pages (default: 300)'
+    )
+    parser.add_argument(
+        '--status-cache',
+        type=str,
+        default='status_cache.json',
+        help='With --detect, validator cache for status pages (default: status_cache.json)'
+    )
+    parser.add_argument(
+        '--status-archive',
+        type=str,
+        default='status_archive.db',
+        help='With --detect, snapshot archive for status pages (default: status_archive.db)'
+    )
+    parser.add_argument(
+        '--ingest',
+        type=str,
+        default=None,
+        help='Also send checks to a central ledger\'s ingest server, e.g. http://central:8470'
+    )
+    parser.add_argument(
+        '--ingest-key',
+        type=str,
+        default=None,
+        help="Keys file holding this vantage's ingest secret (required with --ingest)"
+    )
     
     args = parser.parse_args()
     
-    monitor = APIMonitor(args.db)
+    forwarder = None
+    if args.ingest:
+        if not (args.vantage and args.ingest_key):
+            parser.error("--ingest needs --vantage and --ingest-key")
+        keys = load_keys(args.ingest_key)
+        if args.vantage not in keys:
+            parser.error(f"{args.ingest_key} has no secret for vantage {args.vantage}")
+        forwarder = IngestClient(args.ingest, args.vantage, keys[args.vantage])
+    
+    detector = refresher = None
+    if args.detect:
+        detector = StreamingDetector()
+        refresher = ClaimRefresher(
+            detector, API_SOURCES,
+            reader=StatusReader(cache_path=args.status_cache, archive_path=args.status_archive),
+            interval=args.claim_refresh
+        )
+    
+    monitor = APIMonitor(
+        args.db,
+        max_concurrency=args.concurrency,
+        per_host_concurrency=args.per_host,
+        compact=args.compact,
+        segments_dir=args.segments,
+        vantage=args.vantage,
+        forwarder=forwarder,
+        detector=detector
+    )
     
     try:
         if args.stats:
@@ -280,33 +541,53 @@ def main():
             return
         
         if args.verify:
-            monitor.verify_integrity()
+            monitor.verify_integrity(full=args.full)
             return
         
         if args.once:
             logger.info("Running single check...")
+            if refresher:
+                refresher.refresh()
             monitor.check_all_apis()
             monitor.print_stats()
         else:
-            logger.info(f"Starting continuous monitoring (interval: {args.interval}s)...")
+            apis = get_all_apis()
+            intervals = {
+                api_name: args.interval or get_check_interval(api_name)
+                for api_name in apis
+            }
+            scheduler = ProbeScheduler(
+                monitor.run_due,
+                intervals,
+                jitter=args.jitter,
+                catch_up=args.catch_up,
+                cycle_deadline=args.cycle_deadline
+            )
+            
+            logger.info(
+                f"Starting continuous monitoring of {len(apis)} APIs "
+                f"(intervals: {min(intervals.values())}s-{max(intervals.values())}s, "
+                f"catch-up: {args.catch_up})..."
+            )
             logger.info("Press Ctrl+C to stop")
+            if refresher:
+                refresher.start()
             
-            iteration = 0
-            while True:
-                iteration += 1
-                logger.info(f"\n--- Iteration {iteration} ---")
-                
-                monitor.check_all_apis()
-                
-                if iteration % 24 == 0:  # Print stats every 24 hours
+            last_stats = time.monotonic()
+            
+            def print_daily_stats():
+                nonlocal last_stats
+                if time.monotonic() - last_stats >= 86400:  # Every 24 hours
                     monitor.print_stats()
-                
-                logger.info(f"Sleeping for {args.interval} seconds...")
-                time.sleep(args.interval)
+                    last_stats = time.monotonic()
+            
+            scheduler.run_forever(on_tick=print_daily_stats)
     
     except KeyboardInterrupt:
         logger.info("\nStopping monitor...")
     finally:
+        if refresher:
+            refresher.close()
         monitor.close()
         logger.info("Monitor stopped")
 